@@ -0,0 +1,98 @@
+import os
+import tempfile
+
+from tests.utilities import testable_test
+from ward import test
+from ward._capture import CaptureBuffer
+from ward._fixtures import FixtureCache
+from ward.testing import Test, TestOutcome, each
+
+
+@test("CaptureBuffer keeps output in memory while it's within the limit")
+def _():
+    buffer = CaptureBuffer(memory_limit=100)
+    buffer.write("hello\n")
+    buffer.write("world\n")
+
+    assert buffer.getvalue() == "hello\nworld\n"
+    assert not buffer.spilled
+
+
+@test("CaptureBuffer spills to disk, keeping the head and tail of the output")
+def _():
+    buffer = CaptureBuffer(memory_limit=40)
+    lines = [f"line {i}\n" for i in range(100)]
+    for line in lines:
+        buffer.write(line)
+    buffer.flush()
+
+    with open(buffer.path) as f:
+        assert f.read() == "".join(lines)
+    value = buffer.getvalue()
+    assert value.startswith("line 0\nline 1\n")
+    assert value.endswith("line 98\nline 99\n")
+    assert "characters omitted" in value
+    assert len(value) < 100
+
+    path = buffer.path
+    buffer.close()
+    assert not os.path.exists(path)
+
+
+@test("CaptureBuffer keeps the file it spilled to if persist is called")
+def _():
+    buffer = CaptureBuffer(memory_limit=10)
+    buffer.write("x" * 100)
+
+    path = buffer.persist()
+    buffer.close()
+    try:
+        with open(path) as f:
+            assert f.read() == "x" * 100
+    finally:
+        os.unlink(path)
+
+
+@test("CaptureBuffer spills to a file in its spill_dir")
+def _():
+    with tempfile.TemporaryDirectory() as tmp:
+        buffer = CaptureBuffer(memory_limit=4, spill_dir=tmp)
+        buffer.write("hello world\n")
+
+        assert os.path.dirname(buffer.path) == tmp
+        buffer.close()
+
+
+@test("CaptureBuffer bounds the tail when given a single large write")
+def _():
+    buffer = CaptureBuffer(memory_limit=10)
+    buffer.write("a" * 5)
+    buffer.write("b" * 1000)
+
+    assert buffer.getvalue().endswith("b" * 5)
+    assert sum(map(len, buffer._tail)) <= 10
+    buffer.close()
+
+
+@test("Test.run only keeps the full output of a test that spilled if it {description}")
+def _(description=each("passed", "failed"), should_fail=each(False, True)):
+    @testable_test
+    def chatty():
+        print("output\n" * 100)
+        assert not should_fail
+
+    t = Test(fn=chatty, module_name="mod")
+    t.sout = CaptureBuffer(memory_limit=50)
+    result = t.run(FixtureCache())
+
+    assert t.sout.closed
+    if should_fail:
+        assert result.outcome == TestOutcome.FAIL
+        assert "characters omitted" in result.captured_stdout
+        assert os.path.exists(result.captured_stdout_path)
+        os.unlink(result.captured_stdout_path)
+    else:
+        assert result.outcome == TestOutcome.PASS
+        assert result.captured_stdout_path is None
+        # The file the output spilled to was deleted when the test passed.
+        assert t.sout.path is None
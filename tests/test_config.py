@@ -1,5 +1,6 @@
 import tempfile
 import types
+from dataclasses import MISSING, fields
 from pathlib import Path
 from typing import IO, Generator
 from unittest import mock
@@ -15,6 +16,8 @@ from ward._config import (
     set_defaults_from_config,
     validate_config_toml,
 )
+from ward._run import test as test_command
+from ward.config import Config
 
 
 def temp_conf(conf: str) -> Generator[IO[bytes], None, None]:
@@ -205,3 +208,30 @@ def _(project_root: Path = fake_project_empty):
 
     assert fake_context.params["project_root"] is None
     assert fake_context.params["config_path"] is None
+
+
+@test("Config fields with defaults default to the same values as their CLI options")
+def _():
+    config = Config(
+        config_path=None,
+        project_root=None,
+        path=(".",),
+        exclude=(),
+        search=None,
+        tags=None,
+        fail_limit=None,
+        test_output_style="test-per-line",
+        order="standard",
+        capture_output=True,
+        show_slowest=0,
+        show_diff_symbols=False,
+        dry_run=False,
+        hook_module=(),
+        progress_style=("inline",),
+        plugin_config={},
+    )
+    cli_defaults = {param.name: param.default for param in test_command.params}
+
+    for field in fields(Config):
+        if field.default is not MISSING:
+            assert getattr(config, field.name) == cli_defaults[field.name]
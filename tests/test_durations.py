@@ -0,0 +1,158 @@
+import tempfile
+from pathlib import Path
+
+from tests.utilities import FORCE_TEST_PATH, testable_test
+from ward import fixture, test
+from ward._cache import ProjectCache
+from ward._durations import (
+    DEFAULT_ESTIMATE_SECS,
+    MAX_SESSIONS_UNSEEN,
+    DurationHistory,
+    test_key,
+)
+from ward._results import ResultRecord
+from ward._testing import _Timer
+from ward.testing import Test, TestOutcome, TestResult, each
+
+
+@fixture
+def cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield ProjectCache(root=Path(tmp) / ".ward_cache")
+
+
+def make_test(description: str, duration: float) -> Test:
+    @testable_test
+    def _():
+        pass
+
+    _.ward_meta.description = description
+    return Test(
+        fn=_, module_name="test_x", description=description, timer=_Timer(duration)
+    )
+
+
+def make_record(t: Test, outcome: TestOutcome) -> ResultRecord:
+    return ResultRecord.from_result(TestResult(t, outcome))
+
+
+@test("test_key is relative to the project root and uses the raw description")
+def _():
+    t = make_test("hello {world}", 1.0)
+    t.description = "hello everybody"
+
+    key = test_key(t, FORCE_TEST_PATH.parent)
+
+    assert key == f"test::test_x._::{t.line_number}::hello {{world}}"
+
+
+@test("test_key tells apart tests in a module that share a description")
+def _():
+    @testable_test
+    def first():
+        pass
+
+    @testable_test
+    def second():
+        pass
+
+    first.__name__ = second.__name__ = "_"
+    a = Test(fn=first, module_name="test_x", description="same")
+    b = Test(fn=second, module_name="test_x", description="same")
+
+    assert test_key(a, None) != test_key(b, None)
+
+
+@test("ProjectCache returns the default for missing keys")
+def _(cache=cache):
+    assert cache.get("missing", default={}) == {}
+
+
+@test("ProjectCache can read back what was written and ignores itself in git")
+def _(cache=cache):
+    cache.set("durations", {"a": 1.5})
+
+    assert cache.get("durations") == {"a": 1.5}
+    assert (cache.root / ".gitignore").read_text().endswith("*\n")
+
+
+@test("ProjectCache keeps the files of the last session that left any")
+def _(cache=cache):
+    first = cache.make_session_directory("files")
+    (first / "kept").write_text("")
+    cache.remove_earlier_session_directories(first)
+    second = cache.make_session_directory("files")
+    third = cache.make_session_directory("files")
+    (third / "kept").write_text("")
+
+    cache.remove_earlier_session_directories(second)
+    cache.remove_earlier_session_directories(third)
+
+    assert list((cache.root / "files").iterdir()) == [third]
+
+
+@test("DurationHistory survives a round trip through the cache")
+def _(cache=cache):
+    history = DurationHistory(project_root=None)
+    history.record([make_record(make_test("a", 2.0), TestOutcome.PASS)])
+    history.save(cache)
+
+    loaded = DurationHistory.load(cache, project_root=None)
+
+    assert loaded.durations == history.durations
+
+
+@test("DurationHistory forgets tests that haven't run for many sessions")
+def _(cache=cache):
+    history = DurationHistory(project_root=None)
+    gone, kept = make_test("gone", 1.0), make_test("kept", 1.0)
+    history.record([make_record(gone, TestOutcome.PASS)])
+    for _ in range(MAX_SESSIONS_UNSEEN):
+        history.record([make_record(kept, TestOutcome.PASS)])
+    history.save(cache)
+
+    loaded = DurationHistory.load(cache, project_root=None)
+
+    assert list(loaded.durations) == [f"{test_key(kept, None)}[0]"]
+    assert loaded.last_seen == {f"{test_key(kept, None)}[0]": loaded.session}
+
+
+@test("DurationHistory doesn't record skipped tests")
+def _():
+    history = DurationHistory(project_root=None)
+    history.record([make_record(make_test("a", 2.0), TestOutcome.SKIP)])
+
+    assert history.durations == {}
+
+
+@test("DurationHistory.estimate sums the durations of every parameterised instance")
+def _():
+    history = DurationHistory(project_root=None)
+    t = make_test("a", 0.0)
+    key = test_key(t, None)
+    history.durations = {f"{key}[0]": 1.0, f"{key}[1]": 2.0}
+
+    assert history.estimate(t) == 3.0
+
+
+@test("DurationHistory.estimate falls back to the median of the module")
+def _():
+    history = DurationHistory(project_root=None)
+    history.record(
+        [
+            make_record(make_test(desc, duration), TestOutcome.PASS)
+            for desc, duration in [("a", 1.0), ("b", 2.0), ("c", 9.0)]
+        ]
+    )
+
+    assert history.estimate(make_test("new", 0.0)) == 2.0
+
+
+@test("DurationHistory.estimate uses {expected} for a test with no history")
+def _(
+    durations=each({}, {"elsewhere.py::m._::x[0]": 4.0}),
+    expected=each(DEFAULT_ESTIMATE_SECS, 4.0),
+):
+    history = DurationHistory(project_root=None, durations=durations)
+
+    assert history.estimate(make_test("new", 0.0)) == expected
@@ -0,0 +1,81 @@
+import asyncio
+
+from tests.utilities import testable_test
+from ward import Scope, fixture, test
+from ward._event_loop import SessionEventLoop
+from ward._suite import Suite
+from ward.testing import Test, TestOutcome
+
+
+@test("SessionEventLoop runs every awaitable on the same loop")
+def _():
+    session_loop = SessionEventLoop()
+
+    async def running_loop():
+        return asyncio.get_running_loop()
+
+    first = session_loop.run(running_loop())
+    second = session_loop.run(running_loop())
+    session_loop.close()
+
+    assert first is second
+    assert first.is_closed()
+    assert not session_loop.is_open
+
+
+@test("SessionEventLoop.close cancels tasks that are still running")
+def _():
+    session_loop = SessionEventLoop()
+    cancelled = []
+
+    async def forever():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def start_task():
+        return asyncio.ensure_future(forever())
+
+    task = session_loop.run(start_task())
+    session_loop.close()
+
+    assert task.cancelled()
+    assert cancelled == [True]
+
+
+@test("Suite runs async tests and fixtures on one loop, closed after global teardown")
+def _():
+    loops = []
+
+    @fixture(scope=Scope.Global)
+    async def global_fixture():
+        loops.append(asyncio.get_running_loop())
+        yield
+        loops.append(asyncio.get_running_loop())
+
+    @fixture
+    async def test_fixture():
+        loops.append(asyncio.get_running_loop())
+
+    @testable_test
+    async def first(g=global_fixture, t=test_fixture):
+        loops.append(asyncio.get_running_loop())
+
+    @testable_test
+    async def second(g=global_fixture):
+        loops.append(asyncio.get_running_loop())
+
+    suite = Suite(
+        tests=[
+            Test(fn=first, module_name="mod"),
+            Test(fn=second, module_name="mod"),
+        ]
+    )
+    results = list(suite.generate_test_runs())
+
+    assert [r.outcome for r in results] == [TestOutcome.PASS, TestOutcome.PASS]
+    assert len(loops) == 5
+    assert all(loop is loops[0] for loop in loops)
+    assert loops[0].is_closed()
@@ -132,3 +132,64 @@ def _():
     raises_tb = traceback.extract_tb(ctx.raised.__traceback__)
 
     assert try_tb[1:] == raises_tb[1:]
+
+
+class ExpensiveToFormat:
+    def __init__(self):
+        self.formatted = False
+
+    def __repr__(self):
+        self.formatted = True
+        return "ExpensiveToFormat()"
+
+
+@test("TestAssertionFailure only builds its message when it's needed")
+def _():
+    value = ExpensiveToFormat()
+    with raises(TestAssertionFailure) as ctx:
+        assert_equal(value, 1, "msg")
+
+    assert not value.formatted
+    assert ctx.raised.message == "ExpensiveToFormat() does not equal 1"
+    assert value.formatted
+
+
+@test("TestAssertionFailure bounds the size of the operands in its message")
+def _():
+    with raises(TestAssertionFailure) as ctx:
+        assert_in(b"x" * 10_000, list(range(10_000)), "msg")
+
+    assert len(str(ctx.raised)) < 200
+    assert str(ctx.raised).endswith("is not in [0, 1, 2, 3, 4, 5, ...]")
+
+
+@test("TestAssertionFailure formats the operands in its message with str")
+def _():
+    with raises(TestAssertionFailure) as ctx:
+        assert_equal("abc", 1.5, "msg")
+
+    assert ctx.raised.message == "abc does not equal 1.5"
+
+
+@test("TestAssertionFailure allows its message to be replaced")
+def _():
+    with raises(TestAssertionFailure) as ctx:
+        assert_equal(1, 2, "msg")
+
+    ctx.raised.message = "replaced"
+
+    assert str(ctx.raised) == "replaced"
+
+
+@test("TestAssertionFailure can be pickled without building its message")
+def _():
+    import pickle
+
+    with raises(TestAssertionFailure) as ctx:
+        assert_less_than([1, 2], [1], "msg")
+
+    unpickled = pickle.loads(pickle.dumps(ctx.raised))
+
+    assert unpickled._message is None
+    assert (unpickled.lhs, unpickled.rhs, unpickled.assert_msg) == ([1, 2], [1], "msg")
+    assert unpickled.message == "[1, 2] >= [1]"
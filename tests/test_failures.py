@@ -0,0 +1,93 @@
+import pickle
+
+from ward import test
+from ward._failures import FailureRecord
+from ward.expect import Comparison, TestAssertionFailure
+from ward.testing import Test, TestOutcome, TestResult
+
+
+class Payload:
+    pass
+
+
+def raise_error():
+    def inner():
+        payload = Payload()  # noqa: F841
+        raise ValueError("something went wrong")
+
+    inner()
+
+
+def caught(fn) -> BaseException:
+    try:
+        fn()
+    except BaseException as e:
+        return e
+    raise AssertionError("expected an exception")
+
+
+@test("FailureRecord.from_exception extracts the traceback and locals of an error")
+def _():
+    record = FailureRecord.from_exception(caught(raise_error))
+
+    assert record.summary() == "ValueError: something went wrong"
+    assert record.operator is None
+    # The first frame (which would be inside ward when running a test) is skipped.
+    frames = record.trace.stacks[0].frames
+    assert [f.name for f in frames] == ["raise_error", "inner"]
+    assert "payload" in frames[1].locals
+
+
+@test("FailureRecord.from_exception summarises both sides of a failed comparison")
+def _():
+    error = TestAssertionFailure("fail", "abc", [1, 2], 3, Comparison.In, "msg")
+
+    record = FailureRecord.from_exception(error, width=80)
+
+    assert (record.error_line, record.assert_msg) == (3, "msg")
+    assert record.operator is Comparison.In
+    assert (record.lhs.type_name, record.lhs.pretty) == ("str", "'abc'")
+    assert (record.rhs.type_name, record.rhs.pretty) == ("list", "[1, 2]")
+    assert record.lhs.diff_text == "abc"
+
+
+@test(
+    "FailureRecord.from_exception truncates large operands instead of formatting them"
+)
+def _():
+    lhs = [list(range(100)) for _ in range(100)]
+    error = TestAssertionFailure("fail", lhs, "x" * 1_000_000, 3, Comparison.Equals, "")
+
+    record = FailureRecord.from_exception(error, width=80)
+
+    assert record.lhs.type_name == "list"
+    assert record.lhs.pretty == record.lhs.diff_text
+    assert record.lhs.pretty.endswith("...]")
+    assert len(record.lhs.pretty) < 5000
+    assert len(record.rhs.diff_text) < 2000
+
+
+@test("FailureRecord can be pickled even if the exception it's built from can't")
+def _():
+    error = caught(raise_error)
+    error.unpicklable = lambda: None
+
+    record = FailureRecord.from_exception(error)
+
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+@test("TestResult builds a FailureRecord then drops the traceback of the error")
+def _():
+    error = caught(raise_error)
+    error.__cause__ = caught(raise_error)
+
+    result = TestResult(
+        Test(fn=lambda: None, module_name="mod"), TestOutcome.FAIL, error
+    )
+
+    assert result.failure.exc_type == "ValueError"
+    assert result.failure.trace is not None
+    assert result.error is error
+    assert error.__traceback__ is None
+    assert error.__cause__.__traceback__ is None
@@ -1,3 +1,4 @@
+import inspect
 import sys
 from typing import List
 
@@ -380,3 +381,41 @@ def _():
         fc: [fd],
         fd: [],
     }
+
+
+@test("@fixture records the fixture definition once, when the fixture is defined")
+def _():
+    @fixture(scope=Scope.Module)
+    async def fix():
+        yield 1
+
+    definition = fix.ward_meta.fixture_definition
+
+    assert Fixture(fix).definition is definition
+    assert Fixture(fix).definition is Fixture(fix).definition
+    assert definition.name == "fix"
+    assert definition.scope == Scope.Module
+    assert definition.is_async_generator
+    assert not definition.is_generator
+    assert definition.line_number == inspect.getsourcelines(fix)[1]
+    assert definition.key == f"{definition.path}::fix"
+
+
+@test("Fixtures are equal only if they are defined by the same fixture function")
+def _():
+    def define_fixture():
+        @fixture
+        def fix():
+            pass
+
+        return fix
+
+    first, same_place = define_fixture(), define_fixture()
+
+    @fixture
+    def fix():
+        pass
+
+    assert Fixture(first) == Fixture(same_place)
+    assert hash(Fixture(first)) == hash(Fixture(same_place))
+    assert Fixture(first) != Fixture(fix)
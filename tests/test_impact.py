@@ -0,0 +1,177 @@
+import importlib.util
+import subprocess
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+
+import click
+
+from ward import fixture, raises, test
+from ward._cache import ProjectCache
+from ward._collect import get_info_for_modules, get_tests_in_modules, load_modules
+from ward._fixtures import FixtureCache
+from ward._impact import (
+    FootprintRecorder,
+    ImpactMap,
+    changed_files_since,
+    merge_footprints,
+)
+from ward._suite import Suite
+from ward.testing import Test, TestOutcome, TestResult
+
+HELPER_MODULE = dedent(
+    """
+    def sign(x):
+        if x < 0:
+            return -1
+        return 1
+    """
+)
+
+SUITE_MODULE = dedent(
+    """
+    from ward import Scope, fixture, test
+
+    @fixture(scope=Scope.Module)
+    def shared():
+        return "shared"
+
+    @test("first")
+    def _(s=shared):
+        assert s
+
+    @test("second")
+    def _(s=shared):
+        assert s
+    """
+)
+
+
+@fixture
+def project():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield Path(tmp).resolve()
+
+
+def import_helper(root: Path):
+    path = root / "helper.py"
+    path.write_text(HELPER_MODULE)
+    spec = importlib.util.spec_from_file_location("helper", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def collect(root: Path, name: str, source: str):
+    (root / name).write_text(source)
+    modules = load_modules(get_info_for_modules([root], ()))
+    return get_tests_in_modules(modules)
+
+
+def passed(test: Test, footprint) -> TestResult:
+    return TestResult(test, TestOutcome.PASS, footprint=footprint)
+
+
+@test("merge_footprints combines the lines executed in each file")
+def _():
+    merged = merge_footprints({"a.py": [3, 1]}, {"a.py": [2, 3], "b.py": [5]}, {})
+
+    assert merged == {"a.py": [1, 2, 3], "b.py": [5]}
+
+
+@test("FootprintRecorder records the lines executed in each (nested) block")
+def _(root=project):
+    helper = import_helper(root)
+    recorder = FootprintRecorder(root)
+
+    with recorder.recording() as outer:
+        helper.sign(1)
+        with recorder.recording() as inner:
+            helper.sign(-1)
+
+    assert outer == {"helper.py": [3, 4, 5]}
+    assert inner == {"helper.py": [3, 4]}
+
+
+@test("FootprintRecorder ignores files outside of the project root")
+def _(root=project):
+    helper = import_helper(root)
+    recorder = FootprintRecorder(root / "elsewhere")
+
+    with recorder.recording() as footprint:
+        helper.sign(1)
+
+    assert footprint == {}
+
+
+@test("Suite attributes cached fixtures to every test that uses them")
+def _(root=project):
+    tests = collect(root, "test_impact_suite.py", SUITE_MODULE)
+    suite = Suite(tests=tests, cache=FixtureCache(recorder=FootprintRecorder(root)))
+
+    first, second = list(suite.generate_test_runs())
+
+    fixture_line = 6  # return "shared"
+    assert fixture_line in first.footprint["test_impact_suite.py"]
+    assert fixture_line in second.footprint["test_impact_suite.py"]
+
+
+@test("ImpactMap selects tests that executed a changed file, or have no footprint")
+def _(root=project):
+    tests = collect(root, "test_impact_select.py", SUITE_MODULE)
+    impact = ImpactMap(project_root=root)
+    list(impact.record([passed(tests[0], {"helper.py": [3]})]))
+    (root / "helper.py").write_text(HELPER_MODULE)
+    impact.save(ProjectCache(root / ".ward_cache"))
+
+    assert impact.select_affected(tests, changed_files=set()) == [tests[1]]
+    assert impact.select_affected(tests, changed_files={"helper.py"}) == tests
+
+
+@test("ImpactMap selects tests that executed a file changed since it was recorded")
+def _(root=project):
+    tests = collect(root, "test_impact_last_run.py", SUITE_MODULE)
+    cache = ProjectCache(root / ".ward_cache")
+    impact = ImpactMap(project_root=root)
+    (root / "helper.py").write_text(HELPER_MODULE)
+    list(impact.record([passed(test, {"helper.py": [3]}) for test in tests]))
+    impact.save(cache)
+
+    assert ImpactMap.load(cache, root).select_affected(tests) == []
+
+    (root / "helper.py").write_text(HELPER_MODULE + "\n# changed\n")
+
+    assert ImpactMap.load(cache, root).select_affected(tests) == tests
+
+
+@test("ImpactMap forgets the footprint of a test when any instance of it fails")
+def _(root=project):
+    tests = collect(root, "test_impact_fail.py", SUITE_MODULE)
+    impact = ImpactMap(project_root=root)
+    list(impact.record([passed(test, {}) for test in tests]))
+    impact.save(ProjectCache(root / ".ward_cache"))
+
+    results = [passed(tests[0], {}), TestResult(tests[0], TestOutcome.FAIL)]
+    list(impact.record(results))
+    impact.save(ProjectCache(root / ".ward_cache"))
+
+    assert impact.select_affected(tests, changed_files=set()) == [tests[0]]
+
+
+@test("changed_files_since lists committed, uncommitted and untracked changes")
+def _(root=project):
+    def git(*args):
+        subprocess.run(["git", "-C", str(root), *args], check=True, capture_output=True)
+
+    git("init", "-q")
+    (root / "committed.py").write_text("a = 1\n")
+    (root / "modified.py").write_text("b = 1\n")
+    git("add", ".")
+    git("-c", "user.name=x", "-c", "user.email=x@x", "commit", "-qm", "first")
+    (root / "modified.py").write_text("b = 2\n")
+    (root / "untracked.py").write_text("c = 1\n")
+
+    assert changed_files_since("HEAD", root) == {"modified.py", "untracked.py"}
+    with raises(click.BadParameter):
+        changed_files_since("not-a-revision", root)
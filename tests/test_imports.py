@@ -0,0 +1,108 @@
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+
+from ward import each, fixture, test
+from ward._cache import ProjectCache
+from ward._collect import get_info_for_modules
+from ward._imports import (
+    ImportGraph,
+    filter_modules_by_imports,
+    imported_module_names,
+    read_imports,
+)
+
+PROJECT = {
+    "pkg/__init__.py": "",
+    "pkg/calc.py": "from .util import helper\n",
+    "pkg/util.py": "",
+    "pkg/db.py": "import json\n",
+    "test_calc.py": "from pkg.calc import add\n",
+    "test_db.py": "def _():\n    import pkg.db\n",
+    "test_plain.py": "from ward import test\n",
+}
+
+
+@fixture
+def project():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        for name, source in PROJECT.items():
+            (root / name).parent.mkdir(exist_ok=True)
+            (root / name).write_text(source)
+        yield root
+
+
+def selected(root: Path, *changed: str) -> list:
+    modules = get_info_for_modules([root], ())
+    graph = ImportGraph(project_root=root)
+    kept = filter_modules_by_imports(modules, set(changed), graph)
+    return sorted(module.name for module in kept)
+
+
+@test("read_imports finds every import statement, including nested ones")
+def _():
+    source = dedent(
+        """
+        import a.b, c
+        from .d import e, f
+        from .. import g
+        from h import *
+
+        def fn():
+            import i
+        """
+    )
+
+    assert read_imports(source) == [
+        (0, "a.b", []),
+        (0, "c", []),
+        (1, "d", ["e", "f"]),
+        (2, "", ["g"]),
+        (0, "h", []),
+        (0, "i", []),
+    ]
+
+
+@test("imported_module_names({ref!r}, {package!r}) == {expected}")
+def _(
+    ref=each((0, "a.b", []), (1, "d", ["e"]), (2, "", ["g"]), (3, "x", [])),
+    package=each("", "p.q", "p.q", "p"),
+    expected=each(["a", "a.b"], ["p", "p.q", "p.q.d", "p.q.d.e"], ["p", "p.g"], []),
+):
+    assert imported_module_names(ref, package) == expected
+
+
+@test("filter_modules_by_imports keeps test modules that import a changed file")
+def _(root=project):
+    assert selected(root, "pkg/util.py") == ["test_calc"]
+    assert selected(root, "pkg/db.py") == ["test_db"]
+    assert selected(root, "pkg/__init__.py") == ["test_calc", "test_db"]
+    assert selected(root, "test_plain.py") == ["test_plain"]
+    assert selected(root, "README.md") == []
+
+
+@test("filter_modules_by_imports keeps test modules that import a deleted file")
+def _(root=project):
+    (root / "pkg" / "util.py").unlink()
+    (root / "pkg" / "db.py").rename(root / "pkg" / "database.py")
+
+    assert selected(root, "pkg/util.py") == ["test_calc"]
+    assert selected(root, "pkg/db.py", "pkg/database.py") == ["test_db"]
+    assert selected(root, "pkg/missing.py") == []
+
+
+@test("ImportGraph only parses files again if their contents have changed")
+def _(root=project):
+    cache = ProjectCache(root / ".ward_cache")
+    graph = ImportGraph(project_root=root)
+    graph.imports_of(root / "pkg" / "calc.py")
+    graph.save(cache)
+
+    graph = ImportGraph.load(cache, root)
+    (root / "pkg" / "calc.py").write_text(PROJECT["pkg/calc.py"])
+    # The contents are the same, so the imports are read from the cache (as JSON).
+    assert graph.imports_of(root / "pkg" / "calc.py") == [[1, "util", ["helper"]]]
+
+    (root / "pkg" / "calc.py").write_text("import pkg.db\n")
+    assert graph.imports_of(root / "pkg" / "calc.py") == [(0, "pkg.db", [])]
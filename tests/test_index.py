@@ -0,0 +1,145 @@
+import os
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+
+from ward import fixture, test
+from ward._collect import (
+    filter_tests,
+    get_info_for_modules,
+    get_module_paths,
+    get_tests_in_modules,
+    load_modules,
+)
+from ward._index import CollectionIndex
+from ward.expect import raises
+from ward.testing import TestOutcome
+
+INDEXED_MODULE = dedent(
+    """
+    from ward import each, skip, test
+
+    @test("simple test", tags=["unit"])
+    def _():
+        assert 1 == 1
+
+    @skip("not today")
+    @test("parameterised test {x}")
+    def _(x=each(1, 2, 3)):
+        assert x
+    """
+)
+
+
+@fixture
+def index_project():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        (root / "sub" / "deeper").mkdir(parents=True)
+        (root / "sub" / "test_indexed.py").write_text(INDEXED_MODULE)
+        (root / "sub" / "deeper" / "test_deeper.py").write_text(INDEXED_MODULE)
+        yield root
+
+
+def collect(root: Path, index: CollectionIndex):
+    mod_infos = get_info_for_modules([root], (), index)
+    module_paths = get_module_paths(mod_infos)
+    tests = get_tests_in_modules(load_modules(mod_infos))
+    return module_paths, tests
+
+
+@test("get_info_for_modules finds the same modules with and without an index")
+def _(root=index_project):
+    index = CollectionIndex(exclude=[])
+    without_index = get_module_paths(get_info_for_modules([root], ()))
+
+    first = get_module_paths(get_info_for_modules([root], (), index))
+    second = get_module_paths(get_info_for_modules([root], (), index))
+
+    assert without_index == first == second
+    assert [p.name for p in first] == ["test_indexed.py", "test_deeper.py"]
+
+
+@test("CollectionIndex.get_dir only returns listings for unchanged directories")
+def _(root=index_project):
+    index = CollectionIndex(exclude=[])
+    get_info_for_modules([root], (), index)
+    sub = root / "sub"
+
+    assert index.get_dir(sub).modules == [("test_indexed", False)]
+
+    (sub / "test_new.py").write_text(INDEXED_MODULE)
+    os.utime(sub, ns=(0, 0))
+
+    assert index.get_dir(sub) is None
+    assert index.get_dir(sub / "deeper") is not None
+
+
+@test("CollectionIndex.get_session returns None once a collected module changes")
+def _(root=index_project):
+    index = CollectionIndex(exclude=[])
+    module_paths, tests = collect(root, index)
+    index.record_session(module_paths, tests, num_fixtures=0, project_root=root)
+
+    assert index.get_session(module_paths) is not None
+    assert index.get_session(module_paths[:1]) is None
+
+    module_paths[0].write_text(INDEXED_MODULE + "\n# changed\n")
+
+    assert index.get_session(module_paths) is None
+
+
+@test("CollectionIndex.get_tests rebuilds the collected tests so they can be dry-run")
+def _(root=index_project):
+    index = CollectionIndex(exclude=[])
+    module_paths, tests = collect(root, index)
+    index.record_session(module_paths, tests, num_fixtures=0, project_root=root)
+
+    indexed_tests = index.get_tests(module_paths)
+
+    def info(t):
+        return (
+            t.path,
+            t.module_name,
+            t.qualified_name,
+            t.line_number,
+            t.description,
+            t.tags,
+            getattr(t.marker, "reason", None),
+            t.source,
+            [(i.qualified_name, i.path) for i in t.get_parameterised_instances()],
+        )
+
+    assert [info(t) for t in indexed_tests] == [info(t) for t in tests]
+    assert all(
+        t.run(cache=None, dry_run=True).outcome == TestOutcome.DRYRUN
+        for t in indexed_tests
+    )
+
+
+@test("Tests read from the index don't run any of the code they were collected from")
+def _(root=index_project):
+    index = CollectionIndex(exclude=[])
+    module_paths, tests = collect(root, index)
+    index.record_session(module_paths, tests, num_fixtures=0, project_root=root)
+
+    indexed_test = index.get_tests(module_paths)[0]
+
+    assert indexed_test.fn is not tests[0].fn
+    with raises(RuntimeError):
+        indexed_test.fn()
+    assert filter_tests([indexed_test], query="assert 1 == 1") == [indexed_test]
+
+
+@test("Tests only skipped when a callable says so aren't read from the index")
+def _(root=index_project):
+    (root / "sub" / "test_indexed.py").write_text(
+        INDEXED_MODULE.replace(
+            '@skip("not today")', '@skip("not today", when=lambda: 1)'
+        )
+    )
+    index = CollectionIndex(exclude=[])
+    module_paths, tests = collect(root, index)
+    index.record_session(module_paths, tests, num_fixtures=0, project_root=root)
+
+    assert index.get_tests(module_paths) is None
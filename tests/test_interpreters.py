@@ -0,0 +1,97 @@
+import pickle
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+
+from ward import skip, test
+from ward._collect import get_info_for_modules, get_tests_in_modules, load_modules
+from ward._errors import FixtureError
+from ward._interpreters import (
+    InterpreterPoolRunner,
+    _finish,
+    _needs_main_interpreter,
+    _run_unit,
+    interpreters_available,
+)
+from ward._parallel import WorkerSpec, WorkUnit
+from ward._rewrite import rewrite_assertions_in_tests
+from ward._suite import Suite
+from ward.testing import Test, TestOutcome, TestResult, each
+
+INCOMPATIBLE = ImportError("module _fake does not support loading in subinterpreters")
+
+INTERPRETER_MODULE = dedent(
+    """
+    from ward import test
+
+    @test("passes")
+    def _():
+        assert True
+
+    @test("imports an incompatible extension module")
+    def _():
+        raise ImportError("module _fake does not support loading in subinterpreters")
+    """
+)
+
+
+def failed_with(error: BaseException) -> TestResult:
+    return TestResult(Test(fn=lambda: None, module_name="mod"), TestOutcome.FAIL, error)
+
+
+def caused_by(error: BaseException) -> FixtureError:
+    try:
+        raise FixtureError("Unable to resolve fixture 'f'") from error
+    except FixtureError as e:
+        return e
+
+
+@test("_needs_main_interpreter is {expected} for a test that failed with {description}")
+def _(
+    description=each(
+        "an incompatible extension module",
+        "a fixture that imported one",
+        "any other ImportError",
+    ),
+    error=each(INCOMPATIBLE, caused_by(INCOMPATIBLE), ImportError("no module named x")),
+    expected=each(True, True, False),
+):
+    assert _needs_main_interpreter(failed_with(error)) is expected
+
+
+@test("_run_unit reports the tests that have to run in the main interpreter")
+def _():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        path = root / "test_interpreter_unit.py"
+        path.write_text(INTERPRETER_MODULE)
+        spec = WorkerSpec(project_root=root, capture_output=True, dry_run=False)
+        unit = WorkUnit(id=0, path=path, positions=[0, 1])
+
+        try:
+            results, positions = pickle.loads(
+                _run_unit(pickle.dumps(spec), pickle.dumps(unit))
+            )
+        finally:
+            _finish()
+
+    assert [(r.index, r.outcome) for r in results] == [(0, TestOutcome.PASS)]
+    assert positions == [1]
+
+
+@skip("subinterpreters require Python 3.14+", when=not interpreters_available())
+@test("InterpreterPoolRunner runs tests in subinterpreters, falling back if needed")
+def _():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        (root / "test_interpreter_pool.py").write_text(INTERPRETER_MODULE)
+        modules = load_modules(get_info_for_modules([root], ()))
+        suite = Suite(tests=rewrite_assertions_in_tests(get_tests_in_modules(modules)))
+        runner = InterpreterPoolRunner(suite=suite, num_workers=1, project_root=root)
+
+        results = list(runner.generate_test_runs())
+
+    assert sorted((r.test.description, r.outcome) for r in results) == [
+        ("imports an incompatible extension module", TestOutcome.FAIL),
+        ("passes", TestOutcome.PASS),
+    ]
@@ -0,0 +1,78 @@
+import tempfile
+from pathlib import Path
+
+from tests.utilities import testable_test
+from ward import each, fixture, test
+from ward._cache import ProjectCache
+from ward._durations import test_key
+from ward._last_failed import LastFailed
+from ward._results import ResultRecord
+from ward.testing import Test, TestOutcome, TestResult
+
+
+@fixture
+def cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield ProjectCache(root=Path(tmp) / ".ward_cache")
+
+
+def make_test(description: str) -> Test:
+    @testable_test
+    def _():
+        pass
+
+    _.ward_meta.description = description
+    return Test(fn=_, module_name="test_x", description=description)
+
+
+def make_record(t: Test, outcome: TestOutcome) -> ResultRecord:
+    return ResultRecord.from_result(TestResult(t, outcome))
+
+
+A, B, C = make_test("a"), make_test("b"), make_test("c")
+
+
+@test("LastFailed.select with failed_first={failed_first} returns {expected}")
+def _(
+    failed_first=each(False, True),
+    expected=each(["c"], ["c", "a", "b"]),
+):
+    last_failed = LastFailed(project_root=None, keys={test_key(C, None)})
+
+    selected = last_failed.select([A, B, C], failed_first=failed_first)
+
+    assert [t.description for t in selected] == expected
+
+
+@test("LastFailed.select returns every test if none of them failed last time")
+def _():
+    last_failed = LastFailed(project_root=None, keys={"test_gone.py::_::gone"})
+
+    assert last_failed.select([A, B, C]) == [A, B, C]
+
+
+@test("LastFailed remembers failures until the test runs without failing")
+def _(cache=cache):
+    last_failed = LastFailed(project_root=None)
+    last_failed.record(
+        [make_record(A, TestOutcome.FAIL), make_record(B, TestOutcome.FAIL)]
+    )
+    last_failed.save(cache)
+
+    last_failed = LastFailed.load(cache, project_root=None)
+    last_failed.record(
+        [make_record(A, TestOutcome.PASS), make_record(C, TestOutcome.DRYRUN)]
+    )
+
+    assert last_failed.keys == {test_key(B, None)}
+
+
+@test("LastFailed treats a test as failed if any of its instances failed")
+def _():
+    last_failed = LastFailed(project_root=None)
+
+    last_failed.record(
+        [make_record(A, TestOutcome.PASS), make_record(A, TestOutcome.FAIL)]
+    )
+
+    assert last_failed.keys == {test_key(A, None)}
@@ -0,0 +1,61 @@
+import tracemalloc
+
+from ward import each, test
+from ward._memory import current_rss, format_bytes, memory_profile
+
+
+@test("memory_profile measures the peak and retained memory of the block")
+def _():
+    retained = []
+    with memory_profile() as memory:
+        freed = bytearray(4_000_000)
+        del freed
+        retained.append(bytearray(1_000_000))
+
+    assert memory is not None
+    assert memory.peak >= 4_000_000
+    assert 1_000_000 <= memory.retained < 2_000_000
+    location, size = memory.top_allocations[0]
+    assert location.startswith(f"{__file__}:")
+    assert size >= 1_000_000
+
+
+@test("memory_profile measures the change in RSS where it can be read")
+def _():
+    with memory_profile() as memory:
+        pass
+
+    assert memory is not None
+    assert (memory.rss_delta is None) == (current_rss() is None)
+
+
+@test("memory_profile yields None and leaves tracing alone if it isn't enabled")
+def _():
+    was_tracing = tracemalloc.is_tracing()
+    with memory_profile(enabled=False) as memory:
+        assert tracemalloc.is_tracing() == was_tracing
+
+    assert memory is None
+
+
+@test("memory_profile restores tracing if it was already tracing")
+def _():
+    # Tracing is restarted in case this test is itself being profiled.
+    tracemalloc.stop()
+    tracemalloc.start(5)
+    try:
+        with memory_profile():
+            pass
+
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traceback_limit() == 5
+    finally:
+        tracemalloc.stop()
+
+
+@test("format_bytes({num_bytes}) returns {expected!r}")
+def _(
+    num_bytes=each(0, 1023, 1536, -2 * 1024**2, 3 * 1024**4),
+    expected=each("0 B", "1023 B", "1.5 KiB", "-2.0 MiB", "3072.0 GiB"),
+):
+    assert format_bytes(num_bytes) == expected
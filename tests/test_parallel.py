@@ -0,0 +1,349 @@
+import multiprocessing
+import pickle
+import signal
+import tempfile
+import threading
+import time
+from pathlib import Path
+from textwrap import dedent
+from unittest import mock
+
+from tests.utilities import testable_test
+from ward import Scope, _parallel, fixture, raises, skip, test
+from ward._collect import get_info_for_modules, get_tests_in_modules, load_modules
+from ward._errors import WorkerError
+from ward._parallel import (
+    ProcessPoolRunner,
+    ThreadPoolRunner,
+    make_work_units,
+    schedule_work_units,
+)
+from ward._rewrite import rewrite_assertions_in_tests
+from ward._suite import Suite
+from ward.expect import TestAssertionFailure, assert_equal
+from ward.testing import Test, TestOutcome, TestResult
+
+TEST_MODULE = dedent(
+    """
+    from ward import Scope, each, fixture, test
+
+    CALLS = []
+
+    @fixture(scope=Scope.Module)
+    def module_fixture():
+        CALLS.append(1)
+        return len(CALLS)
+
+    @test("passes {x}")
+    def _(x=each(1, 2, 3), calls=module_fixture):
+        assert calls == 1
+
+    @test("fails")
+    def _():
+        assert 1 == 2
+
+    @test("errors")
+    def _():
+        raise ValueError("boom")
+    """
+)
+
+
+@fixture
+def parallel_project():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        (root / "test_parallel_one.py").write_text(TEST_MODULE)
+        (root / "test_parallel_two.py").write_text(TEST_MODULE)
+        yield root
+
+
+@fixture
+def parallel_suite(root=parallel_project):
+    modules = load_modules(get_info_for_modules([root], ()))
+    tests = rewrite_assertions_in_tests(get_tests_in_modules(modules))
+    return Suite(tests=tests)
+
+
+@test("make_work_units creates a single unit for each module")
+def _(suite=parallel_suite):
+    units = make_work_units(suite.tests)
+
+    assert [unit.path.name for unit in units] == [
+        "test_parallel_one.py",
+        "test_parallel_two.py",
+    ]
+    assert [unit.positions for unit in units] == [[0, 1, 2], [0, 1, 2]]
+
+
+@test("schedule_work_units hands out the units expected to take longest first")
+def _(suite=parallel_suite):
+    units = make_work_units(suite.tests)
+    slow_module = units[1].path
+
+    scheduled = schedule_work_units(
+        units, num_workers=1, estimate=lambda t: 5.0 if t.path == slow_module else 1.0
+    )
+
+    assert [unit.path for unit in scheduled] == [slow_module, units[0].path]
+    assert [unit.id for unit in scheduled] == [0, 1]
+
+
+@test("schedule_work_units splits a unit that would take more than a fair share")
+def _(suite=parallel_suite):
+    units = make_work_units(suite.tests)
+    slow_module = units[0].path
+
+    scheduled = schedule_work_units(
+        units, num_workers=2, estimate=lambda t: 10.0 if t.path == slow_module else 1.0
+    )
+
+    assert [(unit.path, unit.positions) for unit in scheduled] == [
+        (slow_module, [0, 1]),
+        (slow_module, [2]),
+        (units[1].path, [0, 1, 2]),
+    ]
+
+
+@test("ProcessPoolRunner runs every test instance in worker processes")
+def _(suite=parallel_suite, root=parallel_project):
+    runner = ProcessPoolRunner(suite=suite, num_workers=2, project_root=root)
+
+    results = list(runner.generate_test_runs())
+    outcomes = sorted(
+        (r.test.path.name, r.test.description, r.outcome) for r in results
+    )
+
+    expected = []
+    for name in ("test_parallel_one.py", "test_parallel_two.py"):
+        expected += [
+            (name, "errors", TestOutcome.FAIL),
+            (name, "fails", TestOutcome.FAIL),
+            (name, "passes 1", TestOutcome.PASS),
+            (name, "passes 2", TestOutcome.PASS),
+            (name, "passes 3", TestOutcome.PASS),
+        ]
+    assert outcomes == expected
+
+
+@test("ProcessPoolRunner leaves the collected tests as they were")
+def _(suite=parallel_suite, root=parallel_project):
+    runner = ProcessPoolRunner(suite=suite, num_workers=2, project_root=root)
+
+    results = list(runner.generate_test_runs())
+
+    assert all(r.test.timer is not None for r in results)
+    assert [t.description for t in suite.tests] == ["passes {x}", "fails", "errors"] * 2
+    assert all(t.timer is None for t in suite.tests)
+
+
+@test("ProcessPoolRunner sends back errors that can be displayed")
+def _(suite=parallel_suite, root=parallel_project):
+    runner = ProcessPoolRunner(suite=suite, num_workers=2, project_root=root)
+
+    results = list(runner.generate_test_runs())
+    errors = [r for r in results if r.test.description == "errors"]
+
+    assert all(isinstance(r.error, WorkerError) for r in errors)
+    assert all("ValueError: boom" in str(r.error) for r in errors)
+
+
+FORK_MODULE = dedent(
+    """
+    import os
+
+    from ward import test
+
+    IMPORTED_BY = os.getpid()
+
+    @test("module was imported by another process")
+    def _():
+        assert IMPORTED_BY != os.getpid()
+    """
+)
+
+
+@skip(
+    "forking is not supported on this platform",
+    when="fork" not in multiprocessing.get_all_start_methods(),
+)
+@test("ProcessPoolRunner with the fork start method doesn't import modules again")
+def _():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        (root / "test_parallel_fork.py").write_text(FORK_MODULE)
+        modules = load_modules(get_info_for_modules([root], ()))
+        suite = Suite(tests=rewrite_assertions_in_tests(get_tests_in_modules(modules)))
+        runner = ProcessPoolRunner(
+            suite=suite, num_workers=1, project_root=root, start_method="fork"
+        )
+
+        results = list(runner.generate_test_runs())
+
+    assert [r.outcome for r in results] == [TestOutcome.PASS]
+
+
+STUCK_MODULE = dedent(
+    """
+    import signal
+    import time
+
+    from ward import test
+
+    @test("before")
+    def _():
+        pass
+
+    @test("stuck", timeout=0.1)
+    def _():
+        # The worker can't interrupt the test, so it has to be killed.
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        time.sleep(30)
+
+    @test("after")
+    def _():
+        pass
+    """
+)
+
+
+@skip(
+    "signals can't be blocked on this platform",
+    when=not hasattr(signal, "pthread_sigmask"),
+)
+@test("ProcessPoolRunner kills and replaces a worker running a test that times out")
+def _():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        (root / "test_parallel_stuck.py").write_text(STUCK_MODULE)
+        modules = load_modules(get_info_for_modules([root], ()))
+        suite = Suite(tests=rewrite_assertions_in_tests(get_tests_in_modules(modules)))
+        runner = ProcessPoolRunner(suite=suite, num_workers=2, project_root=root)
+
+        start = time.monotonic()
+        with mock.patch.object(_parallel, "_KILL_GRACE_SECS", 0.5):
+            results = list(runner.generate_test_runs())
+
+    outcomes = {r.test.description: r.outcome for r in results}
+    stuck = next(r for r in results if r.test.description == "stuck")
+    assert time.monotonic() - start < 30
+    assert outcomes == {
+        "before": TestOutcome.PASS,
+        "stuck": TestOutcome.TIMEOUT,
+        "after": TestOutcome.PASS,
+    }
+    assert "test_parallel_stuck.py" in stuck.message
+
+
+@test("ThreadPoolRunner runs every test instance in a pool of threads")
+def _(suite=parallel_suite):
+    runner = ThreadPoolRunner(suite=suite, num_workers=2)
+
+    results = list(runner.generate_test_runs())
+    outcomes = sorted(
+        (r.test.path.name, r.test.description, r.outcome) for r in results
+    )
+
+    expected = []
+    for name in ("test_parallel_one.py", "test_parallel_two.py"):
+        expected += [
+            (name, "errors", TestOutcome.FAIL),
+            (name, "fails", TestOutcome.FAIL),
+            (name, "passes 1", TestOutcome.PASS),
+            (name, "passes 2", TestOutcome.PASS),
+            (name, "passes 3", TestOutcome.PASS),
+        ]
+    assert outcomes == expected
+
+
+@test("ThreadPoolRunner captures the output of each thread separately")
+def _():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def make_test(name):
+        @testable_test
+        def t():
+            print(f"{name} before")
+            barrier.wait()
+            print(f"{name} after")
+            assert False
+
+        return Test(fn=t, module_name="test_x")
+
+    runner = ThreadPoolRunner(
+        suite=Suite(tests=[make_test("a"), make_test("b")]), num_workers=2
+    )
+    results = list(runner.generate_test_runs())
+
+    assert sorted(r.captured_stdout for r in results) == [
+        "a before\na after\n",
+        "b before\nb after\n",
+    ]
+
+
+@test("ThreadPoolRunner resolves a fixture needed by several threads at once once")
+def _():
+    events = []
+
+    @fixture(scope=Scope.Global)
+    def shared():
+        events.append("resolve")
+        time.sleep(0.05)
+        yield
+        events.append("teardown")
+
+    def make_test():
+        @testable_test
+        def t(s=shared):
+            pass
+
+        return Test(fn=t, module_name="test_x")
+
+    runner = ThreadPoolRunner(
+        suite=Suite(tests=[make_test() for _ in range(4)]), num_workers=4
+    )
+    results = list(runner.generate_test_runs())
+
+    assert [r.outcome for r in results] == [TestOutcome.PASS] * 4
+    assert events == ["resolve", "teardown"]
+
+
+@test("ThreadPoolRunner tears down global fixtures when the session ends early")
+def _():
+    events = []
+
+    @fixture(scope=Scope.Global)
+    def shared():
+        yield
+        events.append("teardown")
+
+    def make_test():
+        @testable_test
+        def t(s=shared):
+            pass
+
+        return Test(fn=t, module_name="test_x")
+
+    runner = ThreadPoolRunner(
+        suite=Suite(tests=[make_test() for _ in range(4)]), num_workers=2
+    )
+    runs = runner.generate_test_runs()
+    next(runs)
+    runs.close()
+
+    assert events == ["teardown"]
+
+
+@test("Assertion failures are sent from workers with summaries of their operands")
+def _():
+    with raises(TestAssertionFailure) as ctx:
+        assert_equal(lambda: None, 1, "msg")
+    result = TestResult(
+        Test(fn=lambda: None, module_name="mod"), TestOutcome.FAIL, ctx.raised
+    )
+
+    error = _parallel._transferable_error(result.error, result.failure)
+    sent = pickle.loads(pickle.dumps(error))
+
+    assert (sent.lhs, sent.rhs) == (result.failure.lhs, result.failure.rhs)
+    assert str(sent) == str(ctx.raised)
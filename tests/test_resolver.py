@@ -1,5 +1,9 @@
-from tests.utilities import dummy_fixture
-from ward import each, test
+import asyncio
+
+from tests.utilities import dummy_fixture, testable_test
+from ward import Scope, each, fixture, raises, test
+from ward._errors import FixtureError
+from ward._fixtures import FixtureCache, ResolutionPlan
 from ward.fixtures import Fixture
 from ward.testing import Test
 
@@ -33,3 +37,126 @@ def _():
         "b": Fixture(dummy_fixture),
     }
     assert fourth.resolver.fixtures == {}
+
+
+@test("ResolutionPlan orders each fixture after the fixtures it depends on")
+def _():
+    @fixture
+    def a():
+        return "a"
+
+    @fixture
+    def b(a=a):
+        return a + "b"
+
+    @fixture
+    def c(a=a, b=b, plain=1):
+        return a + b + str(plain)
+
+    @testable_test
+    def t(c=c, b=b, x=each(1, 2)):
+        pass
+
+    plan = ResolutionPlan.for_function(t)
+
+    assert [node.fn for node in plan.nodes] == [a, b, c]
+    assert plan.nodes[2].args == [("a", 0, None), ("b", 1, None), ("plain", None, 1)]
+
+
+@test("ResolutionPlan is built once and shared by parameterised instances")
+def _():
+    @testable_test
+    def t(a=dummy_fixture, x=each(1, 2, 3)):
+        pass
+
+    parent = Test(t, module_name="")
+    instances = parent.get_parameterised_instances()
+
+    assert all(i.resolution_plan is parent.resolution_plan for i in instances)
+
+
+@test("ResolutionPlan.resolve resolves each instance and reuses cached fixtures")
+def _():
+    calls = []
+
+    @fixture
+    def per_test(x=1):
+        calls.append("per_test")
+        return x
+
+    @fixture(scope=Scope.Module)
+    def per_module(p=per_test):
+        calls.append("per_module")
+        return p + 1
+
+    @testable_test
+    def t(m=per_module, v=each("a", "b")):
+        pass
+
+    cache = FixtureCache()
+    first, second = Test(t, module_name="").get_parameterised_instances()
+
+    assert first.resolver.resolve_args(cache) == {"m": 2, "v": "a"}
+    assert second.resolver.resolve_args(cache) == {"m": 2, "v": "b"}
+    # per_test is only needed to resolve per_module, which is cached after the first test
+    assert calls == ["per_test", "per_module"]
+
+
+@test("ResolutionPlan.resolve awaits independent async fixtures concurrently")
+def _():
+    running = []
+    peak = []
+
+    async def stub(name):
+        running.append(name)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(name)
+        return name
+
+    @fixture
+    async def http_a():
+        return await stub("http_a")
+
+    @fixture
+    async def http_b():
+        return await stub("http_b")
+
+    @fixture
+    async def pool(a=http_a):
+        return await stub(f"pool({a})")
+
+    @testable_test
+    async def t(a=http_a, b=http_b, p=pool):
+        pass
+
+    cache = FixtureCache()
+    args = Test(t, module_name="").resolver.resolve_args(cache)
+    cache.loop.close()
+
+    assert args == {"a": "http_a", "b": "http_b", "p": "pool(http_a)"}
+    # pool depends on http_a, so it's only resolved once http_a has been
+    assert peak == [1, 2, 1]
+
+
+@test("ResolutionPlan.resolve reports the first failing fixture, in argument order")
+def _():
+    @fixture
+    async def slow_failure():
+        await asyncio.sleep(0.01)
+        raise ValueError("slow")
+
+    @fixture
+    async def fast_failure():
+        raise ValueError("fast")
+
+    @testable_test
+    async def t(slow=slow_failure, fast=fast_failure):
+        pass
+
+    cache = FixtureCache()
+    with raises(FixtureError) as exc_info:
+        Test(t, module_name="").resolver.resolve_args(cache)
+    cache.loop.close()
+
+    assert "slow_failure" in str(exc_info.raised)
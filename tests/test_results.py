@@ -0,0 +1,148 @@
+import gc
+import tempfile
+import weakref
+from pathlib import Path
+
+from tests.utilities import testable_test
+from ward import fixture, test
+from ward._cache import ProjectCache
+from ward._fixtures import FixtureCache
+from ward._memory import MemoryUsage
+from ward._results import ResultRecord, ResultStore
+from ward._terminal import get_exit_code
+from ward._testing import _Timer
+from ward.models import ExitCode
+from ward.testing import Test, TestOutcome, TestResult, each
+
+
+def make_result(
+    description: str, outcome: TestOutcome, duration: float = 1.0
+) -> TestResult:
+    @testable_test
+    def _():
+        pass
+
+    t = Test(fn=_, module_name="mod", description=description, timer=_Timer(duration))
+    error = ZeroDivisionError("oops") if outcome == TestOutcome.FAIL else None
+    return TestResult(t, outcome, error)
+
+
+@fixture
+def store():
+    with ResultStore.open(num_slowest=2) as store:
+        yield store
+
+
+@test("ResultStore counts outcomes and only keeps failing results in full")
+def _(store: ResultStore = store):
+    results = [
+        make_result("a", TestOutcome.PASS),
+        make_result("b", TestOutcome.FAIL),
+        make_result("c", TestOutcome.SKIP),
+        make_result("d", TestOutcome.PASS),
+    ]
+    for result in results:
+        store.add(result)
+
+    assert len(store) == 4
+    assert store.outcome_counts == {
+        TestOutcome.PASS: 2,
+        TestOutcome.FAIL: 1,
+        TestOutcome.SKIP: 1,
+    }
+    assert [(r.test, r.failure) for r in store.failures] == [
+        (results[1].test, results[1].failure)
+    ]
+    assert store.failures[0].error is None
+    assert get_exit_code(store) == ExitCode.FAILED
+
+
+@test("ResultStore doesn't keep the frames of a failing test alive")
+def _(store: ResultStore = store):
+    class Local:
+        pass
+
+    refs = []
+
+    @testable_test
+    def _():
+        local = Local()
+        refs.append(weakref.ref(local))
+        assert local is None
+
+    store.add(Test(fn=_, module_name="mod").run(FixtureCache()))
+    gc.collect()
+
+    failure = store.failures[0].failure
+    assert failure is not None and failure.trace is not None
+    assert refs[0]() is None
+
+
+@test("ResultStore reads back a compact record of every result in order")
+def _(store: ResultStore = store):
+    store.add(make_result("a", TestOutcome.PASS))
+    store.add(make_result("b", TestOutcome.FAIL))
+
+    records = list(store)
+
+    assert [(r.description, r.outcome) for r in records] == [
+        ("a", TestOutcome.PASS),
+        ("b", TestOutcome.FAIL),
+    ]
+    assert records[1].failure == "ZeroDivisionError: oops"
+    assert records[0].failure is None
+    # Reading the records back doesn't get in the way of adding more.
+    store.add(make_result("c", TestOutcome.PASS))
+    assert [r.description for r in store] == ["a", "b", "c"]
+
+
+@test("ResultStore keeps the {num_slowest} slowest records, slowest first")
+def _(num_slowest=each(0, 2, 5), expected=each([], ["b", "d"], ["b", "d", "a", "c"])):
+    with ResultStore.open(num_slowest=num_slowest) as store:
+        for description, duration in [("a", 2.0), ("b", 4.0), ("c", 1.0), ("d", 3.0)]:
+            store.add(make_result(description, TestOutcome.PASS, duration))
+
+        assert [r.description for r in store.slowest] == expected
+        assert list(store.durations) == [2.0, 4.0, 1.0, 3.0]
+
+
+@test("ResultStore keeps the records of the tests with the highest peak memory use")
+def _():
+    with ResultStore.open(num_memory_hungriest=2) as store:
+        for description, peak in [("a", 20), ("b", 40), ("c", None), ("d", 30)]:
+            result = make_result(description, TestOutcome.PASS)
+            if peak is not None:
+                result.memory = MemoryUsage(peak=peak)
+            store.add(result)
+
+        assert [r.description for r in store.memory_hungriest] == ["b", "d"]
+
+
+@test("ResultRecord keeps the memory used by a test through JSON")
+def _():
+    result = make_result("a", TestOutcome.PASS)
+    result.memory = MemoryUsage(
+        peak=100, retained=10, rss_delta=-4096, top_allocations=[("x.py:1", 10)]
+    )
+
+    record = ResultRecord.from_json(ResultRecord.from_result(result).to_json())
+
+    assert record.memory == result.memory
+
+
+@test("ResultStores opened in the same project cache don't share a file")
+def _():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ProjectCache(root=Path(tmp) / ".ward_cache")
+        with ResultStore.open(cache) as first, ResultStore.open(cache) as second:
+            first.add(make_result("a", TestOutcome.PASS))
+            second.add(make_result("b", TestOutcome.PASS))
+
+            assert [r.description for r in first] == ["a"]
+            assert [r.description for r in second] == ["b"]
+        assert list(cache.root.iterdir()) == [cache.root / ".gitignore"]
+
+
+@test("get_exit_code returns ExitCode.NO_TESTS_FOUND for an empty ResultStore")
+def _(store: ResultStore = store):
+    assert get_exit_code(store) == ExitCode.NO_TESTS_FOUND
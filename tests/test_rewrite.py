@@ -1,15 +1,29 @@
 import ast
+import marshal
+import sys
+import tempfile
+import types
+from pathlib import Path
+from textwrap import dedent
 
 from tests.utilities import testable_test
-from ward import fixture, test
+from ward import fixture, raises, test
+from ward._collect import get_info_for_modules, get_tests_in_modules, load_modules
 from ward._rewrite import (
+    _CACHE_HEADER_SIZE,
+    AssertionRewritingHook,
+    AssertionRewritingLoader,
     RewriteAssert,
+    assert_func_namespace,
     get_assertion_msg,
     is_binary_comparison,
     is_comparison_type,
     make_call_node,
     rewrite_assertions_in_tests,
+    rewrite_module_source,
+    rewritten_cache_path,
 )
+from ward.expect import TestAssertionFailure
 from ward.testing import Test, each
 
 
@@ -226,3 +240,112 @@ def _():
     # The assertion rewriter thought the lambda function stored in co_consts was the test function,
     # so it was rebuilding the test function using the lambda as the test instead of the original function.
     assert rewritten.fn.__code__.co_name != "<lambda>"
+
+
+REWRITTEN_MODULE = dedent(
+    """
+    from ward import test
+
+    def helper(x):
+        assert x == 2
+
+    @test("a test")
+    def _():
+        assert 1 == 2
+    """
+)
+
+
+@fixture
+def rewrite_project():
+    dont_write_bytecode = sys.dont_write_bytecode
+    sys.dont_write_bytecode = False
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        (root / "test_rewritten.py").write_text(REWRITTEN_MODULE)
+        yield root
+    sys.dont_write_bytecode = dont_write_bytecode
+
+
+def load_rewritten_module(path: Path):
+    loader = AssertionRewritingLoader("test_rewritten", str(path))
+    module = types.ModuleType("test_rewritten")
+    module.__file__ = str(path)
+    loader.exec_module(module)
+    return module
+
+
+@test("rewrite_module_source rewrites assertions throughout the module")
+def _():
+    code = rewrite_module_source(REWRITTEN_MODULE.encode(), "test_rewritten.py")
+    namespace = {**assert_func_namespace, "__name__": "test_rewritten"}
+    exec(code, namespace)
+
+    with raises(TestAssertionFailure):
+        namespace["helper"](1)
+
+
+@test("AssertionRewritingLoader caches the rewritten module alongside the source")
+def _(root=rewrite_project):
+    path = root / "test_rewritten.py"
+
+    module = load_rewritten_module(path)
+
+    assert rewritten_cache_path(str(path)).exists()
+    with raises(TestAssertionFailure):
+        module.helper(1)
+
+
+@test("AssertionRewritingLoader reuses the cached module while the source is unchanged")
+def _(root=rewrite_project):
+    path = root / "test_rewritten.py"
+    cache_path = rewritten_cache_path(str(path))
+    load_rewritten_module(path)
+    header = cache_path.read_bytes()[:_CACHE_HEADER_SIZE]
+    cached_code = compile("CACHED = True", str(path), "exec")
+    cache_path.write_bytes(header + marshal.dumps(cached_code))
+
+    assert load_rewritten_module(path).CACHED
+
+    path.write_text(REWRITTEN_MODULE + "\n# changed\n")
+    assert not hasattr(load_rewritten_module(path), "CACHED")
+
+
+@test("rewrite_assertions_in_tests leaves tests from rewritten modules untouched")
+def _(root=rewrite_project):
+    modules = load_modules(get_info_for_modules([root], ()))
+    tests = get_tests_in_modules(modules)
+
+    assert rewrite_assertions_in_tests(tests) == tests
+    with raises(TestAssertionFailure):
+        tests[0].fn()
+
+
+@fixture
+def hook_project():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        for directory in ("tests", "elsewhere"):
+            (root / directory).mkdir()
+            (root / directory / "test_hooked.py").write_text(REWRITTEN_MODULE)
+        yield root
+
+
+@test("AssertionRewritingHook only rewrites test modules below its roots")
+def _(root=hook_project):
+    hook = AssertionRewritingHook()
+    hook.roots.add(root / "tests")
+
+    inside = hook.find_spec("test_hooked", [str(root / "tests")])
+    outside = hook.find_spec("test_hooked", [str(root / "elsewhere")])
+    not_a_test = hook.find_spec("tempfile")
+
+    assert inside is not None
+    assert isinstance(inside.loader, AssertionRewritingLoader)
+    assert outside is None
+    assert not_a_test is None
+
+
+@test("AssertionRewritingHook doesn't rewrite anything until it has roots")
+def _(root=hook_project):
+    assert AssertionRewritingHook().find_spec("test_hooked", [str(root)]) is None
@@ -0,0 +1,181 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+from tests.utilities import testable_test
+from ward import fixture, raises, test
+from ward._durations import DurationHistory
+from ward._sharding import load_durations_file, parse_shard, select_shard
+from ward.testing import Test, each
+
+ROOT = Path("project").absolute()
+
+
+def make_test(module: str, description: str) -> Test:
+    @testable_test
+    def _():
+        pass
+
+    _.ward_meta.path = ROOT / f"{module}.py"
+    _.ward_meta.description = description
+    return Test(fn=_, module_name=module, description=description)
+
+
+def make_tests(num_modules: int, tests_per_module: int):
+    return [
+        make_test(f"test_mod_{m}", f"test {t}")
+        for m in range(num_modules)
+        for t in range(tests_per_module)
+    ]
+
+
+@test("parse_shard parses {value!r} as {expected}")
+def _(value=each("1/1", "3/12", "12/12"), expected=each((1, 1), (3, 12), (12, 12))):
+    assert parse_shard(value) == expected
+
+
+@test("parse_shard rejects {value!r}")
+def _(value=each("3", "a/b", "0/2", "3/2", "1/0", "")):
+    with raises(click.BadParameter):
+        parse_shard(value)
+
+
+@test("select_shard splits the tests into disjoint shards which cover every test")
+def _():
+    tests = make_tests(num_modules=7, tests_per_module=3)
+    history = DurationHistory(project_root=ROOT)
+
+    shards = [select_shard(tests, (i, 3), history, ROOT) for i in range(1, 4)]
+
+    assert sorted(id(t) for shard in shards for t in shard) == sorted(
+        id(t) for t in tests
+    )
+    assert all(shards)
+
+
+@test("select_shard keeps every test in a module on the same shard")
+def _():
+    tests = make_tests(num_modules=5, tests_per_module=4)
+    history = DurationHistory(project_root=ROOT)
+
+    for i in range(1, 4):
+        shard = select_shard(tests, (i, 3), history, ROOT)
+        modules = {t.path for t in shard}
+        assert len(shard) == 4 * len(modules)
+
+
+@test("select_shard makes the same selection regardless of the order of tests")
+def _():
+    tests = make_tests(num_modules=6, tests_per_module=2)
+    history = DurationHistory(project_root=ROOT)
+
+    forward = select_shard(tests, (2, 4), history, ROOT)
+    backward = select_shard(list(reversed(tests)), (2, 4), history, ROOT)
+
+    assert sorted(id(t) for t in forward) == sorted(id(t) for t in backward)
+
+
+@test("select_shard balances the shards using recorded durations")
+def _():
+    tests = make_tests(num_modules=4, tests_per_module=1)
+    history = DurationHistory(
+        project_root=ROOT,
+        durations={
+            "test_mod_0.py::test_mod_0._::test 0[0]": 10.0,
+            "test_mod_1.py::test_mod_1._::test 0[0]": 4.0,
+            "test_mod_2.py::test_mod_2._::test 0[0]": 3.0,
+            "test_mod_3.py::test_mod_3._::test 0[0]": 2.0,
+        },
+    )
+
+    first = select_shard(tests, (1, 2), history, ROOT)
+    second = select_shard(tests, (2, 2), history, ROOT)
+
+    assert [t.module_name for t in first] == ["test_mod_0"]
+    assert [t.module_name for t in second] == ["test_mod_1", "test_mod_2", "test_mod_3"]
+
+
+@test("select_shard returns every test when there's a single shard")
+def _():
+    tests = make_tests(num_modules=2, tests_per_module=2)
+
+    assert (
+        select_shard(tests, (1, 1), DurationHistory(project_root=ROOT), ROOT) == tests
+    )
+
+
+@test("select_shard balances the shards by number of tests without durations")
+def _():
+    tests = make_tests(num_modules=1, tests_per_module=3) + [
+        make_test(f"test_small_{m}", "test") for m in range(3)
+    ]
+
+    first = select_shard(tests, (1, 2), project_root=ROOT)
+    second = select_shard(tests, (2, 2), project_root=ROOT)
+
+    assert {t.module_name for t in first} == {"test_mod_0"}
+    assert len(second) == 3
+
+
+@fixture
+def durations_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield Path(tmp) / "durations.json"
+
+
+@test("load_durations_file reads durations recorded in the project cache format")
+def _(path=durations_file):
+    path.write_text(json.dumps({"test_mod_0.py::test_mod_0._::test 0[0]": 1.5}))
+
+    history = load_durations_file(path, ROOT)
+
+    assert history.estimate(make_test("test_mod_0", "test 0")) == 1.5
+
+
+@test("load_durations_file rejects a file that doesn't contain durations")
+def _(path=durations_file, content=each("[1, 2]", "{not json")):
+    path.write_text(content)
+
+    with raises(click.BadParameter):
+        load_durations_file(path, ROOT)
+
+
+def run_shard(root: Path, shard: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-m", "ward", "--shard", shard, "--progress-style", "none"],
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": str(Path(__file__).parents[1])},
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout
+
+
+@test("Machines with different duration histories still split the tests between them")
+def _():
+    modules = [f"test_machine_{m}" for m in range(4)]
+    selected = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for shard, heaviest in [("1/2", modules[0]), ("2/2", modules[3])]:
+            # Each machine has only recorded the durations of the tests it ran.
+            root = Path(tmp) / shard.replace("/", "_of_")
+            (root / ".ward_cache").mkdir(parents=True)
+            (root / "pyproject.toml").write_text("[tool.ward]\n")
+            durations = {}
+            for module in modules:
+                (root / f"{module}.py").write_text(
+                    f"from ward import test\n\n@test('ran {module}')\ndef _():\n    pass\n"
+                )
+                key = f"{module}.py::{module}._::ran {module}[0]"
+                durations[key] = 10.0 if module == heaviest else 1.0
+            (root / ".ward_cache" / "durations.json").write_text(json.dumps(durations))
+
+            output = run_shard(root, shard)
+            selected += [module for module in modules if f"ran {module}" in output]
+
+    assert sorted(selected) == modules
@@ -0,0 +1,109 @@
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+
+from cucumber_tag_expressions import parse as parse_tags
+
+from ward import fixture, test
+from ward._collect import get_info_for_modules
+from ward._static import (
+    StaticTest,
+    filter_modules_statically,
+    read_static_tests,
+    static_test_matches,
+)
+from ward.testing import each
+
+STATIC_MODULE = dedent(
+    """
+    import ward
+    from ward import skip, test
+
+    @test("first test", tags=["unit", "fast"])
+    def _():
+        assert "needle" in "haystack needle"
+
+    @skip
+    @ward.test(description="second " "test")
+    def second():
+        pass
+    """
+)
+
+
+@test("read_static_tests reads the literal descriptions and tags of each test")
+def _():
+    tests = read_static_tests(STATIC_MODULE)
+
+    assert [(t.name, t.description, t.tags) for t in tests] == [
+        ("_", "first test", ["unit", "fast"]),
+        ("second", "second test", []),
+    ]
+    assert tests[0].source.startswith('@test("first test"')
+    assert "needle" in tests[0].source
+    assert "needle" not in tests[1].source
+
+
+@test("read_static_tests returns None when tests can't be read statically: {desc}")
+def _(
+    desc=each(
+        "description isn't a literal",
+        "tags aren't literals",
+        "test is used outside of a decorator",
+        "nothing is imported from ward",
+    ),
+    src=each(
+        "from ward import test\n@test(DESCRIPTION)\ndef _(): pass",
+        "from ward import test\n@test('a', tags=TAGS)\ndef _(): pass",
+        "from ward import test\ndecorator = test('a')",
+        "from helpers import my_test\n@my_test('a')\ndef _(): pass",
+    ),
+):
+    assert read_static_tests(src) is None
+
+
+@test("static_test_matches('{query}', '{tags}') is {expected}")
+def _(
+    query=each("", "first", "needle", "mod.", "mod._", "", "", "first", "missing"),
+    tags=each("", "", "", "", "", "unit", "slow", "fast", ""),
+    expected=each(True, True, True, True, True, True, False, True, False),
+):
+    static_test = StaticTest(
+        name="_",
+        description="first test",
+        tags=["unit", "fast"],
+        source="assert needle",
+    )
+    tag_expr = parse_tags(tags) if tags else None
+
+    assert static_test_matches(static_test, "mod", query, tag_expr) == expected
+
+
+@fixture
+def static_project():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        (root / "test_static_a.py").write_text(STATIC_MODULE)
+        (root / "test_static_b.py").write_text(
+            STATIC_MODULE.replace('"unit"', '"integration"')
+        )
+        (root / "test_static_c.py").write_text(
+            "from ward import test\n@test(DESCRIPTION)\ndef _(): pass\n"
+        )
+        yield root
+
+
+@test("filter_modules_statically keeps matching modules and unreadable modules")
+def _(root=static_project):
+    modules = get_info_for_modules([root], ())
+
+    kept = filter_modules_statically(modules, tag_expr=parse_tags("integration"))
+
+    assert sorted(m.name for m in kept) == ["test_static_b", "test_static_c"]
+
+
+@test("filter_modules_statically keeps every module when not filtering")
+def _(root=static_project):
+    modules = get_info_for_modules([root], ())
+
+    assert filter_modules_statically(modules) == modules
@@ -1,11 +1,20 @@
+import asyncio
 from unittest import mock
 
 from tests.utilities import NUMBER_OF_TESTS, example_test, module, testable_test
 from ward import fixture
-from ward._errors import ParameterisationError
-from ward._suite import Suite
-from ward.models import Scope, SkipMarker
-from ward.testing import Test, TestOutcome, TestResult, each, skip, test
+from ward._errors import FixtureError, ParameterisationError
+from ward._suite import Suite, group_tests
+from ward.models import CollectionMetadata, Scope, SkipMarker
+from ward.testing import (
+    Test,
+    TestOutcome,
+    TestResult,
+    each,
+    run_concurrently,
+    skip,
+    test,
+)
 
 
 @fixture
@@ -509,3 +518,171 @@ def _():
         len(results) == 1 + 2
     )  # the first test doesn't expand, and the 2nd test expands into 2 tests
     assert type(results[0].error) == ParameterisationError
+
+
+@test(
+    "Suite counts tests parameterised with iterables of unknown length as a lower bound"
+)
+def _():
+    @testable_test
+    def streamed(a=each(x for x in range(3))):
+        pass
+
+    @testable_test
+    def sized(a=each(1, 2), b=each(x for x in "ab")):
+        pass
+
+    suite = Suite(
+        tests=[
+            Test(fn=streamed, module_name="module1"),
+            Test(fn=sized, module_name="module1"),
+        ]
+    )
+
+    assert suite.num_tests_with_parameterisation == 2
+    assert suite.num_tests_is_lower_bound
+    assert len(list(suite.generate_test_runs())) == 3 + 2
+
+
+@test("Suite.generate_test_runs fails a streamed test once its values don't line up")
+def _():
+    @testable_test
+    def t(a=each(1, 2, 3), b=each(x for x in "ab")):
+        pass
+
+    results = list(Suite(tests=[Test(fn=t, module_name="m")]).generate_test_runs())
+
+    assert [r.outcome for r in results] == [TestOutcome.PASS] * 2 + [TestOutcome.FAIL]
+    assert type(results[-1].error) is ParameterisationError
+
+
+@test("Suite.generate_test_runs runs tests marked with @run_concurrently at once")
+def _():
+    running = []
+    peak = []
+
+    def make_test(i):
+        @testable_test
+        @run_concurrently
+        async def t():
+            running.append(i)
+            peak.append(len(running))
+            print(f"output of {i}")
+            await asyncio.sleep(0.01)
+            running.remove(i)
+            assert False
+
+        return Test(fn=t, module_name="test_x")
+
+    suite = Suite(tests=[make_test(i) for i in range(6)])
+    results = list(suite.generate_test_runs(async_concurrency=3))
+
+    assert max(peak) == 3
+    assert sorted(r.captured_stdout for r in results) == [
+        f"output of {i}\n" for i in range(6)
+    ]
+    assert all(r.test.timer.duration >= 0.01 for r in results)
+
+
+@test(
+    "Suite.generate_test_runs resolves a shared async fixture once for concurrent tests"
+)
+def _():
+    events = []
+
+    @fixture(scope=Scope.Module)
+    async def shared():
+        events.append("resolve")
+        await asyncio.sleep(0.01)
+        yield "shared"
+        events.append("teardown")
+
+    def make_test():
+        @testable_test
+        @run_concurrently
+        async def t(s=shared):
+            assert s == "shared"
+
+        return Test(fn=t, module_name="test_x")
+
+    suite = Suite(tests=[make_test() for _ in range(5)])
+    results = list(suite.generate_test_runs())
+
+    assert [r.outcome for r in results] == [TestOutcome.PASS] * 5
+    assert events == ["resolve", "teardown"]
+
+
+@test(
+    "Suite.generate_test_runs fails every concurrent test waiting on a broken fixture"
+)
+def _():
+    @fixture(scope=Scope.Global)
+    async def broken():
+        await asyncio.sleep(0.01)
+        raise ValueError("broken")
+
+    def make_test():
+        @testable_test
+        @run_concurrently
+        async def t(b=broken):
+            pass
+
+        return Test(fn=t, module_name="test_x")
+
+    suite = Suite(tests=[make_test() for _ in range(3)])
+    results = list(suite.generate_test_runs())
+
+    assert [r.outcome for r in results] == [TestOutcome.FAIL] * 3
+    assert all(isinstance(r.error, FixtureError) for r in results)
+    assert all(isinstance(r.error.__cause__, ValueError) for r in results)
+    assert not suite.cache.in_flight
+
+
+@test("Suite.generate_test_runs attaches the memory used by each test if profiling")
+def _():
+    retained = []
+
+    @testable_test
+    def t():
+        retained.append(bytearray(1_000_000))
+
+    suite = Suite(tests=[Test(fn=t, module_name="test_x")], profile_memory=True)
+    result = next(suite.generate_test_runs())
+
+    assert result.memory is not None
+    assert result.memory.retained >= 1_000_000
+
+
+@test("Suite.generate_test_runs doesn't profile memory during a dry run")
+def _(example_test=example_test):
+    suite = Suite(tests=[example_test], profile_memory=True)
+    result = next(suite.generate_test_runs(dry_run=True))
+
+    assert result.memory is None
+
+
+@test("group_tests only groups consecutive concurrent async tests in the same module")
+def _():
+    def make_test(concurrent, path="module1", is_async=True):
+        async def async_t():
+            pass
+
+        def sync_t():
+            pass
+
+        t = async_t if is_async else sync_t
+        t.ward_meta = CollectionMetadata(concurrent=concurrent, path=path)
+        return Test(fn=t, module_name=str(path))
+
+    tests = [
+        make_test(True),
+        make_test(True),
+        make_test(True, is_async=False),
+        make_test(True),
+        make_test(True, path="module2"),
+        make_test(False, path="module2"),
+        make_test(True, path="module2"),
+    ]
+
+    assert [len(group) for group in group_tests(tests, 10)] == [2, 1, 1, 1, 1, 1]
+    assert [len(group) for group in group_tests(tests, 1)] == [1] * 7
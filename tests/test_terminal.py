@@ -11,8 +11,12 @@ from rich.text import Text
 
 from tests.utilities import example_test, testable_test
 from ward import fixture, using
+from ward._failures import FailureRecord
+from ward._memory import MemoryUsage
+from ward._results import ResultRecord
 from ward._suite import Suite
 from ward._terminal import (
+    MemoryUsagePanel,
     SessionPrelude,
     TestOutputStyle,
     TestProgressStyle,
@@ -53,6 +57,17 @@ def _():
     assert exit_code == ExitCode.NO_TESTS_FOUND
 
 
+@test("get_exit_code returns ExitCode.FAILED when TIMEOUT in test results")
+def _(example=example_test):
+    test_results = [
+        TestResult(test=example, outcome=TestOutcome.TIMEOUT),
+        TestResult(test=example, outcome=TestOutcome.PASS),
+    ]
+    exit_code = get_exit_code(test_results)
+
+    assert exit_code == ExitCode.FAILED
+
+
 @test("get_exit_code returns ExitCode.FAILED when XPASS in test results")
 def _(example=example_test):
     test_results = [
@@ -71,6 +86,7 @@ for test_outcome, output_style in [
     (TestOutcome.XFAIL, "xfail"),
     (TestOutcome.XPASS, "xpass"),
     (TestOutcome.DRYRUN, "dryrun"),
+    (TestOutcome.TIMEOUT, "timeout"),
 ]:
 
     @test("outcome_to_style({outcome}) returns '{style}'")
@@ -110,38 +126,29 @@ def _(prelude: SessionPrelude = prelude):
     assert next(render_iter) == "Loaded config from [b]pyproject.toml[/b]."  # type: ignore[call-overload]
 
 
+def stats_record(description: str, module_name: str, duration: float):
+    return ResultRecord(
+        outcome=TestOutcome.PASS,
+        test_id="",
+        key="",
+        module_name=module_name,
+        line_number=123,
+        instance_index=0,
+        group_size=1,
+        description=description,
+        duration=duration,
+    )
+
+
 @fixture
 def timing_stats_panel():
     return TestTimingStatsPanel(
-        [
-            TestResult(
-                test=Test(
-                    timer=_Timer(duration=4.0),
-                    fn=lambda: 1,
-                    description="test1",
-                    module_name="mod1",
-                ),
-                outcome=TestOutcome.FAIL,
-            ),
-            TestResult(
-                test=Test(
-                    timer=_Timer(duration=3.0),
-                    fn=lambda: 1,
-                    description="test2",
-                    module_name="mod2",
-                ),
-                outcome=TestOutcome.FAIL,
-            ),
-            TestResult(
-                test=Test(
-                    timer=_Timer(duration=5.0),
-                    fn=lambda: 1,
-                    description="test3",
-                    module_name="mod3",
-                ),
-                outcome=TestOutcome.PASS,
-            ),
+        slowest_tests=[
+            stats_record("test3", "mod3", 5.0),
+            stats_record("test1", "mod1", 4.0),
+            stats_record("test2", "mod2", 3.0),
         ],
+        durations=[4.0, 3.0, 5.0],
         num_tests_to_show=3,
     )
 
@@ -219,6 +226,34 @@ def _(timing_stats_panel=timing_stats_panel):
     assert table.columns[2]._cells == expected_test_descriptions
 
 
+@test("MemoryUsagePanel lists the tests with the highest peak memory use")
+def _():
+    hungry = stats_record("hungry", "mod1", 1.0)
+    hungry.memory = MemoryUsage(
+        peak=3 * 1024**2,
+        retained=2048,
+        rss_delta=None,
+        top_allocations=[("/elsewhere/x.py:1", 2048)],
+    )
+    modest = stats_record("modest", "mod2", 1.0)
+    modest.memory = MemoryUsage(peak=1024, rss_delta=-1024)
+    panel: Panel = next(
+        MemoryUsagePanel([hungry, modest], num_tests_to_show=3).__rich_console__(
+            None, None
+        )
+    )
+
+    table, sites = panel.renderable.renderables
+    assert panel.title == "[b white]2 Most Memory-Hungry Tests[/b white]"
+    assert table.columns[0]._cells[1:] == ["[b]3.0 MiB[/b]", "[b]1.0 KiB[/b]"]
+    assert table.columns[1]._cells[1:] == ["2.0 KiB", "0 B"]
+    assert table.columns[2]._cells[1:] == ["-", "-1.0 KiB"]
+    assert table.columns[4]._cells[1:] == ["hungry", "modest"]
+    assert sites.renderable.renderables[1].columns[1]._cells[1:] == [
+        "/elsewhere/x.py:1"
+    ]
+
+
 @fixture
 def test_result() -> TestResult:
     @testable_test
@@ -308,7 +343,9 @@ for left, right in [
 
     @test("TestResultWriter.get_diff handles assert `==` failure")
     def _(lhs=left, rhs=right, writer=writer, console=mock_rich_console):
-        failure = TestAssertionFailure("fail", lhs, rhs, 1, Comparison.Equals, "test")
+        failure = FailureRecord.from_exception(
+            TestAssertionFailure("fail", lhs, rhs, 1, Comparison.Equals, "test")
+        )
         diff_render = writer.get_diff(failure)
 
         # Don't check anything more than this. We just want to exercise this
@@ -325,7 +362,9 @@ for left, right in [
 
     @test("TestResultWriter.get_operands handles assert `in` failure")
     def _(lhs=left, rhs=right, writer=writer):
-        failure = TestAssertionFailure("fail", lhs, rhs, 1, Comparison.In, "test")
+        failure = FailureRecord.from_exception(
+            TestAssertionFailure("fail", lhs, rhs, 1, Comparison.In, "test")
+        )
         lhs_render, rhs_render = writer.get_operands(failure).renderables
 
         assert lhs_render.title.plain == f"The item (of type {type(lhs).__name__})"
@@ -343,7 +382,9 @@ for left, right in [
 
     @test("TestResultWriter.get_operands handles assert `not in` failure")
     def _(lhs=left, rhs=right, writer=writer):
-        failure = TestAssertionFailure("fail", lhs, rhs, 1, Comparison.NotIn, "test")
+        failure = FailureRecord.from_exception(
+            TestAssertionFailure("fail", lhs, rhs, 1, Comparison.NotIn, "test")
+        )
         lhs_render, rhs_render = writer.get_operands(failure).renderables
 
         assert lhs_render.title.plain == f"The item (of type {type(lhs).__name__})"
@@ -366,7 +407,9 @@ for comparison, description in [
         "TestResultWriter.get_operands has a specialized description for `{comparison.value}`"
     )
     def _(writer=writer, comparison=comparison, description=description):
-        failure = TestAssertionFailure("fail", "a", "b", 1, comparison, "test")
+        failure = FailureRecord.from_exception(
+            TestAssertionFailure("fail", "a", "b", 1, comparison, "test")
+        )
         lhs_render, rhs_render = writer.get_operands(failure).renderables
 
         assert description in rhs_render.title.plain
@@ -378,13 +421,17 @@ for comparison in Comparison:
         "TestResultWriter.get_pretty_comparison_failure can handle `{comparison.value}` failures"
     )
     def _(comparison=comparison, writer=writer):
-        failure = TestAssertionFailure("fail", "a", "b", 1, comparison, "")
+        failure = FailureRecord.from_exception(
+            TestAssertionFailure("fail", "a", "b", 1, comparison, "")
+        )
         renderable = writer.get_pretty_comparison_failure(failure)
 
         assert renderable is not None
 
 
-@test("TestResultWriter.output_all_test_results returns empty list if suite is empty")
+@test(
+    "TestResultWriter.output_all_test_results returns an empty store if suite is empty"
+)
 def _(console=mock_rich_console):
     suite = Suite([])
     result_writer = TestResultWriter(
@@ -396,5 +443,5 @@ def _(console=mock_rich_console):
     )
 
     result = result_writer.output_all_test_results(_ for _ in ())
-    assert result == []
+    assert len(result) == 0
     assert not console.print.called
@@ -1,16 +1,17 @@
 import asyncio
 import sys
+import time
 from collections import defaultdict
 from pathlib import Path
-from unittest import mock
 
 from tests.utilities import FORCE_TEST_PATH, testable_test
 from ward import raises
-from ward._errors import ParameterisationError
+from ward._errors import ParameterisationError, TestTimeout
 from ward._fixtures import FixtureCache
 from ward.fixtures import Fixture, fixture
 from ward.models import CollectionMetadata, Scope, SkipMarker, XfailMarker
 from ward.testing import (
+    ParameterisedInstance,
     ParamMeta,
     Test,
     TestArgumentResolver,
@@ -367,6 +368,40 @@ def _(exit_code=each(0, 1), outcome=each(TestOutcome.FAIL, TestOutcome.FAIL)):
     assert t.run(FixtureCache()).outcome is outcome
 
 
+@test("Test.run returns *TIMEOUT* TestResult for a test that runs for too long")
+def _(cache=cache):
+    @testable_test
+    def _():
+        time.sleep(5)
+
+    _.ward_meta.timeout = 0.05
+    t = Test(fn=_, module_name=mod, capture_output=False)
+    result = t.run(cache, default_timeout=10)
+
+    assert result.outcome == TestOutcome.TIMEOUT
+    assert isinstance(result.error, TestTimeout)
+    assert "in _" in result.message
+
+
+@test("Test.run stops an async test once it runs for longer than default_timeout")
+def _(cache=cache):
+    async def test_fn():
+        await asyncio.sleep(5)
+
+    t = Test(fn=test_fn, module_name=mod, capture_output=False)
+    result = t.run(cache, default_timeout=0.05)
+
+    assert result.outcome == TestOutcome.TIMEOUT
+    assert "Stack for <Task" in result.message
+
+
+@test("Test.run doesn't stop a test that finishes within its timeout")
+def _(cache=cache):
+    t = Test(fn=lambda: time.sleep(0.01), module_name=mod, capture_output=False)
+
+    assert t.run(cache, default_timeout=5).outcome == TestOutcome.PASS
+
+
 @test("Test.is_parameterised should return True for parameterised test")
 def _():
     def parameterised_test(a=each(1, 2, 3), b="a value"):
@@ -435,26 +470,97 @@ def _():
         pass
 
     t = Test(fn=test, module_name=mod, capture_output=False)
-    assert t.get_parameterised_instances() == [
-        Test(
-            id=mock.ANY,
-            fn=t.fn,
-            module_name=t.module_name,
-            param_meta=ParamMeta(0, 2),
-            sout=mock.ANY,
-            serr=mock.ANY,
-            capture_output=False,
-        ),
-        Test(
-            id=mock.ANY,
-            fn=t.fn,
-            module_name=t.module_name,
-            param_meta=ParamMeta(1, 2),
-            sout=mock.ANY,
-            serr=mock.ANY,
-            capture_output=False,
-        ),
+    instances = t.get_parameterised_instances()
+
+    assert [(i.fn, i.module_name, i.capture_output) for i in instances] == [
+        (t.fn, t.module_name, False),
+        (t.fn, t.module_name, False),
     ]
+    assert [i.param_meta for i in instances] == [ParamMeta(0, 2), ParamMeta(1, 2)]
+    assert instances[0] != instances[1]
+
+
+@test("ParameterisedInstance shares the data of its parent test")
+def _():
+    def test(a=each(1, 2)):
+        pass
+
+    t = Test(fn=test, module_name=mod, marker=SkipMarker(), tags=["slow"])
+    first, second = t.get_parameterised_instances()
+
+    assert isinstance(first, ParameterisedInstance)
+    assert first.parent is second.parent is t
+    assert first.marker is t.marker and first.tags is t.tags
+    assert isinstance(first.id, int) and first.id != second.id
+    assert not hasattr(first, "__dict__")
+
+
+@test("ParameterisedInstance creates capture buffers when run and releases them after")
+def _(cache: FixtureCache = cache):
+    def test(a=each("out")):
+        print(a)
+        raise Exception
+
+    (instance,) = Test(fn=test, module_name=mod).get_parameterised_instances()
+
+    assert instance._sout is None
+    result = instance.run(cache)
+
+    assert result.captured_stdout == "out\n"
+    assert instance._sout is None and instance._serr is None
+
+
+@test("Test only creates capture buffers once it's run")
+def _(cache: FixtureCache = cache):
+    def test():
+        print("out")
+
+    t = Test(fn=test, module_name=mod)
+
+    assert t._sout is None and t._serr is None
+    result = t.run(cache)
+
+    assert t.sout.closed and t.serr.closed
+    assert result.outcome == TestOutcome.PASS
+
+
+@test("Test.iter_parameterised_instances reads values passed to each lazily")
+def _():
+    read = []
+
+    def values():
+        for value in ("a", "b", "c"):
+            read.append(value)
+            yield value
+
+    def test(a=each(values()), b=each(1, 2, 3)):
+        pass
+
+    t = Test(fn=test, module_name=mod)
+    instances = t.iter_parameterised_instances()
+
+    first = next(instances)
+    assert read == ["a"]
+    assert first.row == ("a", 1)
+    assert first.param_meta == ParamMeta(0, 3)
+    assert [i.row for i in instances] == [("b", 2), ("c", 3)]
+
+
+@test("Test.find_number_of_instances returns None if the number isn't known")
+def _():
+    def test(a=each(x for x in range(3))):
+        pass
+
+    t = Test(fn=test, module_name=mod)
+
+    assert t.find_number_of_instances() is None
+    assert [i.param_meta for i in t.get_parameterised_instances()] == [
+        ParamMeta(0, None),
+        ParamMeta(1, None),
+        ParamMeta(2, None),
+    ]
+    with raises(ParameterisationError):
+        t.get_parameterised_instances()
 
 
 @test("Test.get_parameterised_instances raises exception for arg count mismatch")
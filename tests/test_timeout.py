@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+
+from tests.utilities import FORCE_TEST_PATH
+from ward import raises, test
+from ward._errors import TestTimeout
+from ward._timeout import cancel_after, format_stacks, time_limit
+from ward.testing import Test
+
+
+@test("format_stacks includes the stack of every thread")
+def _():
+    stacks = format_stacks()
+
+    assert "Current thread" in stacks
+    assert "in format_stacks" in stacks
+
+
+@test("time_limit interrupts a blocking call in the main thread")
+def _():
+    start = time.monotonic()
+    with raises(TestTimeout) as exc:
+        with time_limit(0.05):
+            time.sleep(5)
+
+    assert time.monotonic() - start < 5
+    assert exc.raised.seconds == 0.05
+    assert "in _" in exc.raised.stacks
+
+
+@test("time_limit interrupts a thread other than the main thread")
+def _():
+    errors = []
+
+    def spin():
+        try:
+            with time_limit(0.05):
+                while True:
+                    pass
+        except TestTimeout as e:
+            errors.append(e)
+        # The watchdog has stopped, so nothing is raised after the block.
+        with time_limit(0.05):
+            pass
+        time.sleep(0.1)
+
+    thread = threading.Thread(target=spin)
+    thread.start()
+    thread.join()
+
+    assert len(errors) == 1
+    assert errors[0].seconds == 0.05
+    assert "in spin" in errors[0].stacks
+
+
+@test("time_limit reports a timeout in a thread even if the block catches it")
+def _():
+    errors = []
+
+    def swallow():
+        try:
+            with time_limit(0.05):
+                try:
+                    while True:
+                        pass
+                except BaseException:
+                    pass
+        except TestTimeout as e:
+            errors.append(e)
+        # Nothing is left waiting to be raised after the block.
+        time.sleep(0.1)
+
+    thread = threading.Thread(target=swallow)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    assert "in swallow" in errors[0].stacks
+
+
+@test("time_limit does nothing when the block finishes in time")
+def _():
+    with time_limit(5):
+        pass
+    with time_limit(None):
+        pass
+
+
+@test("cancel_after cancels the task and reports its stack")
+def _():
+    cancelled = []
+
+    async def hang():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with raises(TestTimeout) as exc:
+        asyncio.run(cancel_after(hang(), 0.05))
+
+    assert cancelled == [True]
+    assert "Stack for <Task" in exc.raised.stacks
+    assert "in hang" in exc.raised.stacks
+
+
+@test("cancel_after returns the result of an awaitable that finishes in time")
+def _():
+    assert asyncio.run(cancel_after(asyncio.sleep(0, "done"), 5)) == "done"
+    assert asyncio.run(cancel_after(asyncio.sleep(0, "done"), None)) == "done"
+
+
+@test("@test(timeout=...) sets the timeout of the test")
+def _():
+    def fn():
+        pass
+
+    fn.__module__ = "test_x"
+    test(
+        "has a timeout",
+        timeout=2.5,
+        _force_path=FORCE_TEST_PATH,
+        _collect_into=defaultdict(list),
+    )(fn)
+
+    assert Test(fn=fn, module_name="test_x").timeout == 2.5
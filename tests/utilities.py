@@ -79,7 +79,7 @@ def example_test(module=module, fixtures=fixtures):
 
 
 def make_project(root_file: str, file_content: str = ""):
-    tempdir = Path(tempfile.gettempdir())
+    tempdir = Path(tempfile.mkdtemp())
     paths = [
         tempdir / "project/a/b/c",
         tempdir / "project/a/d",
@@ -94,11 +94,11 @@ def make_project(root_file: str, file_content: str = ""):
         f.write(file_content)
         f.flush()
         yield (tempdir / "project").resolve()
-    shutil.rmtree(tempdir / "project")
+    shutil.rmtree(tempdir)
 
 
 def make_empty_project():
-    tempdir = Path(tempfile.gettempdir())
+    tempdir = Path(tempfile.mkdtemp())
     paths = [
         tempdir / "project/a/b/c",
         tempdir / "project/a/d",
@@ -110,4 +110,4 @@ def make_empty_project():
 
     yield (tempdir / "project").resolve()
 
-    shutil.rmtree(tempdir / "project")
+    shutil.rmtree(tempdir)
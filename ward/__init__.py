@@ -3,7 +3,7 @@ from ._ward_version import __version__
 from .expect import raises
 from .fixtures import fixture, using
 from .models import Scope
-from .testing import each, skip, test, xfail
+from .testing import each, run_concurrently, skip, test, xfail
 
 __all__ = [
     "__version__",
@@ -12,6 +12,7 @@ __all__ = [
     "using",
     "Scope",
     "each",
+    "run_concurrently",
     "skip",
     "test",
     "xfail",
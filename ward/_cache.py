@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Optional
+
+CACHE_DIR_NAME = ".ward_cache"
+
+_GITIGNORE_CONTENT = "# Created by ward automatically.\n*\n"
+
+
+@dataclass
+class ProjectCache:
+    """
+    A small key-value store used to persist data between test sessions.
+    Each key is stored as a JSON file inside a ``.ward_cache`` directory
+    at the root of the project.
+
+    Reading from the cache never fails: missing or corrupt entries are
+    treated as absent. Failing to write to the cache (e.g. on a read-only
+    file system) is silently ignored.
+    """
+
+    root: Path
+
+    @classmethod
+    def for_project(cls, project_root: Optional[Path]) -> "ProjectCache":
+        base = project_root if project_root else Path.cwd()
+        return cls(root=base / CACHE_DIR_NAME)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            with open(self.path_for(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            self._ensure_root()
+            # Write to a temporary file then rename it, so that a session that
+            # is killed part way through a write can't leave a corrupt entry.
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, self.path_for(key))
+        except OSError:
+            pass
+
+    def open_temporary_file(self) -> Optional[IO[str]]:
+        """
+        Open a temporary file in the cache, for data that's written incrementally during
+        a session. The file is deleted once it's closed, so every session gets its own,
+        even when several run at once. Returns None if the file can't be created.
+        """
+        try:
+            self._ensure_root()
+            return tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=self.root)
+        except OSError:
+            return None
+
+    def make_session_directory(self, name: str) -> Optional[Path]:
+        """
+        Create a directory for files written during a session inside the `name`
+        directory of the cache. Every session gets its own, even when several run
+        at once. Returns None if the directory can't be created.
+        """
+        try:
+            self._ensure_root()
+            (self.root / name).mkdir(exist_ok=True)
+            # Named after when the session started, see `remove_other_session_directories`.
+            prefix = f"{time.time_ns()}-"
+            return Path(tempfile.mkdtemp(prefix=prefix, dir=self.root / name))
+        except OSError:
+            return None
+
+    def remove_earlier_session_directories(self, session_dir: Path) -> None:
+        """
+        Delete the directories made by `make_session_directory` for sessions that
+        started before the one `session_dir` was made for, and `session_dir` itself if
+        nothing was left in it. Anything that is left is kept until the end of the next
+        session, so it can be inspected once the session is over.
+        """
+        started = _session_start(session_dir)
+        try:
+            for path in session_dir.parent.iterdir():
+                if _session_start(path) < started:
+                    shutil.rmtree(path, ignore_errors=True)
+            session_dir.rmdir()
+        except OSError:
+            pass
+
+    def _ensure_root(self) -> None:
+        if self.root.is_dir():
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / ".gitignore").write_text(_GITIGNORE_CONTENT)
+
+
+def _session_start(session_dir: Path) -> int:
+    try:
+        return int(session_dir.name.split("-", 1)[0])
+    except ValueError:
+        return 0
@@ -0,0 +1,261 @@
+import io
+import os
+import sys
+import tempfile
+from collections import deque
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from contextvars import ContextVar
+from typing import IO, Any, Deque, Iterable, Iterator, Optional, TextIO, Tuple
+
+# The default number of characters of output captured from a single test
+# (or fixture teardown) that are kept in memory before spilling to disk.
+DEFAULT_MEMORY_LIMIT = 1024 * 1024
+
+_memory_limit = DEFAULT_MEMORY_LIMIT
+
+
+def set_memory_limit(limit: int) -> None:
+    """
+    Set the memory limit used by every `CaptureBuffer` created from now on.
+    """
+    global _memory_limit
+    _memory_limit = limit
+
+
+def get_memory_limit() -> int:
+    return _memory_limit
+
+
+# The name of the directory in the project cache that output spills to, within
+# a directory for each session (see `ProjectCache.make_session_directory`).
+SPILL_DIR_NAME = "captured-output"
+
+# The directory output spills to, or None to use the system's temporary directory.
+_spill_dir: Optional[str] = None
+
+
+def set_spill_dir(path: Optional[str]) -> None:
+    """
+    Set the directory that every `CaptureBuffer` created from now on spills to.
+    """
+    global _spill_dir
+    _spill_dir = path
+
+
+def get_spill_dir() -> Optional[str]:
+    return _spill_dir
+
+
+class CaptureBuffer(io.TextIOBase):
+    """
+    A text stream that output is redirected to while it's being captured.
+
+    Output is kept in memory until it exceeds `memory_limit` characters. After that,
+    the full output is written to a temporary file in `spill_dir` instead, and only
+    its head and tail are kept in memory for display.
+
+    The temporary file is deleted when the buffer is closed, unless `persist` has
+    been called (for example because the test failed, and the full output might be
+    needed to find out why).
+
+    Like any other closed stream, writing to a closed buffer raises a `ValueError`.
+    """
+
+    def __init__(
+        self, memory_limit: Optional[int] = None, spill_dir: Optional[str] = None
+    ):
+        super().__init__()
+        self.memory_limit = _memory_limit if memory_limit is None else memory_limit
+        self.spill_dir = _spill_dir if spill_dir is None else spill_dir
+        self.path: Optional[str] = None
+        self._size = 0
+        self._memory: Optional[io.StringIO] = None
+        self._file: Optional[IO[str]] = None
+        self._head = ""
+        self._tail: Deque[str] = deque()
+        self._tail_size = 0
+        self._persist = False
+
+    @property
+    def spilled(self) -> bool:
+        """True if the output has exceeded the memory limit and was written to disk."""
+        return self.path is not None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed capture buffer.")
+        if self._file is None:
+            if self._size + len(s) <= self.memory_limit:
+                if self._memory is None:
+                    self._memory = io.StringIO()
+                self._memory.write(s)
+                self._size += len(s)
+                return len(s)
+            self._spill()
+        assert self._file is not None
+        self._file.write(s)
+        self._add_to_tail(s)
+        self._size += len(s)
+        return len(s)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def getvalue(self) -> str:
+        """
+        Returns the captured output. If it has spilled to disk, only its head and
+        tail are returned, separated by a note saying how much was left out.
+        """
+        if self._file is None:
+            return self._memory.getvalue() if self._memory else ""
+        tail = "".join(self._tail)
+        tail = tail[max(len(tail) - self._tail_limit, 0) :]
+        # Start the tail on a new line, rather than part way through one.
+        tail = tail[tail.find("\n") + 1 :]
+        omitted = self._size - len(self._head) - len(tail)
+        return f"{self._head}\n[... {omitted} characters omitted ...]\n\n{tail}"
+
+    def persist(self) -> Optional[str]:
+        """
+        Keep the temporary file the output spilled to (if any) after the buffer is
+        closed, and return its path.
+        """
+        self._persist = True
+        self.flush()
+        return self.path
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._memory = None
+        self._tail.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if not self._persist and self.path:
+                os.unlink(self.path)
+                self.path = None
+        super().close()
+
+    @property
+    def _tail_limit(self) -> int:
+        return self.memory_limit - len(self._head)
+
+    def _spill(self) -> None:
+        text = self._memory.getvalue() if self._memory else ""
+        self._memory = None
+        fd, self.path = tempfile.mkstemp(
+            prefix="ward-capture-", suffix=".txt", dir=self.spill_dir
+        )
+        self._file = open(fd, "w", encoding="utf-8", errors="replace")
+        self._file.write(text)
+        head = text[: self.memory_limit // 2]
+        # End the head at the end of a line, rather than part way through one.
+        self._head = head[: head.rfind("\n") + 1] or head
+        self._add_to_tail(text[len(self._head) :])
+
+    def _add_to_tail(self, s: str) -> None:
+        if len(s) >= self._tail_limit:
+            self._tail.clear()
+            s = s[len(s) - self._tail_limit :]
+            self._tail_size = 0
+        self._tail.append(s)
+        self._tail_size += len(s)
+        # Drop the oldest chunks that are no longer needed to fill the tail.
+        while len(self._tail) > 1 and (
+            self._tail_size - len(self._tail[0]) >= self._tail_limit
+        ):
+            self._tail_size -= len(self._tail.popleft())
+
+
+# The buffers that output written in the current context (e.g. by the current
+# asyncio task) is captured into, when capturing per context.
+_context_buffers: ContextVar[
+    Optional[Tuple[CaptureBuffer, CaptureBuffer]]
+] = ContextVar("ward_context_buffers", default=None)
+
+
+class _ContextStream:
+    """
+    Stands in for sys.stdout or sys.stderr while output is captured per context.
+    Writes go to the buffer set for the current context by `capture_into`, or to
+    the original stream if there isn't one. Anything else is delegated to the
+    original stream.
+    """
+
+    def __init__(self, original: TextIO, index: int):
+        self.original = original
+        self.index = index
+
+    def _target(self) -> TextIO:
+        buffers = _context_buffers.get()
+        # A task started by a test can outlive it, along with the buffers it inherited.
+        if buffers and not buffers[self.index].closed:
+            return buffers[self.index]  # type: ignore[return-value]
+        return self.original
+
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write(line)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.original, name)
+
+
+@contextmanager
+def capture_per_context() -> Iterator[None]:
+    """
+    Replace sys.stdout and sys.stderr with streams that write to the buffers set by
+    `capture_into` in the current context. Unlike `redirect_stdout`, this lets
+    concurrently running tasks (or threads, each of which has its own context)
+    capture their output separately.
+    """
+    if isinstance(sys.stdout, _ContextStream):
+        # Already capturing per context, e.g. in a thread of a thread pool.
+        yield
+        return
+    original_stdout, original_stderr = sys.stdout, sys.stderr
+    sys.stdout = _ContextStream(original_stdout, 0)
+    sys.stderr = _ContextStream(original_stderr, 1)
+    try:
+        yield
+    finally:
+        sys.stdout, sys.stderr = original_stdout, original_stderr
+
+
+@contextmanager
+def capture_into(sout: CaptureBuffer, serr: CaptureBuffer) -> Iterator[None]:
+    """
+    Capture output written in the current context into `sout` and `serr`.
+    Only takes effect inside `capture_per_context`.
+    """
+    token = _context_buffers.set((sout, serr))
+    try:
+        yield
+    finally:
+        _context_buffers.reset(token)
+
+
+@contextmanager
+def redirect_output(sout: CaptureBuffer, serr: CaptureBuffer) -> Iterator[None]:
+    """
+    Capture output into `sout` and `serr`. Inside `capture_per_context`, only the
+    output written in the current context is captured. Otherwise, sys.stdout and
+    sys.stderr are replaced, capturing everything written until the block exits.
+    """
+    if isinstance(sys.stdout, _ContextStream):
+        with capture_into(sout, serr):
+            yield
+    else:
+        with redirect_stdout(sout), redirect_stderr(serr):
+            yield
@@ -10,11 +10,13 @@ from importlib._bootstrap_external import FileFinder  # type: ignore[import]
 from pathlib import Path
 from sysconfig import get_path
 from types import ModuleType
-from typing import Callable, Iterable, List, Optional, Set, Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
 
 from cucumber_tag_expressions.model import Expression
 
 from ward._errors import CollectionError
+from ward._index import CollectionIndex, DirListing
+from ward._rewrite import install_import_hook, with_rewriting_loader
 from ward._testing import COLLECTED_TESTS, is_test_module_name
 from ward._utilities import get_absolute_path
 from ward.fixtures import Fixture
@@ -80,9 +82,16 @@ def configure_path(project_root: Optional[Path]) -> None:
 # flake8: noqa: C901 - FIXME
 def get_info_for_modules(
     paths: List[Path],
-    exclude: Tuple[str],
+    exclude: Tuple[str, ...],
+    index: Optional[CollectionIndex] = None,
 ) -> List[pkgutil.ModuleInfo]:
+    """
+    Find the test modules at or below `paths`. If an `index` is given, directories
+    that haven't changed since they were recorded in it aren't listed again.
+    """
     paths = _remove_excluded_paths(set(paths), exclude)
+    if index is None:
+        index = CollectionIndex(exclude=list(exclude))
 
     module_infos = []
 
@@ -105,27 +114,82 @@ def get_info_for_modules(
     # Now check for modules in every subdirectory
     checked_dirs: Set[Path] = set(p for p in paths)
     for p in paths:
-        for root, dirs, _ in os.walk(str(p)):
-            if _excluded(Path(root), exclude):
-                continue
-            for dir_name in dirs:
-                dir_path = Path(root, dir_name)
-
-                # ignore site-packages directories
-                abs_path = dir_path.absolute()
-                if str(abs_path).startswith(get_path("platlib")):
+        if p.is_dir():
+            module_infos.extend(_find_modules_below(p, exclude, checked_dirs, index))
+
+    return module_infos
+
+
+def _find_modules_below(
+    root: Path, exclude: Tuple[str], checked_dirs: Set[Path], index: CollectionIndex
+) -> Iterator[pkgutil.ModuleInfo]:
+    """
+    Yield the test modules in each directory below `root`, top-down, in the same order
+    as `os.walk`. Like `os.walk`, symlinked directories are searched, but not descended into.
+    """
+    if _excluded(root, exclude):
+        return
+    listing = _list_dir(root, exclude, index)
+    for dir_name, _ in listing.subdirs:
+        dir_path = Path(root, dir_name)
+
+        # ignore site-packages directories
+        abs_path = dir_path.absolute()
+        if str(abs_path).startswith(get_path("platlib")):
+            continue
+
+        # if we have seen this path before, skip it
+        if dir_path not in checked_dirs and not _excluded(dir_path, exclude):
+            checked_dirs.add(dir_path)
+            finder = pkgutil.get_importer(str(dir_path))
+            for name, ispkg in _list_dir(dir_path, exclude, index).modules:
+                yield pkgutil.ModuleInfo(finder, name, ispkg)
+
+    for dir_name, is_symlink in listing.subdirs:
+        if not is_symlink:
+            yield from _find_modules_below(
+                Path(root, dir_name), exclude, checked_dirs, index
+            )
+
+
+def _list_dir(path: Path, exclude: Tuple[str], index: CollectionIndex) -> DirListing:
+    listing = index.get_dir(path)
+    if listing is not None:
+        return listing
+
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        subdirs.append((entry.name, entry.is_symlink()))
+                except OSError:
                     continue
+    except OSError:
+        pass
 
-                # if we have seen this path before, skip it
-                if dir_path not in checked_dirs and not _excluded(dir_path, exclude):
-                    checked_dirs.add(dir_path)
-                    for mod in pkgutil.iter_modules([str(dir_path)]):
-                        if is_test_module(mod) and not _is_excluded_module(
-                            mod, exclude
-                        ):
-                            module_infos.append(mod)
+    modules = [
+        (mod.name, mod.ispkg)
+        for mod in pkgutil.iter_modules([str(path)])
+        if is_test_module(mod) and not _is_excluded_module(mod, exclude)
+    ]
+    listing = DirListing(subdirs=subdirs, modules=modules)
+    index.set_dir(path, listing)
+    return listing
 
-    return module_infos
+
+def get_module_paths(modules: Iterable[pkgutil.ModuleInfo]) -> List[Path]:
+    """
+    Returns the absolute path of each of the modules found by `get_info_for_modules`.
+    """
+    paths = []
+    for m in modules:
+        if hasattr(m, "module_finder"):
+            paths.append(_get_module_path(m).absolute())
+        else:
+            paths.append(get_absolute_path(m))
+    return paths
 
 
 @dataclass
@@ -136,11 +200,14 @@ class PackageData:
 
 def load_modules(modules: Iterable[pkgutil.ModuleInfo]) -> List[ModuleType]:
     loaded_modules = []
+    import_hook = install_import_hook()
 
     for m in modules:
         if hasattr(m, "module_finder"):
             file_finder: FileFinder = m.module_finder
             spec: ModuleSpec = file_finder.find_spec(m.name)
+            if is_test_module_name(m.name):
+                spec = with_rewriting_loader(spec)
             m = importlib.util.module_from_spec(spec)
 
         module_name = m.__name__
@@ -148,6 +215,8 @@ def load_modules(modules: Iterable[pkgutil.ModuleInfo]) -> List[ModuleType]:
             pkg_data = _build_package_data(m)
             if pkg_data.pkg_root not in sys.path:
                 sys.path.append(str(pkg_data.pkg_root))
+            # Test modules imported from this one are rewritten too.
+            import_hook.roots.add(pkg_data.pkg_root)
             m.__package__ = pkg_data.pkg_name
             m.__loader__.exec_module(m)
             loaded_modules.append(m)
@@ -156,7 +225,15 @@ def load_modules(modules: Iterable[pkgutil.ModuleInfo]) -> List[ModuleType]:
 
 
 def _build_package_data(module: ModuleType) -> PackageData:
-    path = Path(module.__file__).resolve().parent
+    return package_data_for_path(Path(module.__file__))
+
+
+def package_data_for_path(module_path: Path) -> PackageData:
+    """
+    Returns the name of the package the module at the path belongs to, and the
+    directory it has to be imported from (which `load_modules` adds to `sys.path`).
+    """
+    path = module_path.resolve().parent
     package_parts = []
     while path.is_dir() and (path / "__init__.py").exists():
         package_parts.append(path.stem)
@@ -206,7 +283,7 @@ def filter_tests(
             not query
             or query in description
             or query in f"{test.module_name}."
-            or query in inspect.getsource(test.fn)
+            or query in test.source
             or query in test.qualified_name
         )
 
@@ -7,6 +7,7 @@ from typing import Any
 
 import click
 
+from ward._capture import CaptureBuffer, _ContextStream
 from ward._terminal import rich_console
 
 original_stdout = sys.stdout
@@ -28,7 +29,9 @@ def _breakpointhook(*args, **kwargs):
     hook = _get_debugger_hook(hookname)
     context = click.get_current_context()
     capture_enabled = context.params.get("capture_output")
-    capture_active = isinstance(sys.stdout, io.StringIO)
+    capture_active = isinstance(
+        sys.stdout, (io.StringIO, CaptureBuffer, _ContextStream)
+    )
 
     # Stop an active Live.
     # It is the responsibility of the test executor
@@ -0,0 +1,171 @@
+import statistics
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+
+from ward._cache import ProjectCache
+from ward.testing import ParameterisedInstance, Test, TestOutcome
+
+if TYPE_CHECKING:
+    from ward._results import ResultRecord
+
+# The estimated duration of a test we have no history for, used
+# when there are no recorded durations to base an estimate on.
+DEFAULT_ESTIMATE_SECS = 0.01
+
+# Tests that haven't run for this many sessions are forgotten, so that the durations
+# of tests that have been deleted or renamed don't stay in the cache forever.
+MAX_SESSIONS_UNSEEN = 50
+
+_CACHE_KEY = "durations"
+_LAST_SEEN_CACHE_KEY = "durations_last_seen"
+
+
+def test_key(
+    test: Union[Test, ParameterisedInstance], project_root: Optional[Path]
+) -> str:
+    """
+    Returns a key which identifies a test across sessions (and machines), of the form
+    '{module path relative to project root}::{qualified name}::{line number}::{description}'.
+
+    The description is included because tests are usually named '_', and
+    it's the undecorated description rather than the one with arguments
+    formatted into it, so it doesn't depend on whether the test has run.
+    The line number tells apart tests in a module that share a description.
+    Parameterised instances of a test share its key.
+    """
+    path = test.path
+    if project_root:
+        try:
+            path = path.relative_to(project_root)
+        except ValueError:
+            pass
+    meta = getattr(test.fn, "ward_meta", None)
+    description = getattr(meta, "description", None) or test.description
+    return (
+        f"{path.as_posix()}::{test.qualified_name}::{test.line_number}::{description}"
+    )
+
+
+def _module_of(key: str) -> str:
+    return key.split("::", 1)[0]
+
+
+@dataclass
+class DurationHistory:
+    """
+    The durations of tests recorded in previous sessions, keyed by test key
+    (see `test_key`) and parameter index, in the form '{test_key}[{index}]'.
+
+    Used to estimate how long a test (including all of its parameterised instances)
+    will take to run, so that work can be distributed evenly between workers.
+
+    `last_seen` maps the same keys to the number of the last session (counted by
+    `session`) the test was seen in, so that tests which are no longer run can be
+    forgotten.
+    """
+
+    project_root: Optional[Path]
+    durations: Dict[str, float] = field(default_factory=dict)
+    last_seen: Dict[str, int] = field(default_factory=dict)
+    session: int = 0
+    _totals: Optional[Dict[str, float]] = field(default=None, init=False, repr=False)
+    _module_medians: Dict[str, float] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _overall_median: float = field(
+        default=DEFAULT_ESTIMATE_SECS, init=False, repr=False
+    )
+
+    @classmethod
+    def load(
+        cls, cache: ProjectCache, project_root: Optional[Path]
+    ) -> "DurationHistory":
+        durations = cache.get(_CACHE_KEY, default={})
+        if not isinstance(durations, dict):
+            durations = {}
+        seen = cache.get(_LAST_SEEN_CACHE_KEY, default={})
+        if not isinstance(seen, dict):
+            seen = {}
+        last_seen = seen.get("last_seen", {})
+        session = seen.get("session", 0)
+        if not isinstance(last_seen, dict) or not isinstance(session, int):
+            last_seen, session = {}, 0
+        return cls(
+            project_root=project_root,
+            durations=durations,
+            last_seen=last_seen,
+            session=session,
+        )
+
+    def save(self, cache: ProjectCache) -> None:
+        cache.set(_CACHE_KEY, self.durations)
+        cache.set(
+            _LAST_SEEN_CACHE_KEY,
+            {"session": self.session, "last_seen": self.last_seen},
+        )
+
+    def record(self, records: Iterable["ResultRecord"]) -> None:
+        """
+        Record the durations of the tests that ran in this session (from the records
+        in the session's `ResultStore`), replacing any previously recorded durations for them.
+
+        Durations of tests that haven't been seen for `MAX_SESSIONS_UNSEEN` sessions
+        are dropped.
+        """
+        self.session += 1
+        for record in records:
+            instance_key = f"{record.key}[{record.instance_index}]"
+            self.last_seen[instance_key] = self.session
+            if record.duration is None or record.outcome in (
+                TestOutcome.SKIP,
+                TestOutcome.DRYRUN,
+            ):
+                continue
+            self.durations[instance_key] = record.duration
+        self._forget_unseen()
+        self._totals = None
+
+    def _forget_unseen(self) -> None:
+        for instance_key in list(self.durations):
+            # Durations recorded before sessions were counted are treated as seen now.
+            seen = self.last_seen.setdefault(instance_key, self.session)
+            if self.session - seen >= MAX_SESSIONS_UNSEEN:
+                del self.durations[instance_key]
+        self.last_seen = {
+            key: seen for key, seen in self.last_seen.items() if key in self.durations
+        }
+
+    def estimate(self, test: Test) -> float:
+        """
+        Returns the estimated time in seconds it'll take to run every instance of the test.
+
+        If the test has no recorded history, the median duration of the other tests
+        in its module is used. If nothing in the module has history either, the median
+        of all of the recorded tests is used.
+        """
+        if self._totals is None:
+            self._compute_totals()
+        assert self._totals is not None
+        key = test_key(test, self.project_root)
+        if key in self._totals:
+            return self._totals[key]
+        return self._module_medians.get(_module_of(key), self._overall_median)
+
+    def _compute_totals(self) -> None:
+        totals: Dict[str, float] = defaultdict(float)
+        for instance_key, duration in self.durations.items():
+            key = instance_key.rsplit("[", 1)[0]
+            totals[key] += duration
+        self._totals = dict(totals)
+
+        by_module: Dict[str, List[float]] = defaultdict(list)
+        for key, total in self._totals.items():
+            by_module[_module_of(key)].append(total)
+        self._module_medians = {
+            module: statistics.median(durations)
+            for module, durations in by_module.items()
+        }
+        if self._totals:
+            self._overall_median = statistics.median(self._totals.values())
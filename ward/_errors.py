@@ -1,3 +1,6 @@
+from typing import Optional
+
+
 class FixtureError(Exception):
     pass
 
@@ -8,3 +11,33 @@ class ParameterisationError(Exception):
 
 class CollectionError(Exception):
     pass
+
+
+class WorkerError(Exception):
+    """
+    Stands in for an exception raised inside a worker process that could not
+    be sent back to the main process as-is. The message holds the exception
+    (or, if the worker itself failed, the formatted traceback) from the worker.
+    """
+
+
+class TestTimeout(BaseException):
+    """
+    Raised inside a test that has been running for longer than its timeout. It isn't
+    an `Exception`, so that it isn't swallowed by an `except Exception` in the test.
+
+    Attributes:
+        seconds: The timeout that the test exceeded.
+        stacks: The stack of every thread (and, for async tests, of the test's task)
+            at the moment the timeout expired, in the format used by `faulthandler`.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, stacks: str = ""):
+        super().__init__(seconds, stacks)
+        self.seconds = seconds
+        self.stacks = stacks
+
+    def __str__(self) -> str:
+        if self.seconds is None:
+            return "The test took longer than its timeout."
+        return f"The test took longer than its timeout of {self.seconds:g} seconds."
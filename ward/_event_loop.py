@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Coroutine, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+
+class SessionEventLoop:
+    """
+    Runs the async tests, fixtures and fixture teardowns of a session on a single
+    event loop, so that anything created on the loop by a fixture (a connection pool,
+    for example) can still be used by the tests that depend on it, and when the
+    fixture is torn down.
+
+    The loop is created the first time something needs to run on it, and stays open
+    until `close` is called at the end of the session.
+
+    When tests run in a thread pool, only one thread can use the loop at a time.
+    `run` and `close` hold `lock` while they use the loop, and anything else that
+    uses the loop from more than one call (such as scheduling tasks with
+    `create_task`, then running the loop) should hold it throughout.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.lock = threading.RLock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._loop is not None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+        return self._loop
+
+    def run(self, awaitable: Awaitable[_T]) -> _T:
+        """
+        Run an awaitable on the session's event loop until it's done, and return its result.
+        """
+        with self.lock:
+            return self._get_loop().run_until_complete(awaitable)
+
+    def create_task(self, coro: Coroutine[Any, Any, _T]) -> "asyncio.Task[_T]":
+        """
+        Schedule a coroutine to run on the session's event loop. It makes progress
+        whenever the loop is running, i.e. during any call to `run`.
+        """
+        return self._get_loop().create_task(coro)
+
+    def close(self) -> None:
+        """
+        Cancel any tasks that are still running on the loop, finalise any async
+        generators, then close the loop. This mirrors what `asyncio.run` does
+        when the coroutine it runs is complete.
+        """
+        with self.lock:
+            loop = self._loop
+            if loop is None:
+                return
+            self._loop = None
+            try:
+                _cancel_all_tasks(loop)
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                shutdown_default_executor = getattr(
+                    loop, "shutdown_default_executor", None
+                )
+                if shutdown_default_executor is not None:  # Python 3.9+
+                    loop.run_until_complete(shutdown_default_executor())
+            finally:
+                asyncio.set_event_loop(None)
+                loop.close()
+
+
+def _cancel_all_tasks(loop: asyncio.AbstractEventLoop) -> None:
+    tasks = asyncio.all_tasks(loop)
+    if not tasks:
+        return
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    for task in tasks:
+        if task.cancelled():
+            continue
+        if task.exception() is not None:
+            context: Any = {
+                "message": "unhandled exception when closing the session event loop",
+                "exception": task.exception(),
+                "task": task,
+            }
+            loop.call_exception_handler(context)
@@ -0,0 +1,189 @@
+import itertools
+import shutil
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, List, Mapping, Optional, Set
+
+import pprintpp
+from rich.pretty import pretty_repr
+from rich.traceback import Trace, Traceback
+
+from ward.expect import Comparison, TestAssertionFailure, _BoundedRepr
+
+# The limits applied to the repr of each local variable shown in a traceback.
+_LOCALS_MAX_LENGTH = 10
+_LOCALS_MAX_STRING = 80
+
+# Operands of a failed comparison made up of more items than this (counting
+# the items in nested containers, and every 80 characters of a string as one)
+# are shown truncated by `_operand_repr` rather than pretty printed in full.
+_MAX_OPERAND_ITEMS = 2000
+
+
+class _OperandRepr(_BoundedRepr):
+    """
+    Truncates the operands of a failed comparison, with more generous limits than
+    those used for the message of an assertion failure.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.maxlevel = 3
+        self.maxstring = self.maxother = 1000
+        self.maxtuple = self.maxlist = self.maxarray = self.maxdeque = 30
+        self.maxdict = self.maxset = self.maxfrozenset = 30
+
+
+_operand_repr = _OperandRepr()
+
+
+@dataclass
+class OperandSummary:
+    """
+    What's needed to display one side of a failed comparison, without
+    holding a reference to the value itself.
+
+    Attributes:
+        type_name: The name of the type of the value.
+        id: The id of the value, shown for failed `is` comparisons.
+        pretty: The value pretty printed, as shown in the panel for this operand.
+        diff_text: The text of the value used to build diffs. Strings are diffed as they are.
+    """
+
+    type_name: str
+    id: int
+    pretty: str
+    diff_text: str
+
+    @classmethod
+    def of(cls, value: Any, width: int) -> "OperandSummary":
+        if not _is_small(value):
+            # Pretty printing all of a large value would be slow and unreadable.
+            truncated = _operand_repr.repr(value)
+            return cls(
+                type_name=type(value).__name__,
+                id=id(value),
+                pretty=truncated,
+                diff_text=truncated,
+            )
+        return cls(
+            type_name=type(value).__name__,
+            id=id(value),
+            pretty=pretty_repr(value, max_width=max(width // 2 - 8, 20)),
+            diff_text=(
+                value
+                if isinstance(value, str)
+                else pprintpp.pformat(value, width=max(width - 24, 20))
+            ),
+        )
+
+
+def _is_small(value: Any) -> bool:
+    """
+    True if a value is made up of no more than `_MAX_OPERAND_ITEMS` items, counting
+    only as many as it takes to find out.
+    """
+    budget = _MAX_OPERAND_ITEMS
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        budget -= 1
+        if isinstance(item, (str, bytes, bytearray)):
+            budget -= len(item) // 80
+        elif isinstance(item, Mapping):
+            pending += itertools.islice(item.items(), budget + 1)
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            pending += itertools.islice(item, budget + 1)
+        if budget < 0:
+            return False
+    return True
+
+
+def release_frames(error: BaseException) -> None:
+    """
+    Drop the tracebacks of an exception and of the exceptions it was raised from (or
+    while handling), so that the frames in them and their locals can be collected.
+    """
+    seen: Set[int] = set()
+    pending: List[Optional[BaseException]] = [error]
+    while pending:
+        current = pending.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        current.__traceback__ = None
+        pending += [current.__cause__, current.__context__]
+
+
+@dataclass
+class FailureRecord:
+    """
+    Everything needed to report an exception raised by a test, built as soon as the
+    test finishes. Unlike the exception, a record doesn't keep the frames of the test
+    alive and can always be pickled, so it can be sent between processes.
+
+    Attributes:
+        exc_type: The name of the type of the exception.
+        message: The exception converted to a string.
+        trace: The extracted traceback, with bounded reprs of the locals in each frame.
+            None if the exception was never raised.
+        error_line: The line number of the failing assertion, if any.
+        assert_msg: The message of the failing assertion, if any.
+        operator: The comparison made by the failing assertion, if it was rewritten by ward.
+        lhs: The left hand side of the failing comparison.
+        rhs: The right hand side of the failing comparison.
+    """
+
+    exc_type: str
+    message: str
+    trace: Optional[Trace] = None
+    error_line: Optional[int] = None
+    assert_msg: str = ""
+    operator: Optional[Comparison] = None
+    lhs: Optional[OperandSummary] = None
+    rhs: Optional[OperandSummary] = None
+
+    @classmethod
+    def from_exception(
+        cls,
+        error: BaseException,
+        show_locals: bool = True,
+        width: Optional[int] = None,
+        summary_only: bool = False,
+    ) -> "FailureRecord":
+        """
+        Build a record of an exception. If `summary_only` is True, only its type and
+        message are kept, and the traceback and the operands of a failed comparison
+        (which can be expensive to format) are skipped.
+        """
+        record = cls(
+            exc_type=type(error).__name__,
+            message=str(error),
+            error_line=getattr(error, "error_line", None),
+        )
+        if summary_only:
+            return record
+        tb = error.__traceback__
+        if tb is not None:
+            # The first frame contains library internal code which is not
+            # relevant to end users, so skip over it.
+            record.trace = Traceback.extract(
+                type(error),
+                error,
+                tb.tb_next,
+                show_locals=show_locals,
+                locals_max_length=_LOCALS_MAX_LENGTH,
+                locals_max_string=_LOCALS_MAX_STRING,
+            )
+        if isinstance(error, TestAssertionFailure):
+            width = width or shutil.get_terminal_size().columns
+            record.assert_msg = error.assert_msg
+            record.operator = error.operator
+            record.lhs = OperandSummary.of(error.lhs, width)
+            record.rhs = OperandSummary.of(error.rhs, width)
+        return record
+
+    def summary(self) -> str:
+        """A single line describing the exception, e.g. 'ValueError: invalid value'."""
+        message = self.message.strip().split("\n", 1)[0]
+        return f"{self.exc_type}: {message}" if message else self.exc_type
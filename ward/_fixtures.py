@@ -1,25 +1,45 @@
-from contextlib import suppress
+import asyncio
+import inspect
+import threading
+from contextlib import ExitStack, nullcontext, suppress
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
     Any,
+    Callable,
     Collection,
+    ContextManager,
     Dict,
     Iterable,
     List,
     Mapping,
     Optional,
+    Set,
     Tuple,
     Union,
+    cast,
 )
 
-from ward.fixtures import Fixture, TeardownResult
+from ward._errors import FixtureError
+from ward._event_loop import SessionEventLoop
+from ward._testing import Each
+from ward.fixtures import Fixture, TeardownResult, get_fixture_definition
 from ward.models import Scope
 
+if TYPE_CHECKING:
+    from ward._impact import Footprint, FootprintRecorder
+    from ward.testing import Test
+
 FixtureKey = str
-TestId = str
+TestId = Union[str, int]
 ScopeKey = Union[TestId, Path, Scope]
 ScopeCache = Dict[Scope, Dict[ScopeKey, Dict[FixtureKey, Fixture]]]
+InFlightKey = Tuple[Scope, ScopeKey, FixtureKey]
+# The name of a fixture argument, the index of the node it depends on (if any), and
+# the value it's bound to otherwise.
+FixtureArg = Tuple[str, Optional[int], Any]
 
 
 def _scope_cache_factory():
@@ -43,20 +63,65 @@ class FixtureCache:
         e.g. has a module-scoped fixture been cached for the current test module?
 
     The final lookup lets us retrieve the actual fixture given a fixture key.
+
+    The cache also owns the event loop that async tests and fixtures run on,
+    as it must outlive every fixture in the cache. It's closed once the global
+    fixtures have been torn down.
+
+    While tests run concurrently on the loop, the async fixtures that are being
+    resolved are tracked in `in_flight`, so that a fixture needed by several tasks
+    at once is only resolved once. The cache can also be shared by several threads.
+    A module or global scoped fixture is resolved while holding the lock returned by
+    `resolution_lock`, so that threads that need it at the same time resolve it once.
+
+    If the cache has a `recorder`, the footprint of the code run to resolve each
+    fixture is recorded (see `FootprintRecorder`), so that it can be attributed to
+    every test that uses the fixture, not only the one that resolved it.
     """
 
     _scope_cache: ScopeCache = field(default_factory=_scope_cache_factory)
+    loop: SessionEventLoop = field(default_factory=SessionEventLoop, repr=False)
+    in_flight: Dict[InFlightKey, "asyncio.Task[Fixture]"] = field(
+        default_factory=dict, repr=False
+    )
+    _resolution_locks: Dict[InFlightKey, threading.Lock] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+    recorder: Optional["FootprintRecorder"] = field(
+        default=None, repr=False, compare=False
+    )
 
     def _get_subcache(self, scope: Scope) -> Dict[ScopeKey, Dict[FixtureKey, Fixture]]:
         return self._scope_cache[scope]
 
+    def recording(self) -> ContextManager["Footprint"]:
+        """
+        Record the footprint of the code run in the block if there's a `recorder`.
+        Otherwise the yielded footprint is always empty.
+        """
+        return self.recorder.recording() if self.recorder else nullcontext({})
+
     def get_fixtures_at_scope(
         self, scope: Scope, scope_key: ScopeKey
     ) -> Dict[FixtureKey, Fixture]:
         subcache = self._get_subcache(scope)
-        if scope_key not in subcache:
-            subcache[scope_key] = {}
-        return subcache[scope_key]
+        # setdefault, so that threads adding the same scope key at once share a dict.
+        return subcache.setdefault(scope_key, {})
+
+    def resolution_lock(
+        self, scope: Scope, scope_key: ScopeKey, fixture_key: FixtureKey
+    ) -> threading.Lock:
+        """
+        The lock to hold while resolving and caching a fixture shared between tests.
+        """
+        with self._lock:
+            key = (scope, scope_key, fixture_key)
+            if key not in self._resolution_locks:
+                self._resolution_locks[key] = threading.Lock()
+            return self._resolution_locks[key]
 
     def cache_fixture(self, fixture: Fixture, scope_key: ScopeKey):
         """
@@ -73,15 +138,38 @@ class FixtureCache:
         teardown_results: List[TeardownResult] = []
         for fixture in fixtures:
             with suppress(RuntimeError):
-                teardown_result = fixture.teardown(capture_output)
+                teardown_result = fixture.teardown(capture_output, self.loop)
+                teardown_results.append(teardown_result)
+            del fixture_dict[fixture.key]
+        return teardown_results
+
+    async def teardown_fixtures_for_scope_async(
+        self, scope: Scope, scope_key: ScopeKey, capture_output: bool
+    ) -> List[TeardownResult]:
+        """
+        Like `teardown_fixtures_for_scope`, for use by a task running on the
+        session's event loop. Async generator fixtures are torn down by awaiting
+        them, rather than by running the loop.
+        """
+        fixture_dict = self.get_fixtures_at_scope(scope, scope_key)
+        fixtures = list(fixture_dict.values())
+        teardown_results: List[TeardownResult] = []
+        for fixture in fixtures:
+            with suppress(RuntimeError):
+                if fixture.is_async_generator_fixture:
+                    teardown_result = await fixture.teardown_async(capture_output)
+                else:
+                    teardown_result = fixture.teardown(capture_output, self.loop)
                 teardown_results.append(teardown_result)
             del fixture_dict[fixture.key]
         return teardown_results
 
     def teardown_global_fixtures(self, capture_output: bool) -> List[TeardownResult]:
-        return self.teardown_fixtures_for_scope(
+        teardown_results = self.teardown_fixtures_for_scope(
             Scope.Global, Scope.Global, capture_output
         )
+        self.loop.close()
+        return teardown_results
 
     def contains(self, fixture: Fixture, scope: Scope, scope_key: ScopeKey) -> bool:
         fixtures = self.get_fixtures_at_scope(scope, scope_key)
@@ -125,3 +213,386 @@ def fixture_parents_and_children(
             fixtures_to_children[parent].append(fixture)
 
     return fixtures_to_parents, fixtures_to_children
+
+
+def get_default_args(fn: Callable) -> Dict[str, Any]:
+    """
+    Returns a mapping of the argument names of a test or fixture function to their values.
+
+    If a value is a fixture function, then the raw fixture
+    function is returned as a value in the dict, *not* the `Fixture` object.
+    """
+    meta = getattr(fn, "ward_meta", None)
+
+    # Override the signature if @using is present
+    if meta:
+        bound_args = getattr(meta, "bound_args", None)
+        if bound_args:
+            bound_args.apply_defaults()
+            return dict(bound_args.arguments)
+
+    default_binding = inspect.signature(fn).bind_partial()
+    default_binding.apply_defaults()
+    return dict(default_binding.arguments)
+
+
+@dataclass
+class FixtureNode:
+    """
+    A fixture that has to be resolved as part of a `ResolutionPlan`.
+
+    Attributes:
+        fn: The fixture function.
+        key: The key of the fixture in the fixture cache.
+        scope: The scope of the fixture.
+        args: The arguments to call the fixture function with, in order. Each
+            argument is bound either to the node (by index in the plan) of the fixture
+            it depends on, or to a plain value which is passed to the fixture as-is.
+        is_generator: True if the fixture is a generator function.
+        is_async_generator: True if the fixture is an async generator function.
+        is_coroutine: True if the fixture is defined with 'async def'.
+    """
+
+    fn: Callable
+    key: FixtureKey
+    scope: Scope
+    args: List[FixtureArg]
+    is_generator: bool = False
+    is_async_generator: bool = False
+    is_coroutine: bool = False
+
+    @property
+    def is_async(self) -> bool:
+        return self.is_async_generator or self.is_coroutine
+
+    @property
+    def deps(self) -> List[int]:
+        """The indices of the nodes of the fixtures this fixture depends on."""
+        return [dep for _, dep, _ in self.args if dep is not None]
+
+
+@dataclass
+class ResolutionPlan:
+    """
+    Everything needed to resolve the arguments of a test, worked out once
+    and then reused by every parameterised instance of the test.
+
+    Attributes:
+        args: The default arguments of the test, including any `each` values.
+        each_names: The names of the arguments that are parameterised using `each`.
+        nodes: Every fixture the test could depend on (directly or indirectly),
+            ordered such that each fixture appears after the fixtures it depends on.
+            Fixtures passed to `each` as an iterable of unknown length are added
+            as the instances of the test that use them are resolved.
+    """
+
+    args: Dict[str, Any]
+    each_names: List[str] = field(default_factory=list)
+    nodes: List[FixtureNode] = field(default_factory=list)
+    _node_index: Dict[FixtureKey, int] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def for_function(cls, fn: Callable) -> "ResolutionPlan":
+        plan = cls(args=get_default_args(fn))
+        for name, arg in plan.args.items():
+            if isinstance(arg, Each):
+                plan.each_names.append(name)
+                values = arg.args if arg.is_sized else ()
+            else:
+                values = (arg,)
+            for value in values:
+                if is_fixture(value):
+                    plan._add_node(value)
+        return plan
+
+    def _add_node(self, fn: Callable) -> int:
+        definition = get_fixture_definition(fn)
+        if definition.key in self._node_index:
+            return self._node_index[definition.key]
+
+        args: List[FixtureArg] = []
+        for name, value in get_default_args(fn).items():
+            if hasattr(value, "ward_meta"):
+                args.append((name, self._add_node(value), None))
+            else:
+                args.append((name, None, value))
+
+        self.nodes.append(
+            FixtureNode(
+                fn=fn,
+                key=definition.key,
+                scope=definition.scope,
+                args=args,
+                is_generator=definition.is_generator,
+                is_async_generator=definition.is_async_generator,
+                is_coroutine=definition.is_coroutine,
+            )
+        )
+        self._node_index[definition.key] = len(self.nodes) - 1
+        return len(self.nodes) - 1
+
+    def args_for_instance(
+        self, iteration: int, row: Optional[Tuple[Any, ...]] = None
+    ) -> Dict[str, Any]:
+        """
+        Returns the arguments of an instance of the test, without resolving fixtures.
+        `row` holds the values of the `each` arguments for the instance, in the order of
+        `each_names`. If it's not given, the values are looked up using `iteration`.
+        """
+        args = dict(self.args)
+        if row is not None:
+            args.update(zip(self.each_names, row))
+        else:
+            for name in self.each_names:
+                args[name] = args[name][iteration]
+        return args
+
+    def resolve(
+        self, test: "Test", cache: FixtureCache, args: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Resolve the arguments of an instance of the test (see `args_for_instance`),
+        resolving any fixtures it depends on that aren't already in the cache,
+        and caching them.
+        """
+        roots = {
+            name: self._add_node(arg) for name, arg in args.items() if is_fixture(arg)
+        }
+        fixtures = self._resolve_nodes(set(roots.values()), test, cache)
+        return {
+            name: fixtures[roots[name]].resolved_val if name in roots else arg
+            for name, arg in args.items()
+        }
+
+    def _resolve_nodes(
+        self, required: Set[int], test: "Test", cache: FixtureCache
+    ) -> Dict[int, Fixture]:
+        fixtures = self._find_cached(required, test, cache)
+
+        # Then resolve the fixtures that aren't cached, dependencies first. Async
+        # fixtures that don't depend on each other are awaited concurrently.
+        for wave in self._waves(required - fixtures.keys()):
+            async_wave = [index for index in wave if self.nodes[index].is_async]
+            if len(async_wave) > 1:
+                fixtures.update(
+                    cache.loop.run(
+                        self._resolve_wave_async(async_wave, fixtures, test, cache)
+                    )
+                )
+            for index in wave:
+                if index not in fixtures:
+                    fixtures[index] = self._resolve_node(
+                        self.nodes[index], fixtures, test, cache
+                    )
+        return fixtures
+
+    def _find_cached(
+        self, required: Set[int], test: "Test", cache: FixtureCache
+    ) -> Dict[int, Fixture]:
+        # Visit the fixtures that depend on others first, to find out which are already
+        # cached. The dependencies of a cached fixture aren't needed unless
+        # something else that isn't cached depends on them. `required` is updated
+        # with the dependencies that are needed.
+        fixtures: Dict[int, Fixture] = {}
+        for index in reversed(range(len(self.nodes))):
+            if index not in required:
+                continue
+            node = self.nodes[index]
+            cached = cache.get(node.key, node.scope, test.scope_key_from(node.scope))
+            if cached is not None:
+                fixtures[index] = cached
+            else:
+                required.update(node.deps)
+        return fixtures
+
+    def _waves(self, indices: Set[int]) -> List[List[int]]:
+        """
+        Split the fixtures that need resolving into waves, such that each fixture
+        only depends on fixtures in earlier waves (or that are already cached).
+        The fixtures in a wave are independent of each other.
+        """
+        wave_of: Dict[int, int] = {}
+        waves: List[List[int]] = []
+        for index in sorted(indices):
+            deps = [wave_of[dep] for dep in self.nodes[index].deps if dep in wave_of]
+            wave = max(deps, default=-1) + 1
+            wave_of[index] = wave
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(index)
+        return waves
+
+    async def resolve_async(
+        self, test: "Test", cache: FixtureCache, args: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Like `resolve`, for use by a task running on the session's event loop.
+        """
+        roots = {
+            name: self._add_node(arg) for name, arg in args.items() if is_fixture(arg)
+        }
+        fixtures = await self._resolve_nodes_async(set(roots.values()), test, cache)
+        return {
+            name: fixtures[roots[name]].resolved_val if name in roots else arg
+            for name, arg in args.items()
+        }
+
+    async def _resolve_nodes_async(
+        self, required: Set[int], test: "Test", cache: FixtureCache
+    ) -> Dict[int, Fixture]:
+        fixtures = self._find_cached(required, test, cache)
+        for wave in self._waves(required - fixtures.keys()):
+            fixtures.update(await self._resolve_wave_async(wave, fixtures, test, cache))
+        return fixtures
+
+    async def _resolve_wave_async(
+        self,
+        wave: List[int],
+        fixtures: Dict[int, Fixture],
+        test: "Test",
+        cache: FixtureCache,
+    ) -> Dict[int, Fixture]:
+        results = await asyncio.gather(
+            *(
+                self._resolve_node_async(self.nodes[index], fixtures, test, cache)
+                for index in wave
+            ),
+            return_exceptions=True,
+        )
+        # Wait for every fixture in the wave to finish, so none are left part way
+        # through being set up, then report the first that failed (in the same
+        # order they'd be resolved in one at a time), whichever failed first.
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return dict(zip(wave, cast(List[Fixture], results)))
+
+    @classmethod
+    async def _resolve_node_async(
+        cls,
+        node: FixtureNode,
+        fixtures: Dict[int, Fixture],
+        test: "Test",
+        cache: FixtureCache,
+    ) -> Fixture:
+        # Another task may have cached the fixture while this one was waiting.
+        scope_key = test.scope_key_from(node.scope)
+        cached = cache.get(node.key, node.scope, scope_key)
+        if cached is not None:
+            return cached
+        if not node.is_async:
+            return cls._resolve_node(node, fixtures, test, cache)
+
+        # If another task is already resolving the fixture, wait for it to finish
+        # rather than resolving it again. The resolution is shielded, so that it
+        # carries on for the other tasks waiting for it if this one is cancelled.
+        key = (node.scope, scope_key, node.key)
+        task = cache.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                cls._create_async_fixture(node, fixtures, test, cache)
+            )
+            cache.in_flight[key] = task
+            task.add_done_callback(partial(_resolution_done, cache.in_flight, key))
+        try:
+            return await asyncio.shield(task)
+        except FixtureError as e:
+            # Every task waiting for the fixture gets its own error to report.
+            raise FixtureError(str(e)) from e.__cause__
+
+    @classmethod
+    async def _create_async_fixture(
+        cls,
+        node: FixtureNode,
+        fixtures: Dict[int, Fixture],
+        test: "Test",
+        cache: FixtureCache,
+    ) -> Fixture:
+        fixture = Fixture(node.fn)
+        args_to_inject = cls._args_to_inject(node, fixtures)
+        try:
+            with cache.recording() as fixture.footprint:
+                if node.is_async_generator:
+                    fixture.gen = node.fn(**args_to_inject)
+                    awaitable = fixture.gen.__anext__()  # type: ignore[union-attr]
+                    fixture.resolved_val = await awaitable
+                else:
+                    fixture.resolved_val = await node.fn(**args_to_inject)
+        except (Exception, SystemExit) as e:
+            raise FixtureError(f"Unable to resolve fixture '{fixture.name}'") from e
+        cache.cache_fixture(fixture, test.scope_key_from(node.scope))
+        return fixture
+
+    @staticmethod
+    def _args_to_inject(
+        node: FixtureNode, fixtures: Dict[int, Fixture]
+    ) -> Dict[str, Any]:
+        return {
+            name: fixtures[dep].resolved_val if dep is not None else value
+            for name, dep, value in node.args
+        }
+
+    @classmethod
+    def _resolve_node(
+        cls,
+        node: FixtureNode,
+        fixtures: Dict[int, Fixture],
+        test: "Test",
+        cache: FixtureCache,
+    ) -> Fixture:
+        scope_key = test.scope_key_from(node.scope)
+        if node.scope is Scope.Test:
+            # Only the test itself can resolve its test scoped fixtures.
+            return cls._create_fixture(node, fixtures, scope_key, cache)
+
+        # Fixtures shared between tests may be needed by several threads at once.
+        # Async fixtures take the event loop's lock first, as anything that
+        # already holds it may need to resolve a fixture.
+        with ExitStack() as stack:
+            if node.is_async:
+                stack.enter_context(cache.loop.lock)
+            stack.enter_context(cache.resolution_lock(node.scope, scope_key, node.key))
+            cached = cache.get(node.key, node.scope, scope_key)
+            if cached is not None:
+                return cached
+            return cls._create_fixture(node, fixtures, scope_key, cache)
+
+    @classmethod
+    def _create_fixture(
+        cls,
+        node: FixtureNode,
+        fixtures: Dict[int, Fixture],
+        scope_key: ScopeKey,
+        cache: FixtureCache,
+    ) -> Fixture:
+        fixture = Fixture(node.fn)
+        args_to_inject = cls._args_to_inject(node, fixtures)
+        try:
+            with cache.recording() as fixture.footprint:
+                if node.is_generator:
+                    fixture.gen = node.fn(**args_to_inject)
+                    fixture.resolved_val = next(fixture.gen)  # type: ignore[arg-type]
+                elif node.is_async_generator:
+                    fixture.gen = node.fn(**args_to_inject)
+                    awaitable = fixture.gen.__anext__()  # type: ignore[union-attr]
+                    fixture.resolved_val = cache.loop.run(awaitable)
+                elif node.is_coroutine:
+                    fixture.resolved_val = cache.loop.run(node.fn(**args_to_inject))
+                else:
+                    fixture.resolved_val = node.fn(**args_to_inject)
+        except (Exception, SystemExit) as e:
+            raise FixtureError(f"Unable to resolve fixture '{fixture.name}'") from e
+        cache.cache_fixture(fixture, scope_key)
+        return fixture
+
+
+def _resolution_done(
+    in_flight: Dict[InFlightKey, "asyncio.Task[Fixture]"],
+    key: InFlightKey,
+    task: "asyncio.Task[Fixture]",
+) -> None:
+    in_flight.pop(key, None)
+    # Every task waiting for the resolution may have been cancelled, in which
+    # case nothing else retrieves its exception, and asyncio would log it.
+    if not task.cancelled():
+        task.exception()
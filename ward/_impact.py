@@ -0,0 +1,327 @@
+import hashlib
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from sysconfig import get_path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import click
+
+from ward._cache import ProjectCache
+from ward._durations import test_key
+from ward.testing import ParameterisedInstance, Test, TestOutcome, TestResult
+
+_CACHE_KEY = "impact"
+
+# The value of --affected-by which selects the tests affected by the changes
+# made since their footprints were recorded, rather than since a git revision.
+LAST_RUN = "last-run"
+
+# The source files (relative to the project root, in posix form) that a test
+# executed, and the lines it executed in each of them.
+Footprint = Dict[str, List[int]]
+
+# The outcomes of tests whose footprints are recorded. The footprint of a test that
+# fails is forgotten instead, so that the test is selected until it passes again.
+_RECORDED_OUTCOMES = (TestOutcome.PASS, TestOutcome.XFAIL, TestOutcome.XPASS)
+
+_monitoring = getattr(sys, "monitoring", None)  # Python 3.12+
+# Returned by the line callback, so the line isn't reported again until events restart.
+_DISABLE = getattr(_monitoring, "DISABLE", None)
+
+Executed = Set[Tuple[str, int]]
+
+
+def merge_footprints(*footprints: Footprint) -> Footprint:
+    merged: Dict[str, Set[int]] = {}
+    for footprint in footprints:
+        for path, lines in footprint.items():
+            merged.setdefault(path, set()).update(lines)
+    return {path: sorted(lines) for path, lines in merged.items()}
+
+
+class FootprintRecorder:
+    """
+    Records which lines of the source files in a project are executed while
+    code runs inside a `recording` block. Files outside of the project root,
+    and any installed packages inside of it, are ignored.
+
+    Lines are traced with `sys.monitoring` where it's available (Python 3.12+),
+    which only reports each line the first time it runs in a block, so code that
+    runs repeatedly costs almost nothing. Otherwise `sys.settrace` is used.
+
+    Blocks can be nested (e.g. while a module scoped fixture is resolved as part
+    of a test), in which case each line is recorded in every block it runs in.
+    Lines are recorded regardless of which thread runs them, so tests that run
+    concurrently in several threads can't be told apart.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        self._ignored = [
+            p for p in {get_path("platlib"), get_path("purelib")} if p is not None
+        ]
+        self._paths: Dict[str, Optional[str]] = {}
+        self._active: List[Executed] = []
+        # sys.monitoring, while this recorder is using it.
+        self._monitoring: Optional[Any] = None
+        self._previous_trace: Optional[Callable[..., Any]] = None
+
+    @classmethod
+    def for_project(cls, project_root: Optional[Path]) -> "FootprintRecorder":
+        return cls(project_root if project_root else Path.cwd())
+
+    @contextmanager
+    def recording(self) -> Iterator[Footprint]:
+        """
+        Record the lines executed in the block into the yielded footprint,
+        which is filled in when the block exits.
+        """
+        footprint: Footprint = {}
+        executed: Executed = set()
+        self._start(executed)
+        try:
+            yield footprint
+        finally:
+            self._stop(executed)
+            footprint.update(self._to_footprint(executed))
+
+    def _relative_path(self, filename: str) -> Optional[str]:
+        if filename not in self._paths:
+            path = os.path.realpath(filename)
+            relative = None
+            if not any(path.startswith(p) for p in self._ignored):
+                try:
+                    relative = Path(path).relative_to(self.root).as_posix()
+                except ValueError:
+                    pass
+            self._paths[filename] = relative
+        return self._paths[filename]
+
+    def _to_footprint(self, executed: Executed) -> Footprint:
+        lines: Dict[str, Set[int]] = {}
+        for filename, line in executed:
+            path = self._relative_path(filename)
+            if path is not None:
+                lines.setdefault(path, set()).add(line)
+        return {path: sorted(path_lines) for path, path_lines in lines.items()}
+
+    def _start(self, executed: Executed) -> None:
+        self._active.append(executed)
+        if len(self._active) == 1:
+            self._install()
+        elif self._monitoring is not None:
+            # Lines that already ran in the enclosing block are disabled,
+            # and have to be reported again to be recorded in this one.
+            self._monitoring.restart_events()
+
+    def _stop(self, executed: Executed) -> None:
+        self._active = [e for e in self._active if e is not executed]
+        if not self._active:
+            self._uninstall()
+
+    def _install(self) -> None:
+        if _monitoring is not None:
+            try:
+                _monitoring.use_tool_id(_monitoring.COVERAGE_ID, "ward")
+            except ValueError:
+                pass  # Another tool (e.g. coverage.py) is already using it.
+            else:
+                self._monitoring = _monitoring
+                _monitoring.register_callback(
+                    _monitoring.COVERAGE_ID, _monitoring.events.LINE, self._on_line
+                )
+                _monitoring.set_events(_monitoring.COVERAGE_ID, _monitoring.events.LINE)
+                _monitoring.restart_events()
+                return
+        self._previous_trace = sys.gettrace()
+        sys.settrace(self._trace_call)
+
+    def _uninstall(self) -> None:
+        monitoring = self._monitoring
+        if monitoring is not None:
+            self._monitoring = None
+            monitoring.set_events(monitoring.COVERAGE_ID, 0)
+            monitoring.register_callback(
+                monitoring.COVERAGE_ID, monitoring.events.LINE, None
+            )
+            monitoring.free_tool_id(monitoring.COVERAGE_ID)
+        else:
+            sys.settrace(self._previous_trace)
+            self._previous_trace = None
+
+    def _on_line(self, code, line: int):
+        if self._relative_path(code.co_filename) is not None:
+            for executed in self._active:
+                executed.add((code.co_filename, line))
+        return _DISABLE
+
+    def _trace_call(self, frame, event, arg):
+        if self._relative_path(frame.f_code.co_filename) is None:
+            return None
+        return self._trace_line
+
+    def _trace_line(self, frame, event, arg):
+        if event == "line":
+            for executed in self._active:
+                executed.add((frame.f_code.co_filename, frame.f_lineno))
+        return self._trace_line
+
+
+def _digest(path: Path) -> Optional[str]:
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=8).hexdigest()
+    except OSError:
+        return None
+
+
+def changed_files_since(revision: str, project_root: Optional[Path]) -> Set[str]:
+    """
+    Returns the files (relative to the project root, in posix form) that differ
+    from the given git revision, including changes that haven't been committed
+    and files that git isn't tracking yet.
+    """
+    root = str(project_root if project_root else Path.cwd())
+    commands = [
+        ["git", "-C", root, "diff", "--name-only", "--no-renames", "--relative"]
+        + [revision, "--"],
+        ["git", "-C", root, "ls-files", "--others", "--exclude-standard"],
+    ]
+    changed: Set[str] = set()
+    for command in commands:
+        try:
+            process = subprocess.run(command, capture_output=True, text=True)
+        except OSError as e:
+            raise click.BadParameter(
+                f"unable to run git: {e}", param_hint="--affected-by"
+            )
+        if process.returncode != 0:
+            raise click.BadParameter(
+                f"unable to find the files changed since {revision!r}: "
+                f"{process.stderr.strip()}",
+                param_hint="--affected-by",
+            )
+        changed.update(line for line in process.stdout.splitlines() if line)
+    return changed
+
+
+@dataclass
+class ImpactMap:
+    """
+    The footprints of the tests that passed in previous sessions: the source files
+    each of them executed, the lines executed in each file, and a digest of the
+    contents of the file at the time. Keyed by test key (see `test_key`).
+
+    Used to select only the tests that could be affected by a change, i.e. those
+    that executed a file that has changed. Tests that have no recorded footprint
+    (because they're new, or they failed) are always selected.
+    """
+
+    project_root: Optional[Path]
+    tests: Dict[str, Dict[str, Tuple[str, List[int]]]] = field(default_factory=dict)
+    _session: Dict[str, Optional[Footprint]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    @classmethod
+    def load(cls, cache: ProjectCache, project_root: Optional[Path]) -> "ImpactMap":
+        tests = cache.get(_CACHE_KEY, default={})
+        if not isinstance(tests, dict):
+            tests = {}
+        return cls(project_root=project_root, tests=tests)
+
+    def save(self, cache: ProjectCache) -> None:
+        """
+        Save the footprints recorded this session (see `record`), replacing those
+        recorded previously for the same tests.
+        """
+        digests: Dict[str, Optional[str]] = {}
+        for key, footprint in self._session.items():
+            if footprint is None:
+                self.tests.pop(key, None)
+                continue
+            files: Dict[str, Tuple[str, List[int]]] = {}
+            for path, lines in footprint.items():
+                if path not in digests:
+                    digests[path] = _digest(self._root / path)
+                digest = digests[path]
+                if digest is not None:
+                    files[path] = (digest, lines)
+            self.tests[key] = files
+        self._session.clear()
+        cache.set(_CACHE_KEY, self.tests)
+
+    @property
+    def _root(self) -> Path:
+        return self.project_root if self.project_root else Path.cwd()
+
+    def record(self, results: Iterable[TestResult]) -> Iterator[TestResult]:
+        """
+        Yields each result, recording the footprint of the test it belongs to. The
+        footprints of every instance of a parameterised test are combined, and if
+        any instance fails, the test's footprint is forgotten when saved.
+        """
+        for result in results:
+            key = test_key(result.test, self.project_root)
+            if result.outcome in (TestOutcome.FAIL, TestOutcome.TIMEOUT):
+                self._session[key] = None
+            elif (
+                result.outcome in _RECORDED_OUTCOMES
+                and result.footprint is not None
+                and (key not in self._session or self._session[key] is not None)
+            ):
+                module = self._relative_module_path(result.test)
+                self._session[key] = merge_footprints(
+                    self._session.get(key) or {},
+                    result.footprint,
+                    {module: []} if module else {},
+                )
+            yield result
+
+    def _relative_module_path(
+        self, test: Union[Test, ParameterisedInstance]
+    ) -> Optional[str]:
+        try:
+            return test.path.resolve().relative_to(self._root.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    def select_affected(
+        self, tests: List[Test], changed_files: Optional[Set[str]] = None
+    ) -> List[Test]:
+        """
+        Return the tests that could be affected by the changed files, in their
+        original order. If `changed_files` is None, a file has changed if its contents
+        are different to when the footprint of the test was recorded.
+        """
+        digests: Dict[str, Optional[str]] = {}
+
+        def has_changed(path: str, digest: str) -> bool:
+            if changed_files is not None:
+                return path in changed_files
+            if path not in digests:
+                digests[path] = _digest(self._root / path)
+            return digests[path] != digest
+
+        selected = []
+        for test in tests:
+            files = self.tests.get(test_key(test, self.project_root))
+            if files is None or any(
+                has_changed(path, digest) for path, (digest, _) in files.items()
+            ):
+                selected.append(test)
+        return selected
@@ -0,0 +1,299 @@
+import ast
+import hashlib
+import importlib.util
+import os
+import pkgutil
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from sysconfig import get_path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ward._cache import ProjectCache
+from ward._collect import get_module_paths, package_data_for_path
+from ward._index import fingerprint
+from ward._ward_version import __version__
+
+_CACHE_KEY = "import_graph"
+
+# An import statement: the number of leading dots (0 for an absolute import),
+# the module being imported, and the names imported from it (if any).
+ImportRef = Tuple[int, str, List[str]]
+
+
+def read_imports(source: str) -> List[ImportRef]:
+    """
+    Find every import statement in the source code of a module, including those
+    inside functions and conditional blocks, since any of them might run.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+
+    imports: List[ImportRef] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports += [(0, alias.name, []) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names = [alias.name for alias in node.names if alias.name != "*"]
+            imports.append((node.level, node.module or "", names))
+    return imports
+
+
+def imported_module_names(ref: ImportRef, package: str) -> List[str]:
+    """
+    Returns the absolute names of the modules that might be imported by an import
+    statement in a module that belongs to `package`. That includes each parent
+    package of the module, and each imported name that might be a submodule.
+    """
+    level, module, names = ref
+    if level:
+        parts = package.split(".") if package else []
+        if level - 1 > len(parts):
+            return []
+        base = ".".join(parts[: len(parts) - level + 1] + ([module] if module else []))
+    else:
+        base = module
+
+    return _parents(base) + [f"{base}.{name}" if base else name for name in names]
+
+
+def _parents(name: str) -> List[str]:
+    """Returns 'a', 'a.b' and 'a.b.c' for the module name 'a.b.c'."""
+    parts = name.split(".") if name else []
+    return [".".join(parts[: i + 1]) for i in range(len(parts))]
+
+
+@dataclass
+class ImportGraph:
+    """
+    The imports of the Python source files in a project, used to work out which
+    files each test module depends on (directly or indirectly) without importing
+    anything.
+
+    The import statements read from each file are persisted between sessions,
+    along with the file's modification time, size and a digest of its contents.
+    A file is only parsed again if its contents have changed. Imports are resolved
+    to files each session, as that depends on `sys.path` and on which files exist.
+    """
+
+    project_root: Path
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    changed: bool = field(default=False, repr=False, compare=False)
+    _search_path: List[str] = field(default_factory=list, init=False, repr=False)
+    _resolved: Dict[str, Optional[Path]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _edges: Dict[Path, Set[Path]] = field(default_factory=dict, init=False, repr=False)
+    _missing: Dict[Path, Set[Path]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _project_search_path: List[Path] = field(
+        default_factory=list, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.project_root = self.project_root.resolve()
+        self._installed = [
+            p for p in {get_path("platlib"), get_path("purelib")} if p is not None
+        ]
+
+    @classmethod
+    def load(cls, cache: ProjectCache, project_root: Optional[Path]) -> "ImportGraph":
+        root = project_root if project_root else Path.cwd()
+        data = cache.get(_CACHE_KEY, default={})
+        if not isinstance(data, dict) or data.get("version") != __version__:
+            return cls(project_root=root)
+        return cls(project_root=root, files=data.get("files", {}))
+
+    def save(self, cache: ProjectCache) -> None:
+        """
+        Write the graph to the cache, if any file has been parsed since it was loaded.
+        """
+        if not self.changed:
+            return
+        self.changed = False
+        cache.set(_CACHE_KEY, {"version": __version__, "files": self.files})
+
+    def imports_of(self, path: Path) -> List[ImportRef]:
+        """
+        Returns the import statements in the file at `path`, reading them from
+        the cache if the file hasn't changed since they were last read.
+        """
+        key = str(path)
+        entry = self.files.get(key)
+        current = fingerprint(path)
+        if entry is not None and entry["fingerprint"] == current:
+            return entry["imports"]
+
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return []
+        digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+        self.changed = True
+        if entry is not None and entry["digest"] == digest:
+            # Only the modification time changed, e.g. after a git checkout.
+            entry["fingerprint"] = current
+            return entry["imports"]
+
+        try:
+            imports = read_imports(importlib.util.decode_source(data))
+        except (SyntaxError, UnicodeDecodeError):
+            imports = []
+        self.files[key] = {
+            "fingerprint": current,
+            "digest": digest,
+            "imports": imports,
+        }
+        return imports
+
+    def find_module(self, name: str) -> Optional[Path]:
+        """
+        Returns the source file of the module with the given absolute name, if
+        it's part of the project, searching the same paths Python would.
+        """
+        if name not in self._resolved:
+            self._resolved[name] = self._find_module(name)
+        return self._resolved[name]
+
+    def _find_module(self, name: str) -> Optional[Path]:
+        parts = name.split(".")
+        namespace_portions = []
+        for entry in self._search_path:
+            base = Path(entry or ".")
+            top_level = base / parts[0]
+            is_package = (top_level / "__init__.py").is_file()
+            if is_package or top_level.with_suffix(".py").is_file():
+                return self._source_file(base.joinpath(*parts))
+            if top_level.is_dir():
+                namespace_portions.append(base)
+        # A namespace package is only used if there isn't a regular package or
+        # module with the same name anywhere on the path.
+        for base in namespace_portions:
+            found = self._source_file(base.joinpath(*parts))
+            if found is not None:
+                return found
+        return None
+
+    def _source_file(self, module: Path) -> Optional[Path]:
+        for candidate in (module / "__init__.py", module.with_suffix(".py")):
+            if candidate.is_file():
+                return self._within_project(candidate)
+        return None
+
+    def _within_project(self, path: Path) -> Optional[Path]:
+        path = path.resolve()
+        if any(str(path).startswith(p) for p in self._installed):
+            return None
+        try:
+            path.relative_to(self.project_root)
+        except ValueError:
+            return None
+        return path
+
+    def _expected_files(self, name: str) -> List[Path]:
+        """
+        Returns where the source file of a module that can't be found would be,
+        if it were part of the project, e.g. because it's been deleted or renamed.
+        """
+        parts = name.split(".")
+        return [
+            candidate
+            for base in self._project_search_path
+            for candidate in (
+                base.joinpath(*parts, "__init__.py"),
+                base.joinpath(*parts[:-1], f"{parts[-1]}.py"),
+            )
+        ]
+
+    def _imported_files(self, path: Path) -> Set[Path]:
+        """
+        Returns the files in the project imported by the module at `path`. The files
+        its unresolved imports would be in are recorded in `_missing`.
+        """
+        if path not in self._edges:
+            package = package_data_for_path(path).pkg_name
+            files = set()
+            missing = set()
+            for ref in self.imports_of(path):
+                for name in imported_module_names(ref, package):
+                    found = self.find_module(name)
+                    if found is not None:
+                        files.add(found)
+                    else:
+                        missing.update(self._expected_files(name))
+            self._edges[path] = files
+            self._missing[path] = missing
+        return self._edges[path]
+
+    def depends_on_any(self, path: Path, files: Set[Path]) -> bool:
+        """
+        True if the module at `path`, any module it imports (directly or indirectly),
+        or any package they belong to is in `files`. An import that can't be resolved
+        counts if the file it would be in is in `files`, so deleting or renaming a
+        module still selects the modules that import it.
+        """
+        path = path.resolve()
+        # Importing a test module runs the __init__.py of each package it's in.
+        package = package_data_for_path(path).pkg_name
+        stack = [path] + [
+            found
+            for found in (self.find_module(name) for name in _parents(package))
+            if found is not None
+        ]
+        seen = set(stack)
+        while stack:
+            current = stack.pop()
+            imported_files = self._imported_files(current)
+            if current in files or not files.isdisjoint(self._missing[current]):
+                return True
+            for imported in imported_files - seen:
+                seen.add(imported)
+                stack.append(imported)
+        return False
+
+    def set_search_path(self, test_module_paths: Iterable[Path]) -> None:
+        """
+        Search for modules on `sys.path` as it will be once the test modules at the
+        given paths have been loaded (see `ward._collect.load_modules`).
+        """
+        search_path = list(sys.path)
+        for path in test_module_paths:
+            root = str(package_data_for_path(path).pkg_root)
+            if root not in search_path:
+                search_path.append(root)
+        self._search_path = search_path
+        self._project_search_path = [
+            base
+            for base in (
+                self._within_project(Path(entry or ".")) for entry in search_path
+            )
+            if base is not None
+        ]
+        self._resolved.clear()
+        self._edges.clear()
+        self._missing.clear()
+
+
+def filter_modules_by_imports(
+    modules: List[pkgutil.ModuleInfo],
+    changed_files: Iterable[str],
+    graph: ImportGraph,
+) -> List[pkgutil.ModuleInfo]:
+    """
+    Remove the test modules that don't import any of the changed files (directly or
+    indirectly), judging by their import statements, so they don't need to be imported.
+    `changed_files` are relative to the project root.
+    """
+    changed = {
+        Path(os.path.realpath(graph.project_root / path)) for path in changed_files
+    }
+    paths = get_module_paths(modules)
+    graph.set_search_path(paths)
+    return [
+        module
+        for module, path in zip(modules, paths)
+        if graph.depends_on_any(path, changed)
+    ]
@@ -0,0 +1,372 @@
+import hashlib
+import inspect
+import linecache
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from sysconfig import get_path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ward._cache import ProjectCache
+from ward._testing import is_test_module_name
+from ward._utilities import group_by
+from ward._ward_version import __version__
+from ward.models import CollectionMetadata, Marker, SkipMarker, XfailMarker
+from ward.testing import ParameterisedInstance, Test
+
+_CACHE_KEY = "collection_index"
+
+# The number of distinct sessions (i.e. sets of test modules) that are
+# remembered. Older sessions are forgotten as new ones are recorded.
+_MAX_SESSIONS = 8
+
+Fingerprint = List[int]
+DirEntries = List[Tuple[str, bool]]
+
+
+def fingerprint(path: Path) -> Optional[Fingerprint]:
+    """
+    Returns the modification time (in nanoseconds) and size of the file at `path`,
+    which together change whenever the contents of the file are likely to have changed.
+    Returns None if the file can't be read.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+@dataclass
+class DirListing:
+    """
+    The subdirectories of a directory, and the test modules directly inside of it.
+    Each subdirectory is paired with whether or not it's a symlink, and each test
+    module with whether or not it's a package.
+    """
+
+    subdirs: DirEntries
+    modules: DirEntries
+
+
+@dataclass
+class CollectionIndex:
+    """
+    An index of the test modules in a project and the tests they contained, persisted
+    between sessions so that unchanged directories don't need to be searched again,
+    and so that some commands can be answered without importing any tests at all.
+
+    Each entry is recorded alongside the modification times of the files and directories
+    it was derived from, and is ignored as soon as any of them change. The whole index is
+    discarded if it was written by a different version of Ward, or for different exclusions.
+    """
+
+    exclude: List[str]
+    dirs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    modules: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    sessions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    changed: bool = field(default=False, repr=False, compare=False)
+
+    @classmethod
+    def load(cls, cache: ProjectCache, exclude: Iterable[str]) -> "CollectionIndex":
+        exclude = list(exclude)
+        data = cache.get(_CACHE_KEY, default={})
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != __version__
+            or data.get("exclude") != exclude
+        ):
+            return cls(exclude=exclude)
+        return cls(
+            exclude=exclude,
+            dirs=data.get("dirs", {}),
+            modules=data.get("modules", {}),
+            sessions=data.get("sessions", {}),
+        )
+
+    def save(self, cache: ProjectCache) -> None:
+        """
+        Write the index to the cache, if anything has been recorded in it.
+        """
+        if not self.changed:
+            return
+        self.changed = False
+        cache.set(
+            _CACHE_KEY,
+            {
+                "version": __version__,
+                "exclude": self.exclude,
+                "dirs": self.dirs,
+                "modules": self.modules,
+                "sessions": self.sessions,
+            },
+        )
+
+    def get_dir(self, path: Path) -> Optional[DirListing]:
+        """
+        Returns the listing recorded for the directory at `path`, or None if it
+        has changed since it was recorded. A directory has changed if an entry has been
+        added, removed or renamed inside of it, or if one of the subdirectories that is
+        named like a test module (and so could be a test package) has changed.
+        """
+        entry = self.dirs.get(str(path.absolute()))
+        if not entry or entry["mtime"] != _mtime(path):
+            return None
+        if any(_mtime(path / name) != mtime for name, mtime in entry["watch"].items()):
+            return None
+        return DirListing(
+            subdirs=[(name, link) for name, link in entry["subdirs"]],
+            modules=[(name, ispkg) for name, ispkg in entry["modules"]],
+        )
+
+    def set_dir(self, path: Path, listing: DirListing) -> None:
+        self.changed = True
+        self.dirs[str(path.absolute())] = {
+            "mtime": _mtime(path),
+            "watch": {
+                name: _mtime(path / name)
+                for name, _ in listing.subdirs
+                if is_test_module_name(name)
+            },
+            "subdirs": listing.subdirs,
+            "modules": listing.modules,
+        }
+
+    def record_session(
+        self,
+        module_paths: List[Path],
+        tests: List[Test],
+        num_fixtures: int,
+        project_root: Optional[Path],
+    ) -> Dict[str, Any]:
+        """
+        Record the tests that were collected from the modules at `module_paths`, along
+        with the other modules in the project that were imported while collecting them.
+        Returns the entry for the session, which can be used to store more information
+        that is only valid for as long as the session is unchanged.
+        """
+        self.changed = True
+        tests_by_path = group_by(tests, key=lambda t: t.path)
+        for path in module_paths:
+            self.modules[str(path)] = {
+                "fingerprint": fingerprint(path),
+                "tests": [_test_record(t) for t in tests_by_path.get(path, [])],
+            }
+
+        session_key = _session_key(module_paths)
+        self.sessions.pop(session_key, None)
+        while len(self.sessions) >= _MAX_SESSIONS:
+            self.sessions.pop(next(iter(self.sessions)))
+        session = self.sessions[session_key] = {
+            "dependencies": _project_dependencies(project_root),
+            "num_fixtures": num_fixtures,
+            "fixture_output": {},
+        }
+        return session
+
+    def get_session(self, module_paths: List[Path]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the entry for the session that collected tests from exactly the modules
+        at `module_paths`, or None if any of those modules, or any of the modules they
+        imported, have changed since it was recorded.
+        """
+        session = self.sessions.get(_session_key(module_paths))
+        if session is None:
+            return None
+        for path in module_paths:
+            entry = self.modules.get(str(path))
+            if not entry or entry["fingerprint"] != fingerprint(path):
+                return None
+        for path, recorded in session["dependencies"].items():
+            if fingerprint(Path(path)) != recorded:
+                return None
+        return session
+
+    def get_tests(
+        self, module_paths: List[Path], capture_output: bool = True
+    ) -> Optional[List[Test]]:
+        """
+        Returns the tests recorded for the modules at `module_paths` (as `IndexedTest`s),
+        or None if any of them can't be rebuilt from the index. The caller should check
+        that the session is unchanged first (see `get_session`).
+        """
+        tests: List[Test] = []
+        for path in module_paths:
+            for record in self.modules[str(path)]["tests"]:
+                if record is None:
+                    return None
+                tests.append(IndexedTest(TestRecord(**record), path, capture_output))
+        return tests
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _session_key(module_paths: List[Path]) -> str:
+    joined = "\n".join(sorted(str(p) for p in module_paths))
+    return hashlib.sha1(joined.encode()).hexdigest()
+
+
+def _project_dependencies(
+    project_root: Optional[Path],
+) -> Dict[str, Optional[Fingerprint]]:
+    """
+    Fingerprint the modules that have been imported from inside the project (but
+    outside any installed packages), since the tests that are collected from a
+    test module can depend on the contents of the modules it imports.
+    """
+    base = str(project_root.resolve() if project_root else Path.cwd())
+    installed = {get_path("platlib"), get_path("purelib")}
+    dependencies = {}
+    for module in list(sys.modules.values()):
+        file = getattr(module, "__file__", None)
+        if not file:
+            continue
+        path = os.path.abspath(file)
+        if path.startswith(base) and not any(path.startswith(p) for p in installed):
+            dependencies[path] = fingerprint(Path(path))
+    return dependencies
+
+
+@dataclass
+class TestRecord:
+    """
+    What's recorded in the index about a collected test: everything needed to
+    locate, display, search, filter and dry-run it without importing its module.
+
+    Attributes:
+        name: The name of the test function.
+        module_name: The name of the module the test is defined in.
+        description: The (unformatted) description of the test.
+        tags: The tags of the test.
+        marker: The name, reason and `when` of the skip or xfail marker of the test,
+            if it has one.
+        first_line: The line number the test is defined on.
+        instances: The number of parameterised instances of the test.
+    """
+
+    name: str
+    module_name: str
+    description: str
+    tags: List[str]
+    marker: Optional[List[Any]]
+    first_line: int
+    instances: int
+
+    def to_marker(self) -> Optional[Marker]:
+        if not self.marker:
+            return None
+        name, reason, when = self.marker
+        marker_type = SkipMarker if name == SkipMarker.name else XfailMarker
+        return marker_type(reason=reason, when=when)
+
+
+def _test_record(test: Test) -> Optional[Dict[str, Any]]:
+    """
+    Returns the `TestRecord` of a test as a dictionary that can be stored in the index,
+    or None if the test couldn't be rebuilt (e.g. it's incorrectly parameterised,
+    the number of instances isn't known until it runs, or it's only skipped or
+    expected to fail `when` a callable says so, which may change between sessions).
+    """
+    if test.marker and not isinstance(test.marker.when, bool):
+        return None
+    try:
+        instances = test.find_number_of_instances()
+        if instances is None:
+            return None
+    except Exception:
+        return None
+    marker = (
+        [test.marker.name, test.marker.reason, test.marker.when]
+        if test.marker
+        else None
+    )
+    record = TestRecord(
+        name=test.name,
+        module_name=test.module_name,
+        description=test.description,
+        tags=test.tags,
+        marker=marker,
+        first_line=inspect.unwrap(test.fn).__code__.co_firstlineno,
+        instances=instances,
+    )
+    return asdict(record)
+
+
+def _not_imported(*args: Any, **kwargs: Any) -> None:
+    """
+    The function of every `IndexedTest`, which is called if one is run by mistake.
+    """
+    raise RuntimeError(
+        "This test was read from the collection index without importing the module "
+        "it's defined in, so it can only be dry-run."
+    )
+
+
+class IndexedTest(Test):
+    """
+    A test read from the collection index, without importing the module it's
+    defined in. What would be read from the function of a test is read from its
+    `TestRecord` instead, so it can be located, displayed, searched, filtered and
+    dry-run like any other test. It can't be run.
+
+    Attributes:
+        record: What was recorded in the index about the test.
+    """
+
+    def __init__(self, record: TestRecord, path: Path, capture_output: bool = True):
+        marker = record.to_marker()
+        super().__init__(
+            fn=_not_imported,
+            module_name=record.module_name,
+            marker=marker,
+            description=record.description,
+            capture_output=capture_output,
+            tags=record.tags or [],
+            ward_meta=CollectionMetadata(
+                marker=marker,
+                description=record.description,
+                tags=record.tags,
+                path=path,
+            ),
+        )
+        self.record = record
+        self._path = path
+
+    @property
+    def name(self) -> str:
+        return self.record.name
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def line_number(self) -> int:
+        return self.record.first_line
+
+    @property
+    def source(self) -> str:
+        lines = linecache.getlines(str(self._path))[self.record.first_line - 1 :]
+        return "".join(inspect.getblock(lines)) if lines else ""
+
+    @property
+    def is_parameterised(self) -> bool:
+        return self.record.instances > 1
+
+    def find_number_of_instances(self) -> Optional[int]:
+        return self.record.instances
+
+    def iter_parameterised_instances(
+        self,
+    ) -> Iterator[Union[Test, ParameterisedInstance]]:
+        if not self.is_parameterised:
+            yield self
+            return
+        for instance_index in range(self.record.instances):
+            yield ParameterisedInstance(self, instance_index, self.record.instances)
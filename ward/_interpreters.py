@@ -0,0 +1,237 @@
+import pickle
+import queue
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Generator, List, Optional, Set, Tuple
+
+from ward._capture import set_memory_limit, set_spill_dir
+from ward._durations import DurationHistory
+from ward._parallel import (
+    WorkerSpec,
+    WorkUnit,
+    _ModuleTestSource,
+    _RemoteResult,
+    _ThreadFinished,
+    _to_remote_result,
+    _to_test_result,
+    _worker_cache,
+    drain_thread_messages,
+    make_work_units,
+    queue_work_units,
+    schedule_work_units,
+    start_threads,
+)
+from ward._suite import DEFAULT_ASYNC_CONCURRENCY, Suite, group_tests
+from ward.models import Scope
+from ward.testing import Test, TestResult
+
+try:
+    from concurrent import interpreters  # type: ignore[attr-defined]
+except ImportError:  # Python < 3.14
+    interpreters = None
+
+
+def interpreters_available() -> bool:
+    """True if tests can be run in subinterpreters, which requires Python 3.14+."""
+    return interpreters is not None
+
+
+# The results of a unit that ran in a subinterpreter, and the positions in the
+# unit of the tests that have to be run in the main interpreter instead.
+_UnitOutcome = Tuple[List[_RemoteResult], List[int]]
+
+# The suite (and so the fixture cache) used by the subinterpreter this module was
+# imported into, and where it finds the tests for each unit. Each interpreter has its
+# own copy of every module, so this isn't shared with any other interpreter.
+_interpreter_state: Optional[Tuple[Suite, _ModuleTestSource]] = None
+
+
+def _run_unit(spec_data: bytes, unit_data: bytes) -> bytes:
+    """
+    Run the tests in a work unit, inside a subinterpreter. Module scoped fixtures
+    are torn down afterwards. Global scoped fixtures are kept until `_finish` is
+    called. Returns the pickled `_UnitOutcome`.
+    """
+    global _interpreter_state
+    spec: WorkerSpec = pickle.loads(spec_data)
+    unit: WorkUnit = pickle.loads(unit_data)
+    if _interpreter_state is None:
+        set_memory_limit(spec.capture_memory_limit)
+        set_spill_dir(spec.capture_spill_dir)
+        _interpreter_state = (
+            Suite(tests=[], cache=_worker_cache(spec), timeout=spec.timeout),
+            _ModuleTestSource(spec),
+        )
+    suite, source = _interpreter_state
+
+    tests = source.tests_for(unit)
+    indices = {id(test): index for index, test in enumerate(tests)}
+    results: List[_RemoteResult] = []
+    in_main_interpreter: Set[int] = set()
+    for group in group_tests(tests, spec.async_concurrency):
+        for result in suite.run_group(
+            group, spec.dry_run, spec.capture_output, spec.async_concurrency
+        ):
+            index = indices[id(getattr(result.test, "parent", result.test))]
+            if _needs_main_interpreter(result):
+                in_main_interpreter.add(index)
+            results.append(_to_remote_result(unit.id, index, result))
+    suite.cache.teardown_fixtures_for_scope(
+        Scope.Module, scope_key=unit.path, capture_output=spec.capture_output
+    )
+
+    # Any results from a test that's going to be run again are discarded.
+    outcome: _UnitOutcome = (
+        [r for r in results if r.index not in in_main_interpreter],
+        sorted(in_main_interpreter),
+    )
+    return pickle.dumps(outcome)
+
+
+def _finish() -> None:
+    """
+    Tear down the global scoped fixtures of the subinterpreter this is called in.
+    """
+    global _interpreter_state
+    if _interpreter_state is not None:
+        suite, source = _interpreter_state
+        _interpreter_state = None
+        suite.cache.teardown_global_fixtures(capture_output=source.spec.capture_output)
+
+
+def _needs_main_interpreter(result: TestResult) -> bool:
+    """
+    True if the test failed because it (or a fixture it depends on) imported an
+    extension module that can't be loaded in a subinterpreter.
+    """
+    error = result.error
+    seen: Set[int] = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, ImportError) and "subinterpreters" in str(error):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _drive_interpreter(
+    spec_data: bytes,
+    units: "queue.Queue[Optional[WorkUnit]]",
+    messages: "queue.Queue[Any]",
+) -> None:
+    """
+    Create a subinterpreter, and run each unit taken from `units` in it until
+    there are none left. Runs in a thread of the main interpreter.
+    """
+    error = None
+    interpreter = None
+    try:
+        interpreter = interpreters.create()
+        for unit in iter(units.get, None):
+            try:
+                data = interpreter.call(_run_unit, spec_data, pickle.dumps(unit))
+            except Exception:
+                # The unit couldn't be run in a subinterpreter at all, for example
+                # because its module imports an extension module that doesn't support
+                # them, so the whole unit is run in the main interpreter instead.
+                outcome: _UnitOutcome = ([], list(range(len(unit.positions))))
+            else:
+                outcome = pickle.loads(data)
+            messages.put((unit, outcome))
+        interpreter.call(_finish)
+    except BaseException as e:
+        error = e
+    finally:
+        if interpreter is not None:
+            with suppress(Exception):
+                interpreter.close()
+        messages.put(_ThreadFinished(error))
+
+
+@dataclass
+class InterpreterPoolRunner:
+    """
+    Runs the tests in a suite across a pool of subinterpreters, each of which has
+    its own GIL, so they can run Python code in parallel without the memory cost of
+    a process per worker.
+
+    Like worker processes, each subinterpreter imports the test modules it's given,
+    and keeps its own fixture cache. Results are sent back to the main interpreter
+    when each unit of work is complete.
+
+    Tests that can't run in a subinterpreter because they depend on an extension
+    module that doesn't support them are run in the main interpreter at the end
+    of the session instead.
+    """
+
+    suite: Suite
+    num_workers: int
+    project_root: Optional[Path] = None
+    durations: Optional[DurationHistory] = None
+
+    def generate_test_runs(
+        self,
+        dry_run: bool = False,
+        capture_output: bool = True,
+        async_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    ) -> Generator[TestResult, None, None]:
+        """
+        Run tests
+
+        Returns a generator which yields test results
+        """
+        units = make_work_units(self.suite.tests)
+        if not units:
+            return
+        if self.durations is not None:
+            units = schedule_work_units(
+                units, self.num_workers, self.durations.estimate
+            )
+
+        unit_tests: Dict[int, List[Test]] = {unit.id: unit.tests for unit in units}
+        spec = WorkerSpec(
+            project_root=self.project_root,
+            capture_output=capture_output,
+            dry_run=dry_run,
+            async_concurrency=async_concurrency,
+            record_impact=self.suite.cache.recorder is not None,
+            timeout=self.suite.timeout,
+        )
+        num_workers = min(self.num_workers, len(units))
+        unit_queue = queue_work_units(units, num_workers)
+        messages: "queue.Queue[Any]" = queue.Queue()
+        threads = start_threads(
+            _drive_interpreter,
+            (pickle.dumps(spec), unit_queue, messages),
+            num_workers,
+            "ward-interpreter",
+        )
+
+        in_main_interpreter: List[Test] = []
+        try:
+            for unit, (results, positions) in drain_thread_messages(
+                messages, num_workers
+            ):
+                for remote in results:
+                    yield _to_test_result(remote, unit_tests)
+                in_main_interpreter += [unit_tests[unit.id][i] for i in positions]
+        finally:
+            # Don't start any more units, and wait for those in progress to finish,
+            # as the interpreter can't shut down while subinterpreters are running.
+            with suppress(queue.Empty):
+                while True:
+                    unit_queue.get_nowait()
+            for _ in threads:
+                unit_queue.put(None)
+            for thread in threads:
+                thread.join()
+
+        fallback = Suite(
+            tests=in_main_interpreter,
+            cache=self.suite.cache,
+            timeout=self.suite.timeout,
+        )
+        yield from fallback.generate_test_runs(
+            dry_run, capture_output, async_concurrency
+        )
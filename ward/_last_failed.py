@@ -0,0 +1,65 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, Set
+
+from ward._cache import ProjectCache
+from ward._durations import test_key
+from ward.testing import Test, TestOutcome
+
+if TYPE_CHECKING:
+    from ward._results import ResultRecord
+
+_CACHE_KEY = "last_failed"
+
+
+@dataclass
+class LastFailed:
+    """
+    The keys (see `test_key`) of the tests that failed the last time they ran,
+    used to run those tests on their own, or before any others.
+
+    A test stays in the set until it runs again without failing, so a session
+    that only runs some of the tests doesn't forget the failures of the rest.
+    """
+
+    project_root: Optional[Path]
+    keys: Set[str] = field(default_factory=set)
+
+    @classmethod
+    def load(cls, cache: ProjectCache, project_root: Optional[Path]) -> "LastFailed":
+        keys = cache.get(_CACHE_KEY, default=[])
+        if not isinstance(keys, list):
+            keys = []
+        return cls(project_root=project_root, keys=set(keys))
+
+    def save(self, cache: ProjectCache) -> None:
+        cache.set(_CACHE_KEY, sorted(self.keys))
+
+    def record(self, records: Iterable["ResultRecord"]) -> None:
+        """
+        Update the set from the records in the session's `ResultStore`. A parameterised
+        test has failed if any of its instances failed.
+        """
+        ran, failed = set(), set()
+        for record in records:
+            if record.outcome is TestOutcome.DRYRUN:
+                continue
+            ran.add(record.key)
+            if record.outcome in (TestOutcome.FAIL, TestOutcome.TIMEOUT):
+                failed.add(record.key)
+        self.keys = (self.keys - ran) | failed
+
+    def select(self, tests: List[Test], failed_first: bool = False) -> List[Test]:
+        """
+        Return the tests that failed last time, followed by the rest of the tests if
+        `failed_first` is True. Both keep their original order. If none of the tests
+        failed last time, they're all returned unchanged.
+        """
+        failed: List[Test] = []
+        rest: List[Test] = []
+        for test in tests:
+            is_failed = test_key(test, self.project_root) in self.keys
+            (failed if is_failed else rest).append(test)
+        if not failed:
+            return tests
+        return failed + rest if failed_first else failed
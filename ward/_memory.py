@@ -0,0 +1,111 @@
+import gc
+import os
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# The number of lines that allocated the most memory kept for each test.
+_NUM_ALLOCATION_SITES = 3
+
+# Memory allocated by ward itself while running a test (its result, captured
+# output, etc.) isn't attributed to the test.
+_IGNORED_FILES = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, str(Path(__file__).parent / "*")),
+]
+
+
+@dataclass
+class MemoryUsage:
+    """
+    The memory used by a test (and the fixtures it resolved) while it ran.
+
+    Attributes:
+        peak: The most memory allocated by the test at any one time, in bytes.
+        retained: The memory allocated by the test that was still allocated once it
+            (and the teardown of its test scoped fixtures) finished, in bytes.
+        rss_delta: How much the resident set size of the process changed while the
+            test ran, in bytes, or None if it can't be measured on this platform.
+        top_allocations: The lines that allocated the most retained memory, as
+            ("path:line", bytes) pairs, largest first.
+    """
+
+    peak: int = 0
+    retained: int = 0
+    rss_delta: Optional[int] = None
+    top_allocations: List[Tuple[str, int]] = field(default_factory=list)
+
+
+@contextmanager
+def memory_profile(enabled: bool = True) -> Iterator[Optional[MemoryUsage]]:
+    """
+    Measure the memory used by the code run in the block, filling in the yielded
+    `MemoryUsage` when the block exits. Yields None if `enabled` is False.
+
+    Allocations are traced with `tracemalloc`, which is restarted for the block so
+    that only the memory allocated inside it is traced. Memory that was allocated
+    before the block and freed inside it isn't counted. Garbage is collected before
+    the retained memory is measured, so that unreachable cycles aren't counted.
+    """
+    if not enabled:
+        yield None
+        return
+
+    usage = MemoryUsage()
+    was_tracing = tracemalloc.is_tracing()
+    traceback_limit = tracemalloc.get_traceback_limit()
+    rss_before = current_rss()
+    tracemalloc.stop()
+    tracemalloc.start()
+    try:
+        yield usage
+    finally:
+        if tracemalloc.is_tracing():
+            # The block may have stopped tracing itself, in which case nothing
+            # more can be said about the memory it used.
+            usage.peak = tracemalloc.get_traced_memory()[1]
+            gc.collect()
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FILES)
+            stats = snapshot.statistics("lineno")
+            usage.retained = sum(stat.size for stat in stats)
+            usage.top_allocations = [
+                (f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size)
+                for stat in stats[:_NUM_ALLOCATION_SITES]
+            ]
+        tracemalloc.stop()
+        if was_tracing:
+            tracemalloc.start(traceback_limit)
+        rss_after = current_rss()
+        if rss_before is not None and rss_after is not None:
+            usage.rss_delta = rss_after - rss_before
+
+
+def current_rss() -> Optional[int]:
+    """
+    Return the resident set size of the process in bytes, or None if it can't be
+    read on this platform (it's read from /proc, so only Linux is supported).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def format_bytes(num_bytes: int) -> str:
+    """
+    Format a number of bytes in the largest binary unit that keeps it above 1,
+    e.g. 1536 -> '1.5 KiB'. Negative numbers (a shrinking RSS) are kept negative.
+    """
+    size = float(abs(num_bytes))
+    sign = "-" if num_bytes < 0 else ""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            break
+        size /= 1024
+    if unit == "B":
+        return f"{sign}{int(size)} B"
+    return f"{sign}{size:.1f} {unit}"
@@ -0,0 +1,953 @@
+import copy
+import faulthandler
+import gc
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from ward._capture import (
+    capture_per_context,
+    get_memory_limit,
+    get_spill_dir,
+    set_memory_limit,
+    set_spill_dir,
+)
+from ward._collect import (
+    configure_path,
+    get_info_for_modules,
+    get_tests_in_modules,
+    load_modules,
+)
+from ward._durations import DurationHistory
+from ward._errors import TestTimeout, WorkerError
+from ward._failures import FailureRecord
+from ward._fixtures import FixtureCache
+from ward._impact import Footprint, FootprintRecorder
+from ward._memory import MemoryUsage
+from ward._rewrite import rewrite_assertions_in_tests
+from ward._suite import DEFAULT_ASYNC_CONCURRENCY, Suite, group_tests
+from ward._testing import COLLECTED_TESTS, _Timer
+from ward._utilities import group_by
+from ward.expect import TestAssertionFailure
+from ward.models import Scope
+from ward.testing import ParameterisedInstance, Test, TestOutcome, TestResult
+
+# How long the main process waits for a message from the workers
+# before checking whether any of them have died unexpectedly.
+_POLL_INTERVAL_SECS = 0.1
+
+# How long after a test times out the main process waits for the worker running it
+# to report the timeout itself, before killing the worker and replacing it.
+_KILL_GRACE_SECS = 5.0
+
+
+@dataclass
+class WorkUnit:
+    """
+    A batch of tests from a single module that is handed to a worker.
+
+    Attributes:
+        id: The index of the unit in the list of units for the session.
+        path: The path of the module that contains the tests.
+        positions: The position of each test within the list of tests collected from its module.
+        tests: The tests in the unit. Only available in the main process.
+    """
+
+    id: int
+    path: Path
+    positions: List[int]
+    tests: List[Test] = field(default_factory=list, repr=False, compare=False)
+
+    def __getstate__(self):
+        # Tests can't be pickled. Workers find them using `positions` instead.
+        return {**self.__dict__, "tests": []}
+
+
+@dataclass
+class WorkerSpec:
+    """
+    Everything a worker process needs to know to collect and run tests.
+    """
+
+    project_root: Optional[Path]
+    capture_output: bool
+    dry_run: bool
+    capture_memory_limit: int = field(default_factory=get_memory_limit)
+    capture_spill_dir: Optional[str] = field(default_factory=get_spill_dir)
+    async_concurrency: int = DEFAULT_ASYNC_CONCURRENCY
+    record_impact: bool = False
+    timeout: Optional[float] = None
+    profile_memory: bool = False
+    # If set, some tests have a timeout, so the main process needs to know when
+    # each group of tests starts. The directory holds the stacks each worker
+    # dumps if a test times out, in case it has to be killed.
+    stack_dump_dir: Optional[str] = None
+
+
+@dataclass
+class _RemoteResult:
+    unit_id: int
+    index: int
+    instance_index: Optional[int]
+    group_size: Optional[int]
+    outcome: TestOutcome
+    error: Optional[BaseException]
+    failure: Optional[FailureRecord]
+    message: str
+    captured_stdout: str
+    captured_stderr: str
+    captured_stdout_path: Optional[str]
+    captured_stderr_path: Optional[str]
+    description: str
+    duration: Optional[float]
+    footprint: Optional[Footprint] = None
+    memory: Optional[MemoryUsage] = None
+
+
+@dataclass
+class _UnitStarted:
+    worker_id: int
+    unit_id: int
+
+
+@dataclass
+class _GroupStarted:
+    worker_id: int
+    unit_id: int
+    indices: List[int]
+    timeout: Optional[float]
+
+
+@dataclass
+class _WorkerFinished:
+    worker_id: int
+    error: Optional[str] = None
+
+
+@dataclass
+class _Deadline:
+    """
+    The group of tests with a timeout that a worker is running, as seen by the
+    main process. The clock restarts whenever one of them reports a result, since
+    each parameterised instance has its own timeout.
+    """
+
+    unit_id: int
+    indices: List[int]
+    timeout: float
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def has_expired(self) -> bool:
+        return time.monotonic() - self.started > self.timeout + _KILL_GRACE_SECS
+
+
+def _position_in_module(test: Test) -> int:
+    """
+    Return the position of the test in the list of tests collected from its module.
+    This is the same in every process that imports the module, so it can be used to
+    identify the test inside a worker.
+    """
+    for position, fn in enumerate(COLLECTED_TESTS[test.path]):
+        if fn.ward_meta is test.fn.ward_meta:  # type: ignore[attr-defined]
+            return position
+    raise ValueError(f"Test {test.qualified_name} was not collected from a module")
+
+
+def make_work_units(tests: List[Test]) -> List[WorkUnit]:
+    """
+    Group tests into units of work, one per module, so that module-scoped
+    fixtures are only resolved once per worker.
+    """
+    units: List[WorkUnit] = []
+    for path, module_tests in group_by(tests, key=lambda t: t.path).items():
+        positions = [_position_in_module(t) for t in module_tests]
+        units.append(
+            WorkUnit(id=len(units), path=path, positions=positions, tests=module_tests)
+        )
+    return units
+
+
+def schedule_work_units(
+    units: List[WorkUnit],
+    num_workers: int,
+    estimate: Callable[[Test], float],
+) -> List[WorkUnit]:
+    """
+    Order work units so that the ones expected to take longest are handed out first.
+    Workers take the next unit whenever they become idle, so the short units at the
+    end of the queue fill the gaps left by the long ones.
+
+    A unit that is expected to take longer than an even share of the whole session
+    is split into chunks, so that a single slow module can be spread across workers
+    rather than holding up the end of the run. Module scoped fixtures used by a split
+    module are resolved once per chunk.
+    """
+    costs = [[estimate(test) for test in unit.tests] for unit in units]
+    fair_share = sum(map(sum, costs)) / max(num_workers, 1)
+
+    chunks: List[Tuple[float, WorkUnit]] = []
+    for unit, test_costs in zip(units, costs):
+        if num_workers < 2 or sum(test_costs) <= fair_share:
+            chunks.append((sum(test_costs), unit))
+            continue
+
+        start, chunk_cost = 0, 0.0
+        for index, cost in enumerate(test_costs):
+            chunk_cost += cost
+            is_last = index == len(test_costs) - 1
+            if chunk_cost >= fair_share or is_last:
+                chunk = WorkUnit(
+                    id=0,
+                    path=unit.path,
+                    positions=unit.positions[start : index + 1],
+                    tests=unit.tests[start : index + 1],
+                )
+                chunks.append((chunk_cost, chunk))
+                start, chunk_cost = index + 1, 0.0
+
+    # sorted() is stable, so units with equal estimates keep their original order
+    scheduled = [unit for _, unit in sorted(chunks, key=lambda c: -c[0])]
+    for unit_id, unit in enumerate(scheduled):
+        unit.id = unit_id
+    return scheduled
+
+
+class _ModuleTestSource:
+    """
+    Collects the tests for work units inside a spawned worker process by importing
+    the corresponding module the first time a unit from it is received.
+    """
+
+    def __init__(self, spec: WorkerSpec):
+        self.spec = spec
+        self.tests_by_path: Dict[Path, List[Test]] = {}
+        self.path_configured = False
+
+    def tests_for(self, unit: WorkUnit) -> List[Test]:
+        if not self.path_configured:
+            configure_path(self.spec.project_root)
+            self.path_configured = True
+        if unit.path not in self.tests_by_path:
+            modules = load_modules(get_info_for_modules([unit.path], ()))
+            tests = get_tests_in_modules(modules, self.spec.capture_output)
+            self.tests_by_path[unit.path] = rewrite_assertions_in_tests(tests)
+        module_tests = self.tests_by_path[unit.path]
+        return [module_tests[position] for position in unit.positions]
+
+
+class _InheritedTestSource:
+    """
+    Looks up the tests for work units in the tests that were collected by the main
+    process. Only usable in forked workers, which inherit the imported modules and
+    collected tests from the main process rather than importing them again.
+    """
+
+    def __init__(self, unit_tests: Dict[int, List[Test]]):
+        self.unit_tests = unit_tests
+
+    def tests_for(self, unit: WorkUnit) -> List[Test]:
+        return self.unit_tests[unit.id]
+
+
+def _transferable_error(
+    error: Optional[BaseException], failure: Optional[FailureRecord]
+) -> Optional[BaseException]:
+    """
+    Return an exception that can be pickled and sent back to the main process.
+    Assertion failures are sent with the summaries of their operands from `failure`
+    in place of the operands themselves, which could be large or unpicklable.
+    Timeouts are sent as they are if possible. Any other exception is replaced
+    with a `WorkerError` containing its type and message. Either way, the failure
+    is reported using the `FailureRecord` sent alongside it.
+    """
+    if error is None:
+        return None
+    if isinstance(error, TestAssertionFailure):
+        return TestAssertionFailure(
+            error.message,
+            lhs=failure.lhs if failure else None,
+            rhs=failure.rhs if failure else None,
+            error_line=error.error_line,
+            operator=error.operator,
+            assert_msg=error.assert_msg,
+        )
+    if isinstance(error, TestTimeout):
+        try:
+            pickle.dumps(error)
+        except Exception:
+            pass
+        else:
+            return error
+    formatted = "".join(traceback.format_exception_only(type(error), error))
+    return WorkerError(formatted.rstrip())
+
+
+def _to_remote_result(unit_id: int, index: int, result: TestResult) -> _RemoteResult:
+    test = result.test
+    is_instance = isinstance(test, ParameterisedInstance)
+    return _RemoteResult(
+        unit_id=unit_id,
+        index=index,
+        instance_index=test.param_meta.instance_index if is_instance else None,
+        group_size=test.param_meta.group_size if is_instance else None,
+        outcome=result.outcome,
+        error=_transferable_error(result.error, result.failure),
+        failure=result.failure,
+        message=result.message,
+        captured_stdout=result.captured_stdout,
+        captured_stderr=result.captured_stderr,
+        captured_stdout_path=result.captured_stdout_path,
+        captured_stderr_path=result.captured_stderr_path,
+        description=test.description,
+        duration=test.timer.duration if test.timer else None,
+        footprint=result.footprint,
+        memory=result.memory,
+    )
+
+
+def _to_test_result(
+    remote: _RemoteResult, unit_tests: Dict[int, List[Test]]
+) -> TestResult:
+    """
+    Rebuild the result of a test that ran in a worker from the record it sent back.
+    """
+    collected = unit_tests[remote.unit_id][remote.index]
+    test: Union[Test, ParameterisedInstance]
+    if remote.instance_index is not None:
+        # The instance ran in a worker, so only what's needed to report it is rebuilt here.
+        test = ParameterisedInstance(
+            collected, remote.instance_index, remote.group_size
+        )
+    else:
+        # The description and timer are set by running the test, so they're set on
+        # a copy, leaving the collected test as it was.
+        test = copy.copy(collected)
+
+    test.description = remote.description
+    if remote.duration is not None:
+        test.timer = _Timer(duration=remote.duration)
+    return TestResult(
+        test,
+        remote.outcome,
+        remote.error,
+        message=remote.message,
+        captured_stdout=remote.captured_stdout,
+        captured_stderr=remote.captured_stderr,
+        captured_stdout_path=remote.captured_stdout_path,
+        captured_stderr_path=remote.captured_stderr_path,
+        failure=remote.failure,
+        footprint=remote.footprint,
+        memory=remote.memory,
+    )
+
+
+def _worker_cache(spec: WorkerSpec) -> FixtureCache:
+    if not spec.record_impact:
+        return FixtureCache()
+    return FixtureCache(recorder=FootprintRecorder.for_project(spec.project_root))
+
+
+def _group_timeout(group: List[Test], default: Optional[float]) -> Optional[float]:
+    """
+    The longest that any test in a group can run for, or None if one of them can
+    run for as long as it likes.
+    """
+    timeouts = [default if test.timeout is None else test.timeout for test in group]
+    if any(timeout is None for timeout in timeouts):
+        return None
+    return max(timeouts)  # type: ignore[type-var]
+
+
+def _worker_main(
+    worker_id: int,
+    spec: WorkerSpec,
+    source: Any,
+    task_queue: Any,
+    result_queue: Any,
+    first_unit: Optional[WorkUnit] = None,
+) -> None:
+    # Ctrl-C is delivered to the whole process group. The main process
+    # is responsible for shutting workers down, so ignore it here.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_memory_limit(spec.capture_memory_limit)
+    set_spill_dir(spec.capture_spill_dir)
+
+    error = None
+    try:
+        with ExitStack() as stack:
+            stack_dump = None
+            if spec.stack_dump_dir is not None:
+                stack_dump = stack.enter_context(
+                    open(os.path.join(spec.stack_dump_dir, f"{worker_id}.txt"), "w")
+                )
+            suite = Suite(
+                tests=[],
+                cache=_worker_cache(spec),
+                timeout=spec.timeout,
+                profile_memory=spec.profile_memory,
+            )
+            # A worker that replaces one that was killed first finishes the unit
+            # the killed worker was running.
+            units: Iterable[WorkUnit] = iter(task_queue.get, None)
+            if first_unit is not None:
+                units = itertools.chain([first_unit], units)
+            for unit in units:
+                result_queue.put(_UnitStarted(worker_id=worker_id, unit_id=unit.id))
+                _run_unit(
+                    worker_id, unit, suite, spec, source, result_queue, stack_dump
+                )
+            suite.cache.teardown_global_fixtures(capture_output=spec.capture_output)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        result_queue.put(_WorkerFinished(worker_id=worker_id, error=error))
+
+
+def _run_unit(
+    worker_id: int,
+    unit: WorkUnit,
+    suite: Suite,
+    spec: WorkerSpec,
+    source: Any,
+    result_queue: Any,
+    stack_dump: Optional[IO[str]],
+) -> None:
+    tests = source.tests_for(unit)
+    # Tests marked with `run_concurrently` may report results out of order,
+    # so find the position of the test each result belongs to.
+    indices = {id(test): index for index, test in enumerate(tests)}
+    for group in group_tests(tests, spec.async_concurrency):
+        timeout = None
+        if stack_dump is not None:
+            timeout = _group_timeout(group, spec.timeout)
+            group_indices = [indices[id(test)] for test in group]
+            result_queue.put(_GroupStarted(worker_id, unit.id, group_indices, timeout))
+        for result in _dump_stacks_on_timeout(
+            suite.run_group(
+                group, spec.dry_run, spec.capture_output, spec.async_concurrency
+            ),
+            timeout,
+            stack_dump,
+        ):
+            test = getattr(result.test, "parent", result.test)
+            index = indices[id(test)]
+            result_queue.put(_to_remote_result(unit.id, index, result))
+    suite.cache.teardown_fixtures_for_scope(
+        Scope.Module, scope_key=unit.path, capture_output=spec.capture_output
+    )
+
+
+def _dump_stacks_on_timeout(
+    results: Iterator[TestResult],
+    timeout: Optional[float],
+    stack_dump: Optional[IO[str]],
+) -> Iterator[TestResult]:
+    """
+    Yield each result, while `faulthandler` waits to dump the stacks of the worker
+    to `stack_dump` if it takes longer than `timeout` to produce the next one. If
+    the test doesn't respond to its timeout, the main process kills the worker and
+    reads the stacks from the file instead.
+    """
+    if timeout is None or stack_dump is None:
+        yield from results
+        return
+    try:
+        while True:
+            stack_dump.seek(0)
+            stack_dump.truncate()
+            faulthandler.dump_traceback_later(timeout, file=stack_dump)
+            result = next(results, None)
+            faulthandler.cancel_dump_traceback_later()
+            if result is None:
+                return
+            yield result
+    finally:
+        faulthandler.cancel_dump_traceback_later()
+
+
+@dataclass
+class ProcessPoolRunner:
+    """
+    Runs the tests in a suite across a pool of worker processes, yielding
+    results in the main process as they arrive.
+
+    Each worker keeps its own fixture cache, so module and global scoped fixtures
+    are resolved at most once per worker. With the "spawn" start method, workers
+    import the modules they are given. With the "fork" start method, workers are
+    forked from the main process after collection, and inherit the imported
+    modules and collected tests instead.
+    """
+
+    suite: Suite
+    num_workers: int
+    project_root: Optional[Path] = None
+    start_method: str = "spawn"
+    durations: Optional[DurationHistory] = None
+
+    def generate_test_runs(
+        self,
+        dry_run: bool = False,
+        capture_output: bool = True,
+        async_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    ) -> Iterator[TestResult]:
+        """
+        Start the worker processes and return a generator which yields test results.
+
+        Workers are started before the generator is returned (and so before anything
+        is rendered to the terminal), so that forked workers never inherit a lock held
+        by a thread that was in the middle of writing output.
+        """
+        units = make_work_units(self.suite.tests)
+        if not units:
+            return iter(())
+        if self.durations is not None:
+            units = schedule_work_units(
+                units, self.num_workers, self.durations.estimate
+            )
+
+        unit_tests = {unit.id: unit.tests for unit in units}
+        spec = WorkerSpec(
+            project_root=self.project_root,
+            capture_output=capture_output,
+            dry_run=dry_run,
+            async_concurrency=async_concurrency,
+            record_impact=self.suite.cache.recorder is not None,
+            timeout=self.suite.timeout,
+            profile_memory=self.suite.profile_memory,
+        )
+        timeouts = (_group_timeout([t], spec.timeout) for t in self.suite.tests)
+        if not dry_run and any(timeout is not None for timeout in timeouts):
+            spec.stack_dump_dir = tempfile.mkdtemp(prefix="ward-stacks-")
+        if self.start_method == "fork":
+            source: Any = _InheritedTestSource(unit_tests)
+            # Move everything that exists now into the permanent generation so the
+            # cyclic garbage collector doesn't touch (and therefore copy) the pages
+            # the workers share with the main process.
+            gc.freeze()
+        else:
+            source = _ModuleTestSource(spec)
+
+        context: Any = multiprocessing.get_context(self.start_method)
+        task_queue = context.Queue()
+        result_queue = context.Queue()
+        for unit in units:
+            task_queue.put(unit)
+
+        num_workers = min(self.num_workers, len(units))
+        for _ in range(num_workers):
+            task_queue.put(None)
+
+        def start_worker(worker_id: int, first_unit: Optional[WorkUnit] = None) -> Any:
+            worker = context.Process(
+                target=_worker_main,
+                args=(worker_id, spec, source, task_queue, result_queue, first_unit),
+            )
+            worker.start()
+            return worker
+
+        workers = [start_worker(worker_id) for worker_id in range(num_workers)]
+        if self.start_method == "fork":
+            gc.unfreeze()
+
+        pool = _ProcessPool(
+            units=units,
+            unit_tests=unit_tests,
+            workers=workers,
+            task_queue=task_queue,
+            result_queue=result_queue,
+            spec=spec,
+            start_worker=start_worker,
+        )
+        return self._receive_results(pool)
+
+    def _receive_results(
+        self, pool: "_ProcessPool"
+    ) -> Generator[TestResult, None, None]:
+        try:
+            while len(pool.finished) < len(pool.workers):
+                yield from pool.replace_timed_out_workers()
+                try:
+                    message = pool.result_queue.get(timeout=_POLL_INTERVAL_SECS)
+                except queue.Empty:
+                    pool.check_for_exited_workers()
+                    continue
+                result = pool.receive(message)
+                if result is not None:
+                    yield result
+            yield from pool.report_lost_tests()
+        finally:
+            pool.shut_down()
+
+
+@dataclass
+class _ProcessPool:
+    """
+    The state of the worker processes of a `ProcessPoolRunner`, as seen by the main
+    process while it receives their results.
+
+    Attributes:
+        current_units: The unit each worker is currently running.
+        abandoned: The reason each unit was abandoned, if it was.
+        worker_errors: The errors that workers finished with.
+        reported: The tests in each unit that have had at least one result reported.
+        finished: The workers that have finished (or exited, or been killed).
+        deadlines: The group of tests with a timeout that each worker is running.
+        killed_units: The units that were being run by workers that had to be killed.
+            Anything a killed worker sent before it was killed is ignored.
+    """
+
+    units: List[WorkUnit]
+    unit_tests: Dict[int, List[Test]]
+    workers: List[Any]
+    # The task queue isn't used here, but it must stay alive until every worker
+    # has finished with it, or its underlying semaphore may be destroyed
+    # before a spawned worker gets the chance to unpickle it.
+    task_queue: Any
+    result_queue: Any
+    spec: WorkerSpec
+    start_worker: Callable[[int, Optional[WorkUnit]], Any]
+    current_units: Dict[int, int] = field(default_factory=dict)
+    abandoned: Dict[int, str] = field(default_factory=dict)
+    worker_errors: List[str] = field(default_factory=list)
+    reported: Dict[int, Set[int]] = field(default_factory=dict)
+    finished: Set[int] = field(default_factory=set)
+    deadlines: Dict[int, _Deadline] = field(default_factory=dict)
+    killed_units: Set[int] = field(default_factory=set)
+
+    def __post_init__(self):
+        self.reported.update({unit.id: set() for unit in self.units})
+
+    def receive(self, message: Any) -> Optional[TestResult]:
+        """
+        Update the state of the pool from a message sent by a worker, returning
+        the result it contains, if it's a result.
+        """
+        if getattr(message, "unit_id", None) in self.killed_units:
+            return None
+        if isinstance(message, _UnitStarted):
+            self.current_units[message.worker_id] = message.unit_id
+        elif isinstance(message, _GroupStarted):
+            self.deadlines.pop(message.worker_id, None)
+            if message.timeout is not None:
+                self.deadlines[message.worker_id] = _Deadline(
+                    message.unit_id, message.indices, message.timeout
+                )
+        elif isinstance(message, _WorkerFinished):
+            self.finished.add(message.worker_id)
+            self.deadlines.pop(message.worker_id, None)
+            if message.error:
+                self.worker_errors.append(message.error)
+                if message.worker_id in self.current_units:
+                    unit_id = self.current_units[message.worker_id]
+                    self.abandoned[unit_id] = message.error
+        else:
+            for deadline in self.deadlines.values():
+                if deadline.unit_id == message.unit_id and (
+                    message.index in deadline.indices
+                ):
+                    deadline.started = time.monotonic()
+            self.reported[message.unit_id].add(message.index)
+            return _to_test_result(message, self.unit_tests)
+        return None
+
+    def check_for_exited_workers(self) -> None:
+        """
+        Record the workers that exited without saying they'd finished,
+        abandoning the units they were running.
+        """
+        for worker_id, worker in enumerate(self.workers):
+            if worker_id not in self.finished and not worker.is_alive():
+                self.finished.add(worker_id)
+                if worker_id in self.current_units:
+                    self.abandoned[self.current_units[worker_id]] = (
+                        f"The worker process running this test exited "
+                        f"with code {worker.exitcode}."
+                    )
+
+    def replace_timed_out_workers(self) -> Iterator[TestResult]:
+        """
+        Replace each worker running a test that's gone past its deadline, yielding
+        the results of the tests that timed out.
+        """
+        for worker_id, deadline in list(self.deadlines.items()):
+            if deadline.has_expired:
+                del self.deadlines[worker_id]
+                self.finished.add(worker_id)
+                self.killed_units.add(deadline.unit_id)
+                yield from self._replace_timed_out_worker(worker_id, deadline)
+
+    def report_lost_tests(self) -> Iterator[TestResult]:
+        """
+        Anything that didn't report a result was lost along with the
+        worker that was running it, so it's reported as a failure.
+        """
+        for unit in self.units:
+            reason = self.abandoned.get(unit.id) or next(
+                iter(self.worker_errors), "No worker process ran this test."
+            )
+            for index, test in enumerate(self.unit_tests[unit.id]):
+                if index not in self.reported[unit.id]:
+                    yield test.fail_with_error(WorkerError(reason))
+
+    def shut_down(self) -> None:
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in self.workers:
+            worker.join()
+        self.task_queue.close()
+        self.result_queue.close()
+        if self.spec.stack_dump_dir is not None:
+            shutil.rmtree(self.spec.stack_dump_dir, ignore_errors=True)
+
+    def _replace_timed_out_worker(
+        self, worker_id: int, deadline: _Deadline
+    ) -> Iterator[TestResult]:
+        """
+        Kill a worker running a test that didn't stop when it timed out, and report
+        the test as having timed out, along with the stacks the worker dumped. A new
+        worker is started to run the rest of the unit, then carry on where the killed
+        worker would have, so the worker's tests have to be collected again, and its
+        module and global scoped fixtures resolved again.
+        """
+        # Killing a process that is writing to a queue can leave the queue unusable,
+        # but a worker stuck in a test has nothing left to write.
+        self.workers[worker_id].kill()
+        self.workers[worker_id].join()
+
+        assert self.spec.stack_dump_dir is not None
+        stack_dump = os.path.join(self.spec.stack_dump_dir, f"{worker_id}.txt")
+        try:
+            with open(stack_dump) as file:
+                stacks = file.read()
+        except OSError:
+            stacks = ""
+        tests = self.unit_tests[deadline.unit_id]
+        reported = self.reported
+        hung = [i for i in deadline.indices if i not in reported[deadline.unit_id]]
+        for index in hung or deadline.indices[-1:]:
+            reported[deadline.unit_id].add(index)
+            yield TestResult(
+                tests[index],
+                TestOutcome.TIMEOUT,
+                TestTimeout(deadline.timeout, stacks),
+                message=stacks,
+            )
+
+        units = self.units
+        unit = next(unit for unit in units if unit.id == deadline.unit_id)
+        rest = range(max(deadline.indices) + 1, len(tests))
+        first_unit = None
+        if rest:
+            first_unit = WorkUnit(
+                id=len(units),
+                path=unit.path,
+                positions=[unit.positions[i] for i in rest],
+                tests=[tests[i] for i in rest],
+            )
+            # Forked workers find their tests in `unit_tests`, so it has to be
+            # updated before the new worker is started.
+            units.append(first_unit)
+            self.unit_tests[first_unit.id] = first_unit.tests
+            reported[first_unit.id] = set()
+            reported[deadline.unit_id].update(rest)
+        self.workers.append(self.start_worker(len(self.workers), first_unit))
+
+
+@dataclass
+class _ThreadFinished:
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class ThreadPoolRunner:
+    """
+    Runs the tests in a suite across a pool of threads, yielding results as
+    they finish.
+
+    Unlike worker processes, the threads share the suite's fixture cache, so module
+    and global scoped fixtures are resolved at most once per session, even though
+    the tests in a module are spread across threads. Output is captured separately
+    for each thread. Tests that spend most of their time blocked
+    (on sockets or subprocesses, for example) release the GIL while they wait, so they
+    run in parallel. On a free-threaded build of CPython, so does everything else.
+    """
+
+    suite: Suite
+    num_workers: int
+    durations: Optional[DurationHistory] = None
+
+    def generate_test_runs(
+        self,
+        dry_run: bool = False,
+        capture_output: bool = True,
+        async_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    ) -> Generator[TestResult, None, None]:
+        """
+        Run tests
+
+        Returns a generator which yields test results
+        """
+        # The fixture cache is shared, so there's no need to keep the tests from
+        # a module together. Each test (along with its parameterised instances)
+        # is handed out separately, as is each group of concurrent async tests.
+        units = [
+            WorkUnit(id=unit_id, path=group[0].path, positions=[], tests=group)
+            for unit_id, group in enumerate(
+                group_tests(self.suite.tests, async_concurrency)
+            )
+        ]
+        if not units:
+            return
+        if self.durations is not None:
+            units = schedule_work_units(
+                units, self.num_workers, self.durations.estimate
+            )
+
+        num_workers = min(self.num_workers, len(units))
+        # The module scoped fixtures of a module are torn down once the last
+        # of its units has finished.
+        pool = _ThreadPool(
+            units=queue_work_units(units, num_workers),
+            results=queue.Queue(),
+            units_per_module=Counter(unit.path for unit in units),
+        )
+        with ExitStack() as stack:
+            if capture_output:
+                stack.enter_context(capture_per_context())
+            start_threads(
+                self._work,
+                (pool, dry_run, capture_output, async_concurrency),
+                num_workers,
+                "ward-worker",
+            )
+            try:
+                yield from drain_thread_messages(pool.results, num_workers)
+            finally:
+                # Threads can't be stopped part way through a test, but they
+                # won't start another once the session is over.
+                pool.stop.set()
+                self.suite.cache.teardown_global_fixtures(capture_output=capture_output)
+
+    def _work(
+        self,
+        pool: "_ThreadPool",
+        dry_run: bool,
+        capture_output: bool,
+        async_concurrency: int,
+    ) -> None:
+        error = None
+        try:
+            for unit in iter(pool.units.get, None):
+                for result in self.suite.run_group(
+                    unit.tests, dry_run, capture_output, async_concurrency
+                ):
+                    pool.results.put(result)
+                    if pool.stop.is_set():
+                        return
+                if pool.finish_unit(unit):
+                    self.suite.cache.teardown_fixtures_for_scope(
+                        Scope.Module, scope_key=unit.path, capture_output=capture_output
+                    )
+        except BaseException as e:
+            error = e
+        finally:
+            pool.results.put(_ThreadFinished(error))
+
+
+def queue_work_units(
+    units: List[WorkUnit], num_threads: int
+) -> "queue.Queue[Optional[WorkUnit]]":
+    """
+    Queue the units for a pool of `num_threads` threads, followed by a None for each
+    thread, which tells it to stop.
+    """
+    unit_queue: "queue.Queue[Optional[WorkUnit]]" = queue.Queue()
+    for unit in units:
+        unit_queue.put(unit)
+    for _ in range(num_threads):
+        unit_queue.put(None)
+    return unit_queue
+
+
+def start_threads(
+    target: Callable[..., None], args: Tuple[Any, ...], num_threads: int, name: str
+) -> List[threading.Thread]:
+    """
+    Start `num_threads` daemon threads which each call `target(*args)`, named
+    '{name}-{index}'.
+    """
+    threads = [
+        threading.Thread(target=target, args=args, name=f"{name}-{index}", daemon=True)
+        for index in range(num_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def drain_thread_messages(
+    messages: "queue.Queue[Any]", num_threads: int
+) -> Iterator[Any]:
+    """
+    Yield the messages sent by a pool of threads until each of them has sent a
+    `_ThreadFinished`, raising the error any of them finished with.
+    """
+    finished = 0
+    while finished < num_threads:
+        message = messages.get()
+        if isinstance(message, _ThreadFinished):
+            finished += 1
+            if message.error is not None:
+                raise message.error
+        else:
+            yield message
+
+
+@dataclass
+class _ThreadPool:
+    """
+    The state shared by the threads of a `ThreadPoolRunner`.
+    """
+
+    units: "queue.Queue[Optional[WorkUnit]]"
+    results: "queue.Queue[Union[TestResult, _ThreadFinished]]"
+    units_per_module: Dict[Path, int]
+    stop: threading.Event = field(default_factory=threading.Event)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def finish_unit(self, unit: WorkUnit) -> bool:
+        """
+        Record that a unit has finished. Returns True if it was the last unit
+        of its module to finish.
+        """
+        with self.lock:
+            self.units_per_module[unit.path] -= 1
+            return self.units_per_module[unit.path] == 0
@@ -0,0 +1,227 @@
+import heapq
+import io
+import json
+import tempfile
+from array import array
+from collections import Counter
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from ward._cache import ProjectCache
+from ward._durations import test_key
+from ward._failures import FailureRecord
+from ward._memory import MemoryUsage
+from ward.testing import TestOutcome, TestResult
+
+# The longest failure summary kept in a record, in characters.
+_MAX_FAILURE_SUMMARY_LEN = 200
+
+
+@dataclass
+class ResultRecord:
+    """
+    A compact summary of the result of a single test, which doesn't reference
+    the test itself, its captured output or any exception raised while running it.
+
+    Attributes:
+        outcome: The outcome of the test.
+        test_id: The id of the test (or parameterised instance) that ran.
+        key: Identifies the test across sessions (see `ward._durations.test_key`).
+        module_name: The name of the module the test is defined in.
+        line_number: The line number the test is defined on.
+        instance_index: The index of the parameterised instance of the test.
+        group_size: The number of instances the test is parameterised into,
+            or None if it's parameterised with iterables of unknown length.
+        description: The description of the test, formatted with its arguments.
+        duration: How long the test took to run in seconds, if it ran.
+        failure: A short summary of the exception the test failed with, if any.
+        memory: The memory used by the test, if it was profiled.
+    """
+
+    outcome: TestOutcome
+    test_id: str
+    key: str
+    module_name: str
+    line_number: int
+    instance_index: int
+    group_size: Optional[int]
+    description: str
+    duration: Optional[float]
+    failure: Optional[str] = None
+    memory: Optional[MemoryUsage] = None
+
+    @classmethod
+    def from_result(
+        cls, result: TestResult, project_root: Optional[Path] = None
+    ) -> "ResultRecord":
+        test = result.test
+        param_meta = test.param_meta
+        return cls(
+            outcome=result.outcome,
+            test_id=str(test.id),
+            key=test_key(test, project_root),
+            module_name=test.module_name,
+            line_number=test.line_number,
+            instance_index=param_meta.instance_index,
+            group_size=param_meta.group_size,
+            description=test.description,
+            duration=test.timer.duration if test.timer else None,
+            failure=_summarise_failure(result.failure),
+            memory=result.memory,
+        )
+
+    def to_json(self) -> str:
+        record = asdict(self)
+        record["outcome"] = self.outcome.name
+        return json.dumps(record)
+
+    @classmethod
+    def from_json(cls, line: str) -> "ResultRecord":
+        record = json.loads(line)
+        record["outcome"] = TestOutcome[record["outcome"]]
+        if record.get("memory") is not None:
+            memory = MemoryUsage(**record["memory"])
+            memory.top_allocations = [
+                (location, size) for location, size in memory.top_allocations
+            ]
+            record["memory"] = memory
+        return cls(**record)
+
+
+def _summarise_failure(failure: Optional[FailureRecord]) -> Optional[str]:
+    if failure is None:
+        return None
+    summary = failure.summary()
+    if len(summary) > _MAX_FAILURE_SUMMARY_LEN:
+        summary = summary[: _MAX_FAILURE_SUMMARY_LEN - 3] + "..."
+    return summary
+
+
+@dataclass
+class ResultStore:
+    """
+    Stores the results of a test session as they arrive.
+
+    A `ResultRecord` for each result is appended to a file, and only the results
+    of failing tests are kept in memory (without the error they failed with, which
+    is reported from their `failure` record instead), so that the memory used by a
+    session doesn't grow with the number of tests that pass. Everything reported
+    at the end of the session (outcome counts, the slowest tests, the exit code)
+    is worked out as results are added.
+
+    Attributes:
+        file: The file records are appended to, one JSON object per line.
+        project_root: Used to make the keys of the records relative to the project.
+        num_slowest: The number of slowest tests to keep records of.
+        num_memory_hungriest: The number of tests with the highest peak memory
+            use to keep records of (only tests whose memory was profiled count).
+        outcome_counts: The number of results with each outcome.
+        failures: The results of the tests that failed, without their `error`.
+        durations: The duration of each test that ran, in the order they finished.
+    """
+
+    file: IO[str]
+    project_root: Optional[Path] = None
+    num_slowest: int = 0
+    num_memory_hungriest: int = 0
+    outcome_counts: Dict[TestOutcome, int] = field(default_factory=Counter)
+    failures: List[TestResult] = field(default_factory=list)
+    durations: "array[float]" = field(default_factory=lambda: array("d"))
+    _slowest: List[Tuple[float, int, ResultRecord]] = field(
+        default_factory=list, repr=False
+    )
+    _memory_hungriest: List[Tuple[int, int, ResultRecord]] = field(
+        default_factory=list, repr=False
+    )
+    _num_results: int = field(default=0, repr=False)
+
+    @classmethod
+    def open(
+        cls,
+        cache: Optional[ProjectCache] = None,
+        project_root: Optional[Path] = None,
+        num_slowest: int = 0,
+        num_memory_hungriest: int = 0,
+    ) -> "ResultStore":
+        """
+        Create a store that writes to a temporary file in the project cache, or to one
+        in the system's temporary directory if there's no cache or it can't be written to.
+        """
+        file = cache.open_temporary_file() if cache else None
+        if file is None:
+            file = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        return cls(
+            file=file,
+            project_root=project_root,
+            num_slowest=num_slowest,
+            num_memory_hungriest=num_memory_hungriest,
+        )
+
+    def add(self, result: TestResult) -> ResultRecord:
+        record = ResultRecord.from_result(result, self.project_root)
+        self.file.write(record.to_json() + "\n")
+
+        self.outcome_counts[record.outcome] += 1
+        if record.outcome in (TestOutcome.FAIL, TestOutcome.TIMEOUT):
+            # What's reported about a failure is in its record, so the error
+            # (and everything it references) isn't kept until the session ends.
+            self.failures.append(replace(result, error=None, footprint=None))
+        if record.duration is not None:
+            self.durations.append(record.duration)
+            if self.num_slowest:
+                entry = (record.duration, -self._num_results, record)
+                _push_bounded(self._slowest, entry, self.num_slowest)
+        if record.memory is not None and self.num_memory_hungriest:
+            entry = (record.memory.peak, -self._num_results, record)
+            _push_bounded(self._memory_hungriest, entry, self.num_memory_hungriest)
+        self._num_results += 1
+        return record
+
+    @property
+    def slowest(self) -> List[ResultRecord]:
+        """The records of the slowest tests, slowest first (up to `num_slowest`)."""
+        return [record for *_, record in sorted(self._slowest, reverse=True)]
+
+    @property
+    def memory_hungriest(self) -> List[ResultRecord]:
+        """
+        The records of the tests with the highest peak memory use, highest first
+        (up to `num_memory_hungriest`).
+        """
+        return [record for *_, record in sorted(self._memory_hungriest, reverse=True)]
+
+    def __len__(self) -> int:
+        return self._num_results
+
+    def __iter__(self) -> Iterator[ResultRecord]:
+        """
+        Read back the record of every result in the store, in the order they were added.
+        """
+        self.file.seek(0)
+        try:
+            for line in self.file:
+                yield ResultRecord.from_json(line)
+        finally:
+            self.file.seek(0, io.SEEK_END)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _push_bounded(
+    heap: List[Tuple[Any, int, ResultRecord]],
+    entry: Tuple[Any, int, ResultRecord],
+    size: int,
+) -> None:
+    """Push `entry` onto `heap`, dropping the smallest entry if it grows beyond `size`."""
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    else:
+        heapq.heappushpop(heap, entry)
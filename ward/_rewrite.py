@@ -1,10 +1,20 @@
 import ast
+import importlib.abc
+import importlib.machinery
+import importlib.util
 import inspect
+import marshal
 import sys
+import sysconfig
 import textwrap
 import types
-from typing import Iterable, List
+from importlib.machinery import ModuleSpec, SourceFileLoader
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set
 
+from ward._index import IndexedTest
+from ward._testing import is_test_module_name
+from ward._ward_version import __version__
 from ward.expect import (
     assert_equal,
     assert_greater_than,
@@ -87,8 +97,178 @@ class RewriteAssert(ast.NodeTransformer):
         return node
 
 
+# Set in the namespace of modules whose assertions were rewritten on import.
+_REWRITTEN_MARKER = "__ward_rewritten__"
+
+# The header of a cached, rewritten module: the magic number of the
+# running Python version followed by the hash of the module's source.
+_CACHE_MAGIC = importlib.util.MAGIC_NUMBER
+_CACHE_HEADER_SIZE = len(_CACHE_MAGIC) + 8
+
+
+def rewrite_module_source(source: bytes, path: str) -> types.CodeType:
+    """
+    Compile the source code of a module, with every assertion in it rewritten.
+    """
+    tree = ast.parse(source, filename=path)
+    tree = RewriteAssert().visit(tree)
+    return compile(tree, path, "exec", dont_inherit=True)
+
+
+def rewritten_cache_path(source_path: str) -> Optional[Path]:
+    """
+    Returns the path that the rewritten code of the module at `source_path` is cached at,
+    which is specific to the running Python and Ward versions. Returns None if the
+    running Python implementation doesn't support caching bytecode.
+    """
+    cache_tag = sys.implementation.cache_tag
+    if cache_tag is None:
+        return None
+    path = Path(source_path)
+    return (
+        path.parent / "__pycache__" / f"{path.stem}.{cache_tag}-ward-{__version__}.pyc"
+    )
+
+
+def _read_cached_code(cache_path: Path, source_hash: bytes) -> Optional[types.CodeType]:
+    try:
+        data = cache_path.read_bytes()
+    except OSError:
+        return None
+    if data[:_CACHE_HEADER_SIZE] != _CACHE_MAGIC + source_hash:
+        return None
+    try:
+        code = marshal.loads(data[_CACHE_HEADER_SIZE:])
+    except (EOFError, ValueError, TypeError):
+        return None
+    return code if isinstance(code, types.CodeType) else None
+
+
+class AssertionRewritingLoader(SourceFileLoader):
+    """
+    Loads a test module with all of the assertions in it rewritten.
+
+    The rewritten code is cached in ``__pycache__``, separately from the regular bytecode
+    for the module, and is reused for as long as the source of the module is unchanged.
+    """
+
+    def get_code(self, fullname: str) -> types.CodeType:
+        source_path = self.get_filename(fullname)
+        source = self.get_data(source_path)
+        source_hash = importlib.util.source_hash(source)
+
+        cache_path = rewritten_cache_path(source_path)
+        if cache_path:
+            code = _read_cached_code(cache_path, source_hash)
+            if code is not None:
+                return code
+
+        code = rewrite_module_source(source, source_path)
+        if cache_path and not sys.dont_write_bytecode:
+            data = _CACHE_MAGIC + source_hash + marshal.dumps(code)
+            self.set_data(str(cache_path), data)
+        return code
+
+    def exec_module(self, module: types.ModuleType) -> None:
+        vars(module).update(assert_func_namespace)
+        vars(module)[_REWRITTEN_MARKER] = True
+        super().exec_module(module)
+
+
+def with_rewriting_loader(spec: ModuleSpec) -> ModuleSpec:
+    """
+    Replace the loader of a test module's spec with one that rewrites its assertions.
+    Modules that aren't plain source files (e.g. compiled extensions) are left alone.
+    """
+    if type(spec.loader) is SourceFileLoader and spec.origin:
+        spec.loader = AssertionRewritingLoader(spec.name, spec.origin)
+    return spec
+
+
+# Directories containing installed packages, which may be below a root (e.g. in a
+# virtualenv inside the project), but whose test modules are never rewritten.
+_INSTALLED_PATHS = {
+    Path(path).resolve()
+    for name, path in sysconfig.get_paths().items()
+    if name in ("stdlib", "platstdlib", "purelib", "platlib")
+}
+
+
+def _is_below(path: Path, directories: Iterable[Path]) -> bool:
+    return any(
+        directory == path or directory in path.parents for directory in directories
+    )
+
+
+class AssertionRewritingHook(importlib.abc.MetaPathFinder):
+    """
+    An import hook which rewrites the assertions in test modules that are imported,
+    so that a test module imported from another still has its assertions rewritten.
+
+    Only test modules below one of the hook's `roots` (the directories that tests are
+    collected from) are rewritten. The hook asks the finders after it on `sys.meta_path`
+    to find the module, and leaves any other module to them by returning None.
+    """
+
+    def __init__(self) -> None:
+        self.roots: Set[Path] = set()
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[str]] = None,
+        target: Optional[types.ModuleType] = None,
+    ) -> Optional[ModuleSpec]:
+        if not self.roots or not is_test_module_name(fullname.rpartition(".")[2]):
+            return None
+        spec = self._find_spec_with_other_finders(fullname, path, target)
+        if spec is None or not self._should_rewrite(spec):
+            return None
+        return with_rewriting_loader(spec)
+
+    def _find_spec_with_other_finders(
+        self,
+        fullname: str,
+        path: Optional[Sequence[str]],
+        target: Optional[types.ModuleType],
+    ) -> Optional[ModuleSpec]:
+        finders = sys.meta_path
+        if self in finders:
+            finders = finders[finders.index(self) + 1 :]
+        for finder in finders:
+            find_spec = getattr(finder, "find_spec", None)
+            spec = find_spec(fullname, path, target) if find_spec else None
+            if spec is not None:
+                return spec
+        return None
+
+    def _should_rewrite(self, spec: ModuleSpec) -> bool:
+        if not spec.origin or not spec.has_location:
+            return False
+        origin = Path(spec.origin).resolve()
+        return _is_below(origin, self.roots) and not _is_below(origin, _INSTALLED_PATHS)
+
+
+def install_import_hook() -> AssertionRewritingHook:
+    """
+    Install the `AssertionRewritingHook` (unless it's already installed) and return it.
+    """
+    for finder in sys.meta_path:
+        if isinstance(finder, AssertionRewritingHook):
+            return finder
+    hook = AssertionRewritingHook()
+    sys.meta_path.insert(0, hook)
+    return hook
+
+
 def rewrite_assertions_in_tests(tests: Iterable[Test]) -> List[Test]:
-    return [rewrite_assertion(test) for test in tests]
+    # Tests read from the index have no source that's been imported to rewrite.
+    return [
+        test
+        if isinstance(test, IndexedTest) or test.fn.__globals__.get(_REWRITTEN_MARKER)
+        else rewrite_assertion(test)
+        for test in tests
+    ]
 
 
 def rewrite_assertion(test: Test) -> Test:
@@ -1,9 +1,10 @@
+import multiprocessing
 import pdb
 import sys
 from pathlib import Path
 from random import shuffle
 from timeit import default_timer
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
 import click
 import click_completion
@@ -12,18 +13,42 @@ from cucumber_tag_expressions import parse as parse_tags
 from cucumber_tag_expressions.model import Expression
 from rich.console import ConsoleRenderable
 
+from ward._cache import ProjectCache
+from ward._capture import (
+    DEFAULT_MEMORY_LIMIT,
+    SPILL_DIR_NAME,
+    set_memory_limit,
+    set_spill_dir,
+)
 from ward._collect import (
     configure_path,
     filter_fixtures,
     filter_tests,
     get_info_for_modules,
+    get_module_paths,
     get_tests_in_modules,
     load_modules,
 )
 from ward._config import set_defaults_from_config
 from ward._debug import init_breakpointhooks
+from ward._durations import DurationHistory
+from ward._fixtures import FixtureCache
+from ward._impact import (
+    LAST_RUN,
+    FootprintRecorder,
+    ImpactMap,
+    changed_files_since,
+)
+from ward._imports import ImportGraph, filter_modules_by_imports
+from ward._index import CollectionIndex
+from ward._interpreters import InterpreterPoolRunner, interpreters_available
+from ward._last_failed import LastFailed
+from ward._parallel import ProcessPoolRunner, ThreadPoolRunner
+from ward._results import ResultStore
 from ward._rewrite import rewrite_assertions_in_tests
-from ward._suite import Suite
+from ward._sharding import load_durations_file, parse_shard, select_shard
+from ward._static import filter_modules_statically
+from ward._suite import DEFAULT_ASYNC_CONCURRENCY, Suite
 from ward._terminal import (
     SessionPrelude,
     TestOutputStyle,
@@ -37,6 +62,7 @@ from ward._ward_version import __version__
 from ward.config import Config
 from ward.fixtures import _DEFINED_FIXTURES
 from ward.hooks import plugins, register_hooks_in_modules
+from ward.testing import Test, TestResult
 
 click_completion.init()
 
@@ -45,6 +71,14 @@ def _register_hooks(context: click.Context, param: click.Parameter, hook_module_
     register_hooks_in_modules(plugin_manager=plugins, module_names=hook_module_names)
 
 
+def _keep_results(
+    results: Iterable[TestResult], kept: List[TestResult]
+) -> Iterator[TestResult]:
+    for result in results:
+        kept.append(result)
+        yield result
+
+
 # TODO: simplify to use invoke_without_command and ctx.forward
 # once https://github.com/pallets/click/issues/430 is resolved
 @click.group(
@@ -105,6 +139,15 @@ hook_module = click.option(
     metavar="EXPR",
     type=parse_tags,
 )
+@click.option(
+    "--static-discovery/--no-static-discovery",
+    default=False,
+    help="""\
+    When filtering with --search or --tags, read test descriptions and tags from the
+    source of each test module first, and only import the modules that could contain
+    matching tests.
+    """,
+)
 @click.option(
     "--fail-limit",
     type=int,
@@ -132,6 +175,84 @@ hook_module = click.option(
     default="standard",
     help="Specify the order in which tests should run.",
 )
+@click.option(
+    "--last-failed",
+    is_flag=True,
+    help="Only run the tests that failed the last time they ran. If there are none, run every test.",
+)
+@click.option(
+    "--failed-first",
+    is_flag=True,
+    help="Run the tests that failed the last time they ran first, then the rest.",
+)
+@click.option(
+    "-n",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="The number of worker processes to run tests in. Tests from the same module always run in the same worker.",
+)
+@click.option(
+    "--executor",
+    type=click.Choice(
+        ["processes", "fork", "threads", "interpreters"], case_sensitive=False
+    ),
+    default="processes",
+    help="""\
+    How workers are started when running with --workers.
+    'processes' starts fresh interpreters which import the test modules again.
+    'fork' forks workers from the main process after collection (POSIX only).
+    'threads' runs tests in a pool of threads in the main process, which suits
+    tests that spend most of their time waiting on I/O.
+    'interpreters' runs tests in subinterpreters, each with its own GIL (Python 3.14+).
+    """,
+)
+@click.option(
+    "--shard",
+    type=parse_shard,
+    help="""\
+    Only run the tests in shard i of n, e.g. '--shard 3/12'. Tests are split
+    between shards by module, balanced by the number of tests in each module
+    (or their durations, if --durations-file is given).
+    """,
+)
+@click.option(
+    "--durations-file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    metavar="PATH",
+    help="""\
+    Balance --shard using the test durations in this file, such as a copy of
+    .ward_cache/durations.json that every machine shares.
+    """,
+)
+@click.option(
+    "--record-impact/--no-record-impact",
+    default=False,
+    help="""\
+    Record the source files and lines each test executes, so that --affected-by
+    can select the tests affected by a change in later sessions.
+    """,
+)
+@click.option(
+    "--affected-by",
+    metavar="REVISION",
+    help="""\
+    Only run the tests that executed a file that has changed since the given git
+    revision (or since their footprint was recorded, if 'last-run' is given), and
+    tests with no recorded footprint. Footprints are recorded by --record-impact.
+    """,
+)
+@click.option(
+    "--impact-analysis",
+    type=click.Choice(["footprints", "imports"], case_sensitive=False),
+    default="footprints",
+    help="""\
+    How --affected-by decides which tests a change affects.
+    'footprints' uses the footprints recorded by --record-impact.
+    'imports' selects the test modules that import a changed file (directly or
+    indirectly), read from import statements without importing anything.
+    """,
+)
 @click.option(
     "--show-diff-symbols/--hide-diff-symbols",
     default=False,
@@ -145,6 +266,46 @@ hook_module = click.option(
     default=True,
     help="Enable or disable output capturing.",
 )
+@click.option(
+    "--capture-memory-limit",
+    type=click.IntRange(min=0),
+    default=DEFAULT_MEMORY_LIMIT // 1024,
+    metavar="KB",
+    help="""\
+    The amount of output captured from each test that is kept in memory. Any more
+    is written to a temporary file, and only the start and end of it are displayed.
+    """,
+)
+@click.option(
+    "--async-concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_ASYNC_CONCURRENCY,
+    metavar="N",
+    help="""\
+    The maximum number of async tests marked with @run_concurrently that can run
+    at once. Use 1 to run them one at a time, like any other test.
+    """,
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    metavar="SECONDS",
+    help="""\
+    Stop any test that runs for longer than this, and report it as having timed out.
+    Tests given a timeout by the @test decorator use that instead.
+    """,
+)
+@click.option(
+    "--profile-memory",
+    type=click.IntRange(min=0),
+    default=0,
+    metavar="N",
+    help="""\
+    Measure the memory each test allocates (its peak, what it leaves allocated, and
+    the change in the size of the process) and display the N most memory-hungry
+    tests, along with the lines that allocated the most. Tests run more slowly.
+    """,
+)
 @click.option(
     "--show-slowest",
     type=int,
@@ -167,11 +328,25 @@ def test(
     exclude: Tuple[str],
     search: Optional[str],
     tags: Optional[Expression],
+    static_discovery: bool,
     fail_limit: Optional[int],
     test_output_style: str,
     progress_style: List[str],
     order: str,
+    last_failed: bool,
+    failed_first: bool,
+    workers: int,
+    executor: str,
+    shard: Optional[Tuple[int, int]],
+    durations_file: Optional[Path],
+    record_impact: bool,
+    affected_by: Optional[str],
+    impact_analysis: str,
     capture_output: bool,
+    capture_memory_limit: int,
+    async_concurrency: int,
+    timeout: Optional[float],
+    profile_memory: int,
     show_slowest: int,
     show_diff_symbols: bool,
     dry_run: bool,
@@ -186,38 +361,57 @@ def test(
 
     config = Config(**config_params, plugin_config=plugin_config)
 
+    _check_options(config)
+
     test_output_style = TestOutputStyle(test_output_style)
     progress_styles = [TestProgressStyle(ps) for ps in progress_style]
 
     init_breakpointhooks(pdb, sys)
+    set_memory_limit(capture_memory_limit * 1024)
     start_run = default_timer()
 
     print_before: Tuple[ConsoleRenderable] = plugins.hook.before_session(config=config)
 
     configure_path(project_root)
-    paths = [Path(p) for p in path]
-    mod_infos = get_info_for_modules(paths, exclude)
-    modules = load_modules(mod_infos)
-    unfiltered_tests = get_tests_in_modules(modules, capture_output)
-    plugins.hook.preprocess_tests(config=config, collected_tests=unfiltered_tests)
-    filtered_tests = filter_tests(unfiltered_tests, query=search, tag_expr=tags)
-    if config.order == "random":
-        shuffle(filtered_tests)
+    cache = ProjectCache.for_project(project_root)
+    spill_dir = cache.make_session_directory(SPILL_DIR_NAME)
+    set_spill_dir(str(spill_dir) if spill_dir else None)
+    unfiltered_tests, num_fixtures = _collect_tests(config, cache)
 
+    impact: Optional[ImpactMap] = None
+    if record_impact or (affected_by and impact_analysis == "footprints"):
+        impact = ImpactMap.load(cache, project_root)
+    failures = LastFailed.load(cache, project_root)
+    filtered_tests = _select_tests(config, unfiltered_tests, impact, failures)
     tests = rewrite_assertions_in_tests(filtered_tests)
 
     time_to_collect_secs = default_timer() - start_run
 
-    suite = Suite(tests=tests)
-    test_results = suite.generate_test_runs(
-        dry_run=dry_run, capture_output=capture_output
+    recorder: Optional[FootprintRecorder] = None
+    if record_impact and not dry_run:
+        recorder = FootprintRecorder.for_project(project_root)
+    suite = Suite(
+        tests=tests,
+        cache=FixtureCache(recorder=recorder),
+        timeout=timeout,
+        profile_memory=bool(profile_memory),
+    )
+    durations = DurationHistory.load(cache, project_root)
+    # With --failed-first, workers are given modules in the order they're run in,
+    # so that those containing failed tests go first, rather than longest first.
+    schedule_by = None if failed_first and not last_failed else durations
+    test_results = _make_runner(config, suite, schedule_by).generate_test_runs(
+        dry_run=dry_run,
+        capture_output=capture_output,
+        async_concurrency=async_concurrency,
     )
     rich_console.print(
         SessionPrelude(
             time_to_collect_secs=time_to_collect_secs,
             num_tests_collected=suite.num_tests_with_parameterisation,
-            num_fixtures_collected=len(_DEFINED_FIXTURES),
+            num_fixtures_collected=num_fixtures,
             config_path=config_path,
+            num_tests_is_lower_bound=suite.num_tests_is_lower_bound,
         )
     )
     writer = TestResultWriter(
@@ -230,20 +424,197 @@ def test(
     )
     for renderable in print_before:
         rich_console.print(renderable)
-    test_results = writer.output_all_test_results(test_results, fail_limit=fail_limit)
-    exit_code = get_exit_code(test_results)
-    time_taken = default_timer() - start_run
+    if impact is not None and recorder is not None:
+        test_results = impact.record(test_results)
+    # Every result is only kept in memory if a plugin's after_session hook needs it.
+    all_results: List[TestResult] = []
+    if plugins.hook.after_session.get_hookimpls():
+        test_results = _keep_results(test_results, all_results)
+    with ResultStore.open(
+        cache,
+        project_root,
+        num_slowest=show_slowest,
+        num_memory_hungriest=profile_memory,
+    ) as store:
+        writer.output_all_test_results(test_results, fail_limit=fail_limit, store=store)
+        exit_code = get_exit_code(store)
+        if not dry_run:
+            durations.record(store)
+            durations.save(cache)
+            failures.record(store)
+            failures.save(cache)
+        if impact is not None and recorder is not None:
+            impact.save(cache)
+        time_taken = default_timer() - start_run
 
-    render_afters: Tuple[ConsoleRenderable] = plugins.hook.after_session(
-        config=config, test_results=test_results, status_code=exit_code
-    )
-    for renderable in render_afters:
-        rich_console.print(renderable)
+        render_afters: List[ConsoleRenderable] = [
+            *plugins.hook.after_session(
+                config=config, test_results=all_results, status_code=exit_code
+            ),
+            *plugins.hook.after_session_records(
+                config=config, test_results=store, status_code=exit_code
+            ),
+        ]
+        for renderable in render_afters:
+            rich_console.print(renderable)
 
-    writer.output_test_result_summary(test_results, time_taken, show_slowest)
+        writer.output_test_result_summary(
+            store, time_taken, show_slowest, profile_memory
+        )
+    if spill_dir:
+        # The full output of tests that failed in this session is kept until the next.
+        cache.remove_earlier_session_directories(spill_dir)
     sys.exit(exit_code.value)
 
 
+def _check_options(config: Config) -> None:
+    """Reject combinations of options that can't be used together."""
+    executor, workers = config.executor, config.workers
+    if executor != "processes" and workers <= 1:
+        raise click.BadParameter(
+            f"'{executor}' only applies when running tests with more than one worker "
+            "(use --workers).",
+            param_hint="--executor",
+        )
+    if executor == "fork" and "fork" not in multiprocessing.get_all_start_methods():
+        raise click.BadParameter(
+            "forking is not supported on this platform.", param_hint="--executor"
+        )
+    if executor == "interpreters" and not interpreters_available():
+        raise click.BadParameter(
+            "running tests in subinterpreters requires Python 3.14 or later.",
+            param_hint="--executor",
+        )
+    if config.record_impact and workers > 1 and executor == "threads":
+        raise click.BadParameter(
+            "footprints can't be recorded while tests run in threads.",
+            param_hint="--record-impact",
+        )
+    if (
+        config.profile_memory
+        and workers > 1
+        and executor in ("threads", "interpreters")
+    ):
+        raise click.BadParameter(
+            "memory can't be profiled while tests run in threads or subinterpreters.",
+            param_hint="--profile-memory",
+        )
+    if config.affected_by == LAST_RUN and config.impact_analysis == "imports":
+        raise click.BadParameter(
+            f"'{LAST_RUN}' can only be used with '--impact-analysis footprints'.",
+            param_hint="--affected-by",
+        )
+
+
+def _collect_tests(config: Config, cache: ProjectCache) -> Tuple[List[Test], int]:
+    """
+    Find the test modules to collect tests from and collect them, returning the tests
+    and the number of fixtures that were defined.
+    """
+    project_root = config.project_root
+    index = CollectionIndex.load(cache, config.exclude)
+    paths = [Path(p) for p in config.path]
+    mod_infos = get_info_for_modules(paths, config.exclude, index)
+    if config.static_discovery:
+        mod_infos = filter_modules_statically(
+            mod_infos, query=config.search or "", tag_expr=config.tags
+        )
+    if config.affected_by and config.impact_analysis == "imports":
+        graph = ImportGraph.load(cache, project_root)
+        changed = changed_files_since(config.affected_by, project_root)
+        mod_infos = filter_modules_by_imports(mod_infos, changed, graph)
+        graph.save(cache)
+    module_paths = get_module_paths(mod_infos)
+
+    # A dry-run doesn't need the tests to be importable, so if nothing has changed
+    # since the tests were last collected, they can be read from the index instead.
+    session = index.get_session(module_paths) if config.dry_run else None
+    indexed_tests = (
+        index.get_tests(module_paths, config.capture_output) if session else None
+    )
+    if session and indexed_tests is not None:
+        tests = indexed_tests
+        num_fixtures = session["num_fixtures"]
+    else:
+        modules = load_modules(mod_infos)
+        tests = get_tests_in_modules(modules, config.capture_output)
+        num_fixtures = len(_DEFINED_FIXTURES)
+        index.record_session(module_paths, tests, num_fixtures, project_root)
+    index.save(cache)
+    return tests, num_fixtures
+
+
+def _select_tests(
+    config: Config,
+    tests: List[Test],
+    impact: Optional[ImpactMap],
+    failures: LastFailed,
+) -> List[Test]:
+    """
+    Select the tests to run from those collected, in the order they should run in.
+    """
+    project_root = config.project_root
+    affected_by = config.affected_by
+    if impact is not None and affected_by and config.impact_analysis == "footprints":
+        changed_files = (
+            None
+            if affected_by == LAST_RUN
+            else changed_files_since(affected_by, project_root)
+        )
+        tests = impact.select_affected(tests, changed_files)
+
+    plugins.hook.preprocess_tests(config=config, collected_tests=tests)
+    tests = filter_tests(tests, query=config.search, tag_expr=config.tags)
+
+    if config.shard:
+        # Every machine has to make the same split, so the durations in this
+        # machine's cache can't be used to balance the shards.
+        shared = (
+            load_durations_file(config.durations_file, project_root)
+            if config.durations_file
+            else None
+        )
+        tests = select_shard(tests, config.shard, shared, project_root)
+
+    if config.order == "random":
+        shuffle(tests)
+
+    if config.last_failed or config.failed_first:
+        tests = failures.select(tests, failed_first=not config.last_failed)
+    return tests
+
+
+def _make_runner(
+    config: Config, suite: Suite, durations: Optional[DurationHistory]
+) -> Union[Suite, ProcessPoolRunner, ThreadPoolRunner, InterpreterPoolRunner]:
+    """
+    Returns what the tests in the suite should be run with: the suite itself, or a
+    pool of workers if there's more than one.
+    """
+    # A dry-run doesn't run anything, so there's nothing to gain from workers (and
+    # tests read from the index can't be found in a worker).
+    if config.workers <= 1 or config.dry_run:
+        return suite
+    if config.executor == "threads":
+        return ThreadPoolRunner(
+            suite=suite, num_workers=config.workers, durations=durations
+        )
+    if config.executor == "interpreters":
+        return InterpreterPoolRunner(
+            suite=suite,
+            num_workers=config.workers,
+            project_root=config.project_root,
+            durations=durations,
+        )
+    return ProcessPoolRunner(
+        suite=suite,
+        num_workers=config.workers,
+        project_root=config.project_root,
+        start_method="fork" if config.executor == "fork" else "spawn",
+        durations=durations,
+    )
+
+
 @run.command()
 @config_option
 @path_option
@@ -303,23 +674,55 @@ def fixtures(
 ):
     """Show information on fixtures."""
     configure_path(project_root)
+    cache = ProjectCache.for_project(project_root)
+    index = CollectionIndex.load(cache, exclude)
     paths = [Path(p) for p in path]
-    mod_infos = get_info_for_modules(paths, exclude)
+    mod_infos = get_info_for_modules(paths, exclude, index)
+    module_paths = get_module_paths(mod_infos)
+
+    # The output only depends on the collected modules and the options
+    # it was rendered with, so it's reused for as long as they're unchanged.
+    output_key = repr(
+        (
+            sorted(str(p.absolute()) for p in fixture_path),
+            search,
+            show_scopes or full,
+            show_docstrings or full,
+            show_dependencies or full,
+            show_dependency_trees or full,
+            rich_console.width,
+            rich_console.color_system,
+        )
+    )
+    session = index.get_session(module_paths)
+    if session and output_key in session["fixture_output"]:
+        rich_console.file.write(session["fixture_output"][output_key])
+        index.save(cache)
+        return
+
     modules = list(load_modules(mod_infos))
     tests = list(get_tests_in_modules(modules, capture_output=True))
+    session = index.record_session(
+        module_paths, tests, len(_DEFINED_FIXTURES), project_root
+    )
 
     filtered_fixtures = list(
         filter_fixtures(_DEFINED_FIXTURES, query=search, paths=fixture_path)
     )
 
-    output_fixtures(
-        fixtures=filtered_fixtures,
-        tests=tests,
-        show_scopes=show_scopes or full,
-        show_docstrings=show_docstrings or full,
-        show_dependencies=show_dependencies or full,
-        show_dependency_trees=show_dependency_trees or full,
-    )
+    with rich_console.capture() as capture:
+        output_fixtures(
+            fixtures=filtered_fixtures,
+            tests=tests,
+            show_scopes=show_scopes or full,
+            show_docstrings=show_docstrings or full,
+            show_dependencies=show_dependencies or full,
+            show_dependency_trees=show_dependency_trees or full,
+        )
+    output = capture.get()
+    rich_console.file.write(output)
+    session["fixture_output"][output_key] = output
+    index.save(cache)
 
 
 @run.command()
@@ -0,0 +1,102 @@
+import json
+import zlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import click
+
+from ward._durations import DurationHistory
+from ward._utilities import group_by
+from ward.testing import Test
+
+Shard = Tuple[int, int]
+
+
+def parse_shard(value: str) -> Shard:
+    """
+    Parse a shard specification of the form 'i/n', where 1 <= i <= n.
+    """
+    index_str, sep, count_str = value.partition("/")
+    try:
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise click.BadParameter(f"{value!r} is not of the form 'i/n', e.g. '3/12'.")
+    if not sep or count < 1 or not 1 <= index <= count:
+        raise click.BadParameter(
+            f"{value!r} is not a valid shard, i must be between 1 and n."
+        )
+    return index, count
+
+
+def _module_key(path: Path, project_root: Optional[Path]) -> str:
+    if project_root:
+        try:
+            path = path.relative_to(project_root)
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+def load_durations_file(path: Path, project_root: Optional[Path]) -> DurationHistory:
+    """
+    Read the test durations that every machine uses to balance shards from a file
+    in the format of the `durations` entry of the project cache.
+    """
+    try:
+        durations = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise click.BadParameter(f"couldn't read {path}: {e}")
+    if not isinstance(durations, dict):
+        raise click.BadParameter(f"{path} doesn't contain recorded test durations.")
+    return DurationHistory(project_root=project_root, durations=durations)
+
+
+def select_shard(
+    tests: List[Test],
+    shard: Shard,
+    durations: Optional[DurationHistory] = None,
+    project_root: Optional[Path] = None,
+) -> List[Test]:
+    """
+    Return the tests that belong to the given shard, in their original order.
+
+    Tests are assigned to shards a whole module at a time so that module scoped
+    fixtures are never resolved on more than one machine. Modules are weighted by
+    the estimated duration of their tests if `durations` is given, or the number
+    of tests otherwise, and assigned heaviest first to whichever shard has the least
+    work so far. Modules of equal weight are ordered by a stable hash of their path.
+
+    Every machine must make the same assignments, so `durations` must be shared
+    by all of them (see `load_durations_file`), never read from a machine's own cache.
+    """
+    index, count = shard
+    if count == 1:
+        return tests
+
+    def weight(module_tests: List[Test]) -> float:
+        if durations is None:
+            return len(module_tests)
+        return sum(durations.estimate(test) for test in module_tests)
+
+    modules = group_by(tests, key=lambda t: t.path)
+    weighted = sorted(
+        (
+            (
+                -weight(module_tests),
+                zlib.crc32(_module_key(path, project_root).encode()),
+                _module_key(path, project_root),
+                path,
+            )
+            for path, module_tests in modules.items()
+        )
+    )
+
+    loads = [0.0] * count
+    selected_paths = set()
+    for negative_weight, _, _, path in weighted:
+        lightest = loads.index(min(loads))
+        loads[lightest] -= negative_weight
+        if lightest == index - 1:
+            selected_paths.add(path)
+
+    return [test for test in tests if test.path in selected_paths]
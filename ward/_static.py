@@ -0,0 +1,235 @@
+import ast
+import importlib.util
+import pkgutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from cucumber_tag_expressions.model import Expression
+
+from ward._collect import get_module_paths
+
+
+@dataclass
+class StaticTest:
+    """
+    The metadata of a test, as read from the source code of its module without importing it.
+
+    Attributes:
+        name: The name of the test function.
+        description: The description passed to ``@test``.
+        tags: The tags passed to ``@test``.
+        source: The source code of the test, including its decorators.
+    """
+
+    name: str
+    description: str
+    tags: List[str]
+    source: str
+
+
+class _NotStatic(Exception):
+    """Raised when the tests in a module can't be determined statically."""
+
+
+def read_static_tests(source: str) -> Optional[List[StaticTest]]:
+    """
+    Find the tests defined in the source code of a module by looking for functions
+    decorated with ``@test``, where the description and tags are literals.
+
+    Returns None if the tests in the module can't be read statically, for example
+    if a description is built at runtime, or ``test`` is used other than as a decorator.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    test_names, ward_names = _names_bound_to_ward_test(tree)
+    if not test_names and not ward_names:
+        # Tests may still be defined using a decorator from elsewhere that wraps `test`.
+        return None
+
+    lines = source.splitlines(keepends=True)
+    try:
+        return _read_decorated_tests(tree, test_names, ward_names, lines, source)
+    except _NotStatic:
+        return None
+
+
+def _read_decorated_tests(
+    tree: ast.AST,
+    test_names: Set[str],
+    ward_names: Set[str],
+    lines: List[str],
+    source: str,
+) -> List[StaticTest]:
+    """
+    Reads the tests from every function decorated with a call to ``test``. Raises
+    `_NotStatic` if ``test`` is referred to anywhere other than in one of those calls.
+    """
+    decorator_calls: Set[ast.AST] = set()
+    tests = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call) and _is_test_ref(
+                decorator.func, test_names, ward_names
+            ):
+                decorator_calls.add(decorator.func)
+                tests.append(_read_test(node, decorator, lines, source))
+
+    for node in ast.walk(tree):
+        if _is_test_ref(node, test_names, ward_names) and node not in decorator_calls:
+            raise _NotStatic()
+    return tests
+
+
+def _names_bound_to_ward_test(tree: ast.AST) -> Tuple[Set[str], Set[str]]:
+    """
+    Returns the names that ``ward.test`` is imported as in the module,
+    and the names that the ``ward`` package itself is imported as.
+    """
+    test_names = set()
+    ward_names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module in ("ward", "ward.testing"):
+            for alias in node.names:
+                if alias.name == "test":
+                    test_names.add(alias.asname or alias.name)
+                elif alias.name == "testing":
+                    ward_names.add(alias.asname or alias.name)
+                elif alias.name == "*":
+                    # We can't tell which names refer to ward's test decorator.
+                    test_names.add("test")
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name == "ward" or alias.name.startswith("ward."):
+                    ward_names.add(alias.asname or alias.name.split(".")[0])
+    return test_names, ward_names
+
+
+def _is_test_ref(node: ast.AST, test_names: Set[str], ward_names: Set[str]) -> bool:
+    if isinstance(node, ast.Name):
+        return node.id in test_names
+    if isinstance(node, ast.Attribute) and node.attr == "test":
+        root = node.value
+        while isinstance(root, ast.Attribute):
+            root = root.value
+        return isinstance(root, ast.Name) and root.id in ward_names
+    return False
+
+
+def _read_test(
+    fn: ast.AST, decorator: ast.Call, lines: List[str], source: str
+) -> StaticTest:
+    description, tags = _read_description_and_tags(decorator)
+
+    # Python 3.7 doesn't record where nodes end, so fall back to the whole module.
+    end_lineno = getattr(fn, "end_lineno", None)
+    if end_lineno:
+        first_lineno = min(d.lineno for d in fn.decorator_list)  # type: ignore
+        fn_source = "".join(lines[first_lineno - 1 : end_lineno])
+    else:
+        fn_source = source
+
+    return StaticTest(
+        name=fn.name,  # type: ignore[attr-defined]
+        description=description,
+        tags=tags,
+        source=fn_source,
+    )
+
+
+def _read_description_and_tags(decorator: ast.Call) -> Tuple[str, List[str]]:
+    """Returns the description and tags passed to a ``@test`` decorator call."""
+    description = decorator.args[0] if decorator.args else None
+    tags = None
+    for keyword in decorator.keywords:
+        if keyword.arg == "description":
+            description = keyword.value
+        elif keyword.arg == "tags":
+            tags = keyword.value
+        elif keyword.arg is None:
+            # e.g. @test(**kwargs)
+            raise _NotStatic()
+
+    description_value = _literal(description)
+    tags_value = _literal(tags) if tags is not None else []
+    if not isinstance(description_value, str):
+        raise _NotStatic()
+    if not isinstance(tags_value, (list, tuple)) or not all(
+        isinstance(tag, str) for tag in tags_value
+    ):
+        raise _NotStatic()
+    return description_value, list(tags_value)
+
+
+def _literal(node: Optional[ast.AST]):
+    if node is None:
+        raise _NotStatic()
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise _NotStatic()
+
+
+def static_test_matches(
+    test: StaticTest,
+    module_name: str,
+    query: str = "",
+    tag_expr: Optional[Expression] = None,
+) -> bool:
+    """
+    Returns True if a test with the given static metadata would be kept by
+    `filter_tests` when searching for `query` and filtering by `tag_expr`.
+    """
+    matches_query = (
+        not query
+        or query in test.description
+        or query in f"{module_name}."
+        or query in test.source
+        or query in f"{module_name}.{test.name}"
+    )
+    matches_tags = not tag_expr or tag_expr.evaluate(test.tags)
+    return bool(matches_query and matches_tags)
+
+
+def filter_modules_statically(
+    modules: List[pkgutil.ModuleInfo],
+    query: str = "",
+    tag_expr: Optional[Expression] = None,
+) -> List[pkgutil.ModuleInfo]:
+    """
+    Remove the modules which can't contain any tests that match `query` and `tag_expr`,
+    judging by their source code, so they don't need to be imported. Modules whose
+    tests can't be read statically are always kept.
+    """
+    if not query and not tag_expr:
+        return modules
+
+    kept = []
+    for module, path in zip(modules, get_module_paths(modules)):
+        tests = _read_static_tests_at(path)
+        if tests is None or any(
+            static_test_matches(t, _module_name(module), query, tag_expr) for t in tests
+        ):
+            kept.append(module)
+    return kept
+
+
+def _read_static_tests_at(path: Path) -> Optional[List[StaticTest]]:
+    if path.suffix != ".py" or path.name == "__init__.py":
+        return None
+    try:
+        source = importlib.util.decode_source(path.read_bytes())
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return None
+    return read_static_tests(source)
+
+
+def _module_name(module) -> str:
+    if isinstance(module, pkgutil.ModuleInfo):
+        return module.name
+    return module.__name__
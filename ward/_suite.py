@@ -1,19 +1,44 @@
+import asyncio
 from collections import defaultdict
+from contextlib import ExitStack
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import DefaultDict, Dict, Generator, List
+from typing import (
+    DefaultDict,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+from ward._capture import capture_per_context
 from ward._errors import ParameterisationError
 from ward._fixtures import FixtureCache
+from ward._impact import Footprint, merge_footprints
+from ward._memory import memory_profile
 from ward.fixtures import TeardownResult
 from ward.models import Scope
-from ward.testing import Test, TestResult
+from ward.testing import ParameterisedInstance, Test, TestResult
+
+# The default maximum number of tests marked with `run_concurrently` that can be
+# in progress at once.
+DEFAULT_ASYNC_CONCURRENCY = 10
 
 
 @dataclass
 class Suite:
     tests: List[Test]
     cache: FixtureCache = field(default_factory=FixtureCache)
+    # The timeout of any test that wasn't given one by the `@test` decorator.
+    timeout: Optional[float] = None
+    # If True, the memory used by each test that doesn't run concurrently with
+    # others is measured and attached to its result.
+    profile_memory: bool = False
 
     @property
     def num_tests(self) -> int:
@@ -26,8 +51,17 @@ class Suite:
     def num_tests_with_parameterisation(self) -> int:
         """
         Returns: The number of tests in the suite, *after* taking parameterisation into account.
+            Tests that are only parameterised with iterables of unknown length aren't counted,
+            so this is a lower bound if `num_tests_is_lower_bound` is True.
         """
-        return sum(test.find_number_of_instances() for test in self.tests)
+        return sum(test.find_number_of_instances() or 0 for test in self.tests)
+
+    @property
+    def num_tests_is_lower_bound(self) -> bool:
+        """
+        Returns: True if the number of instances of some tests isn't known until they run.
+        """
+        return any(test.find_number_of_instances() is None for test in self.tests)
 
     def _test_counts_per_module(self) -> Dict[Path, int]:
         """
@@ -43,6 +77,7 @@ class Suite:
         self,
         dry_run: bool = False,
         capture_output: bool = True,
+        async_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
     ) -> Generator[TestResult, None, None]:
         """
         Run tests
@@ -50,15 +85,58 @@ class Suite:
         Returns a generator which yields test results
         """
         num_tests_per_module = self._test_counts_per_module()
-        for test in self.tests:
-            num_tests_per_module[test.path] -= 1
-            try:
-                generated_tests = test.get_parameterised_instances()
-            except ParameterisationError as e:
-                yield test.fail_with_error(e)
+        for group in group_tests(self.tests, async_concurrency):
+            path = group[0].path
+            num_tests_per_module[path] -= len(group)
+            yield from self.run_group(group, dry_run, capture_output, async_concurrency)
+
+            if num_tests_per_module[path] == 0:
+                self.cache.teardown_fixtures_for_scope(
+                    Scope.Module,
+                    scope_key=path,
+                    capture_output=capture_output,
+                )
+
+        self.cache.teardown_global_fixtures(capture_output=capture_output)
+
+    def run_group(
+        self,
+        group: List[Test],
+        dry_run: bool = False,
+        capture_output: bool = True,
+        async_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    ) -> Generator[TestResult, None, None]:
+        """
+        Run a group of tests produced by `group_tests`.
+        """
+        if async_concurrency > 1 and group[0].is_concurrent:
+            yield from self.run_tests_concurrently(
+                group, dry_run, capture_output, async_concurrency
+            )
+        else:
+            for test in group:
+                yield from self.run_test(test, dry_run, capture_output)
+
+    def run_test(
+        self,
+        test: Test,
+        dry_run: bool = False,
+        capture_output: bool = True,
+    ) -> Generator[TestResult, None, None]:
+        """
+        Run every parameterised instance of a single test, tearing down the
+        test-scoped fixtures after each instance. Module and global scoped
+        fixtures are left in the cache for the caller to tear down.
+        """
+        for parent, generated_test in _iter_instances([test]):
+            if isinstance(generated_test, TestResult):
+                yield generated_test
                 continue
-            for generated_test in generated_tests:
-                result = generated_test.run(self.cache, dry_run=dry_run)
+            profile_memory = self.profile_memory and not dry_run
+            with self.cache.recording() as footprint, memory_profile(
+                profile_memory
+            ) as memory:
+                result = generated_test.run(self.cache, dry_run, self.timeout)
                 teardown_results: List[
                     TeardownResult
                 ] = self.cache.teardown_fixtures_for_scope(
@@ -66,31 +144,161 @@ class Suite:
                     scope_key=generated_test.id,
                     capture_output=capture_output,
                 )
-                if teardown_results:
-                    try:
-                        # There could be exceptions in the teardown code of multiple fixtures
-                        # injected into a single test. Take the first exception and associate
-                        # that with the test.
-                        first_teardown_error_result: TeardownResult = next(
-                            r
-                            for r in teardown_results
-                            if r.captured_exception is not None
-                        )
-                        # Any exceptions that occur during the teardown of a test-scoped fixture
-                        # are considered to be an error in any test that depends on said fixture
-                        result = test.fail_with_error(
-                            first_teardown_error_result.captured_exception  # type: ignore[arg-type]
+            result = _fail_on_teardown_error(parent, result, teardown_results)
+            result.memory = memory
+            yield self._with_footprint(result, [footprint])
+
+    def run_tests_concurrently(
+        self,
+        tests: List[Test],
+        dry_run: bool = False,
+        capture_output: bool = True,
+        limit: int = DEFAULT_ASYNC_CONCURRENCY,
+    ) -> Generator[TestResult, None, None]:
+        """
+        Run every parameterised instance of a group of async tests as tasks on the
+        session's event loop, with at most `limit` of them in progress at once.
+        Results are yielded as the tests finish, which may not be the order they
+        were started in. Like `run_test`, test-scoped fixtures are torn down after
+        each instance, and the rest are left in the cache.
+
+        The code run by concurrent tests can't be told apart, so if footprints are
+        being recorded, each test is attributed everything that ran while it was
+        in progress. For the same reason, the memory used by concurrent tests
+        isn't profiled.
+        """
+        # The tasks only make progress while the loop runs, so hold the lock
+        # throughout, in case other threads are using the loop.
+        with self.cache.loop.lock:
+            instances = _iter_instances(tests)
+            pending: Set["asyncio.Task[TestResult]"] = set()
+            footprints: Dict["asyncio.Task[TestResult]", List[Footprint]] = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < limit:
+                    item = next(instances, None)
+                    if item is None:
+                        exhausted = True
+                        continue
+                    parent, instance = item
+                    if isinstance(instance, TestResult):
+                        yield instance
+                    else:
+                        task = self.cache.loop.create_task(
+                            self._run_instance_async(
+                                parent, instance, dry_run, capture_output
+                            )
                         )
-                    except StopIteration:
-                        # There were no exceptions while tearing down the fixtures.
-                        pass
-                yield result
+                        pending.add(task)
+                        footprints[task] = []
+                if not pending:
+                    return
 
-            if num_tests_per_module[test.path] == 0:
-                self.cache.teardown_fixtures_for_scope(
-                    Scope.Module,
-                    scope_key=test.path,
-                    capture_output=capture_output,
-                )
+                running = pending
+                with ExitStack() as stack:
+                    if capture_output:
+                        stack.enter_context(capture_per_context())
+                    footprint = stack.enter_context(self.cache.recording())
+                    done, pending = self.cache.loop.run(
+                        asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    )
+                for task in running:
+                    footprints[task].append(footprint)
+                for task in done:
+                    yield self._with_footprint(task.result(), footprints.pop(task))
 
-        self.cache.teardown_global_fixtures(capture_output=capture_output)
+    def _with_footprint(
+        self, result: TestResult, footprints: List[Footprint]
+    ) -> TestResult:
+        """
+        If footprints are being recorded, attach the footprint of a test to its result:
+        the code run while the test was in progress, and the code that was run to
+        resolve the fixtures it depends on, including any that were already cached.
+        """
+        if self.cache.recorder is None:
+            return result
+        test = result.test
+        for node in test.resolution_plan.nodes:
+            scope_key = test.scope_key_from(node.scope)
+            fixture = self.cache.get(node.key, node.scope, scope_key)
+            if fixture is not None and fixture.footprint is not None:
+                footprints.append(fixture.footprint)
+        result.footprint = merge_footprints(*footprints)
+        return result
+
+    async def _run_instance_async(
+        self,
+        parent: Test,
+        instance: Union[Test, ParameterisedInstance],
+        dry_run: bool,
+        capture_output: bool,
+    ) -> TestResult:
+        result = await instance.run_async(self.cache, dry_run, self.timeout)
+        teardown_results = await self.cache.teardown_fixtures_for_scope_async(
+            Scope.Test, scope_key=instance.id, capture_output=capture_output
+        )
+        return _fail_on_teardown_error(parent, result, teardown_results)
+
+
+def group_tests(tests: Iterable[Test], async_concurrency: int) -> Iterator[List[Test]]:
+    """
+    Split tests into the groups they're run in. Consecutive tests in the same module
+    that are marked with `run_concurrently` are grouped together, so that they can
+    run concurrently. Every other test is in a group of its own.
+    """
+    group: List[Test] = []
+    for test in tests:
+        can_join_group = (
+            async_concurrency > 1
+            and test.is_concurrent
+            and group
+            and group[-1].is_concurrent
+            and group[-1].path == test.path
+        )
+        if group and not can_join_group:
+            yield group
+            group = []
+        group.append(test)
+    if group:
+        yield group
+
+
+def _iter_instances(
+    tests: Iterable[Test],
+) -> Iterator[Tuple[Test, Union[Test, ParameterisedInstance, TestResult]]]:
+    """
+    Generate each parameterised instance of each test, along with the test it's an
+    instance of. If a test is parameterised incorrectly, a failing result for the
+    test is generated in place of its remaining instances.
+    """
+    for test in tests:
+        generated_tests = test.iter_parameterised_instances()
+        while True:
+            try:
+                generated_test = next(generated_tests)
+            except StopIteration:
+                break
+            except ParameterisationError as e:
+                yield test, test.fail_with_error(e)
+                break
+            yield test, generated_test
+
+
+def _fail_on_teardown_error(
+    test: Test, result: TestResult, teardown_results: List[TeardownResult]
+) -> TestResult:
+    try:
+        # There could be exceptions in the teardown code of multiple fixtures
+        # injected into a single test. Take the first exception and associate
+        # that with the test.
+        first_teardown_error_result: TeardownResult = next(
+            r for r in teardown_results if r.captured_exception is not None
+        )
+    except StopIteration:
+        # There were no exceptions while tearing down the fixtures.
+        return result
+    # Any exceptions that occur during the teardown of a test-scoped fixture
+    # are considered to be an error in any test that depends on said fixture
+    return test.fail_with_error(
+        first_teardown_error_result.captured_exception  # type: ignore[arg-type]
+    )
@@ -1,4 +1,5 @@
 import abc
+import collections
 import inspect
 import itertools
 import math
@@ -17,6 +18,7 @@ from typing import (
     Iterator,
     List,
     Optional,
+    Sequence,
     Tuple,
     Type,
     Union,
@@ -24,12 +26,11 @@ from typing import (
 
 from rich.columns import Columns
 from rich.console import Console, ConsoleOptions, Group, RenderableType, RenderResult
-from rich.highlighter import NullHighlighter
+from rich.highlighter import NullHighlighter, ReprHighlighter
 from rich.live import Live
 from rich.markdown import Markdown
 from rich.padding import Padding
 from rich.panel import Panel
-from rich.pretty import Pretty
 from rich.progress import (
     BarColumn,
     Progress,
@@ -46,7 +47,10 @@ from rich.traceback import Traceback
 from rich.tree import Tree
 
 from ward._diff import Diff
+from ward._failures import FailureRecord
 from ward._fixtures import FixtureHierarchyMapping, fixture_parents_and_children
+from ward._memory import format_bytes
+from ward._results import ResultRecord, ResultStore
 from ward._suite import Suite
 from ward._utilities import group_by
 from ward._ward_version import __version__
@@ -56,11 +60,16 @@ from ward.expect import (
     INEQUALITY_COMPARISONS,
     IS_COMPARISONS,
     Comparison,
-    TestAssertionFailure,
 )
 from ward.fixtures import Fixture
 from ward.models import ExitCode, Scope
-from ward.testing import Test, TestOutcome, TestResult, fixtures_used_directly_by_tests
+from ward.testing import (
+    ParameterisedInstance,
+    Test,
+    TestOutcome,
+    TestResult,
+    fixtures_used_directly_by_tests,
+)
 
 HORIZONTAL_PAD = (0, 1, 0, 1)
 
@@ -85,6 +94,8 @@ theme = Theme(
         "info": "yellow italic",
         "info.border": "yellow",
         "dryrun": "#ffffff on #162740",
+        "timeout": "#ffffff on #EA913C",
+        "timeout.textonly": "#EA913C",
         "rule.line": "#189F4A",
         "fixture.name": "bold #1381E0",
         "fixture.scope.test": "bold #189F4A",
@@ -94,6 +105,7 @@ theme = Theme(
     }
 )
 rich_console = Console(theme=theme, highlighter=NullHighlighter())
+repr_highlighter = ReprHighlighter()
 
 
 def format_test_id(test_result: TestResult) -> str:
@@ -103,26 +115,38 @@ def format_test_id(test_result: TestResult) -> str:
     return f"{format_test_location(test_result.test)}{format_test_case_number(test_result.test)}"
 
 
-def format_test_location(test: Test) -> str:
+def format_record_id(record: ResultRecord) -> str:
+    """
+    Format module name, line number, and test case number of a stored result
+    """
+    case_number = format_case_number(record.instance_index, record.group_size)
+    return f"{record.module_name}:{record.line_number}{case_number}"
+
+
+def format_test_location(test: Union[Test, ParameterisedInstance]) -> str:
     """
     Returns the location of a test as a string of the form '{test.module_name}:{test.line_number}'
     """
     return f"{test.module_name}:{test.line_number}"
 
 
-def format_test_case_number(test: Test) -> str:
+def format_test_case_number(test: Union[Test, ParameterisedInstance]) -> str:
     """
     Returns a string of the format '[{current_test_number}/{num_parameterised_instances}]'.
 
     For example, for the 3rd run of a test that is parameterised with 5 parameter sets the
-    return value is '[3/5]'.
+    return value is '[3/5]'. If the number of parameter sets isn't known, it's '[3]'.
     """
     param_meta = test.param_meta
-    if param_meta.group_size > 1:
-        pad = len(str(param_meta.group_size))
-        iter_indicator = (
-            f"[{param_meta.instance_index + 1:>{pad}}/{param_meta.group_size}]"
-        )
+    return format_case_number(param_meta.instance_index, param_meta.group_size)
+
+
+def format_case_number(instance_index: int, group_size: Optional[int]) -> str:
+    if group_size is None:
+        iter_indicator = f"[{instance_index + 1}]"
+    elif group_size > 1:
+        pad = len(str(group_size))
+        iter_indicator = f"[{instance_index + 1:>{pad}}/{group_size}]"
     else:
         iter_indicator = ""
 
@@ -200,50 +224,37 @@ def get_dot(result: TestResult) -> Text:
 
 @dataclass
 class TestTimingStatsPanel:
-    all_tests_in_session: List[TestResult]
+    slowest_tests: List[ResultRecord]
+    durations: Sequence[float]
     num_tests_to_show: int
 
-    @property
-    def _raw_test_durations_secs(self):
-        return [r.test.timer.duration for r in self.all_tests_in_session]
-
     @property
     def _median_secs(self):
-        return statistics.median(self._raw_test_durations_secs)
+        return statistics.median(self.durations)
 
     @property
     def _percentile99_secs(self):
-        data = self._raw_test_durations_secs
+        data = self.durations
         size = len(data)
         percentile = 99
         return sorted(data)[int(math.ceil((size * percentile) / 100)) - 1]
 
     def __rich_console__(self, c: Console, co: ConsoleOptions) -> RenderResult:
-        def sort_key(r: TestResult) -> float:
-            assert r.test.timer, "test must've been run already"
-            return r.test.timer.duration
-
-        test_results = sorted(self.all_tests_in_session, key=sort_key, reverse=True)
         grid = Table.grid(padding=(0, 2, 0, 0))
         grid.add_column(justify="right")  # Time taken
         grid.add_column()  # Test ID
         grid.add_column()  # Test description
 
-        for result in test_results[: self.num_tests_to_show]:
-            assert result.test.timer, "test must've been run already"
-            time_taken_secs = result.test.timer.duration
-            time_taken_millis = time_taken_secs * 1000
-            test_id = format_test_id(result)
-            description = result.test.description
+        slowest_tests = self.slowest_tests[: self.num_tests_to_show]
+        for record in slowest_tests:
+            assert record.duration is not None, "test must've been run already"
+            time_taken_millis = record.duration * 1000
             grid.add_row(
                 f"[b]{time_taken_millis:.0f}[/b]ms",
-                Text(test_id, style="muted"),
-                description,
+                Text(format_record_id(record), style="muted"),
+                record.description,
             )
 
-        num_slowest_displayed = min(
-            len(self.all_tests_in_session), self.num_tests_to_show
-        )
         panel = Panel(
             Group(
                 Padding(
@@ -254,7 +265,7 @@ class TestTimingStatsPanel:
                 ),
                 grid,
             ),
-            title=f"[b white]{num_slowest_displayed} Slowest Tests[/b white]",
+            title=f"[b white]{len(slowest_tests)} Slowest Tests[/b white]",
             style="none",
             border_style="rule.line",
         )
@@ -262,12 +273,88 @@ class TestTimingStatsPanel:
         yield panel
 
 
+# The number of the most memory-hungry tests whose top allocation sites are shown.
+_NUM_TESTS_WITH_ALLOCATION_SITES = 3
+
+
+@dataclass
+class MemoryUsagePanel:
+    hungriest_tests: List[ResultRecord]
+    num_tests_to_show: int
+
+    def __rich_console__(self, c: Console, co: ConsoleOptions) -> RenderResult:
+        grid = Table.grid(padding=(0, 2, 0, 0))
+        grid.add_column(justify="right")  # Peak
+        grid.add_column(justify="right")  # Retained
+        grid.add_column(justify="right")  # RSS delta
+        grid.add_column()  # Test ID
+        grid.add_column()  # Test description
+        grid.add_row(
+            Text("Peak", style="muted"),
+            Text("Retained", style="muted"),
+            Text("RSS Δ", style="muted"),
+            "",
+            "",
+        )
+
+        hungriest_tests = self.hungriest_tests[: self.num_tests_to_show]
+        for record in hungriest_tests:
+            assert record.memory is not None, "test must've been profiled"
+            memory = record.memory
+            grid.add_row(
+                f"[b]{format_bytes(memory.peak)}[/b]",
+                format_bytes(memory.retained),
+                "-" if memory.rss_delta is None else format_bytes(memory.rss_delta),
+                Text(format_record_id(record), style="muted"),
+                record.description,
+            )
+
+        sites = Table.grid(padding=(0, 2, 0, 0))
+        sites.add_column(justify="right")  # Bytes retained
+        sites.add_column()  # Location
+        for record in hungriest_tests[:_NUM_TESTS_WITH_ALLOCATION_SITES]:
+            assert record.memory is not None, "test must've been profiled"
+            if not record.memory.top_allocations:
+                continue
+            sites.add_row("", Text(format_record_id(record), style="muted"))
+            for location, size in record.memory.top_allocations:
+                sites.add_row(
+                    f"[b]{format_bytes(size)}[/b]", _relative_location(location)
+                )
+
+        renderables: List[RenderableType] = [grid]
+        if sites.row_count:
+            renderables.append(
+                Padding(
+                    Group("Top allocation sites of retained memory:", sites),
+                    pad=(1, 0, 0, 0),
+                )
+            )
+        panel = Panel(
+            Group(*renderables),
+            title=f"[b white]{len(hungriest_tests)} Most Memory-Hungry Tests[/b white]",
+            style="none",
+            border_style="rule.line",
+        )
+
+        yield panel
+
+
+def _relative_location(location: str) -> str:
+    """Make the path of a "path:line" location relative to the working directory if it's below it."""
+    try:
+        return str(Path(location).relative_to(Path.cwd()))
+    except ValueError:
+        return location
+
+
 @dataclass
 class SessionPrelude:
     time_to_collect_secs: float
     num_tests_collected: int
     num_fixtures_collected: int
     config_path: Optional[Path]
+    num_tests_is_lower_bound: bool = False
     python_impl: str = field(default=platform.python_implementation())
     python_version: str = field(default=platform.python_version())
     ward_version: str = field(default=__version__)
@@ -289,8 +376,9 @@ class SessionPrelude:
         test_plural = "test" if self.num_tests_collected == 1 else "tests"
         fixture_plural = "fixture" if self.num_fixtures_collected == 1 else "fixtures"
 
+        at_least = "at least " if self.num_tests_is_lower_bound else ""
         yield (
-            f"Found [b]{self.num_tests_collected}[/b] {test_plural} "
+            f"Found {at_least}[b]{self.num_tests_collected}[/b] {test_plural} "
             f"and [b]{self.num_fixtures_collected}[/b] {fixture_plural} "
             f"in [b]{self.time_to_collect_secs:.2f}[/b] seconds."
         )
@@ -328,7 +416,7 @@ class TestResultDisplayWidget:
         self.num_tests = num_tests
         self.progress_styles = progress_styles
 
-    def footer(self, test_results: List[TestResult]) -> Optional[RenderableType]:
+    def footer(self, test_results: ResultStore) -> Optional[RenderableType]:
         """
         This method should return an object that can be rendered by Rich.
         It will be inserted into the "footer" of the test suite result display,
@@ -356,11 +444,11 @@ class TestResultDisplayWidget:
         """
         pass
 
-    def after_suite(self, test_results: List[TestResult]) -> None:
+    def after_suite(self, test_results: ResultStore) -> None:
         """
         This method is called after the suite is done executing
         (or is cancelled, or aborts mid-run, etc.),
-        with results for all of the tests that have been run.
+        with the store of results for all of the tests that have been run.
 
         Some ways you can use this method:
          - Change the return value of your footer to None to prevent it
@@ -389,7 +477,7 @@ class DotsDisplayWidget(TestResultDisplayWidget, abc.ABC):
         self.dots_on_line = 0
         self.footer_text = self.get_blank_footer_text()
 
-    def footer(self, test_results: List[TestResult]) -> Optional[RenderableType]:
+    def footer(self, test_results: ResultStore) -> Optional[RenderableType]:
         return self.footer_text
 
     def get_blank_footer_text(self) -> Text:
@@ -422,7 +510,7 @@ class DotsDisplayWidget(TestResultDisplayWidget, abc.ABC):
         else:
             return Text("\n")
 
-    def after_suite(self, test_results: List[TestResult]) -> None:
+    def after_suite(self, test_results: ResultStore) -> None:
         self.end_of_line(test_index=len(test_results) - 1)
 
 
@@ -512,13 +600,13 @@ class LiveTestBar(TestResultDisplayWidget):
 
         self.task = self.progress.add_task("", total=num_tests)
 
-    def footer(self, test_results: List[TestResult]) -> Optional[RenderableType]:
+    def footer(self, test_results: ResultStore) -> Optional[RenderableType]:
         # Ignore type checkers due to typing problem in `rich`:
         # `Progress` class signature is not `RichCast` protocol compatible
         return self.progress
 
     def after_test(self, test_index: int, test_result: TestResult) -> None:
-        self.progress.update(self.task, advance=1)
+        self.progress.update(self.task, advance=1, total=self.num_tests)
         self.test_description_column.renderable = get_test_result_line(
             test_result=test_result,
             test_index=test_index,
@@ -565,14 +653,14 @@ class SuiteProgressBar(TestResultDisplayWidget):
 
         self.task = self.progress.add_task("Testing...", total=num_tests)
 
-    def footer(self, test_results: List[TestResult]) -> Optional[RenderableType]:
+    def footer(self, test_results: ResultStore) -> Optional[RenderableType]:
         # Ignore type checkers due to typing problem in `rich`:
         # `Progress` class signature is not `RichCast` protocol compatible
         return self.progress
 
     def after_test(self, test_index: int, test_result: TestResult) -> None:
         assert self.progress is not None, "progress must not be None"
-        self.progress.update(self.task, advance=1)
+        self.progress.update(self.task, advance=1, total=self.num_tests)
 
         if test_result.outcome.will_fail_session:
             self.spinner_column.finished_text = RED_X
@@ -580,7 +668,7 @@ class SuiteProgressBar(TestResultDisplayWidget):
             self.bar_column.complete_style = "fail.textonly"
             self.bar_column.finished_style = "fail.textonly"
 
-    def after_suite(self, test_results: List[TestResult]) -> None:
+    def after_suite(self, test_results: ResultStore) -> None:
         self.progress = None
 
 
@@ -591,18 +679,20 @@ class TerminalResultsWriter:
         num_tests: int,
         progress_styles: List[TestProgressStyle],
         widget_types: Iterable[Type[TestResultDisplayWidget]],
+        store: ResultStore,
     ):
         self.console = console
+        self.store = store
         self.widgets = [
             widgets(num_tests=num_tests, progress_styles=progress_styles)
             for widgets in widget_types
         ]
         self.live = Live(
             console=console,
-            renderable=self.footer(results=[]),
+            renderable=self.footer(results=store),
         )
 
-    def footer(self, results: List[TestResult]) -> RenderableType:
+    def footer(self, results: ResultStore) -> RenderableType:
         table = Table.grid()
         table.add_column()
         footers = (
@@ -619,13 +709,13 @@ class TerminalResultsWriter:
         self,
         test_results: Iterator[TestResult],
         fail_limit: Optional[int],
-    ) -> Tuple[List[TestResult], bool]:
+    ) -> Tuple[ResultStore, bool]:
         """
-        Execute the test suite, returning the list of test results
+        Execute the test suite, adding each result to the store, and return the store
         and a boolean that is true if the run was cancelled and false otherwise.
         """
         num_failures = 0
-        results: List[TestResult] = []
+        results = self.store
         was_cancelled = False
 
         self.console.print()
@@ -637,13 +727,16 @@ class TerminalResultsWriter:
                     live.start(refresh=True)
 
                     for component in self.widgets:
+                        # The number of tests is a lower bound if some tests are
+                        # parameterised with iterables of unknown length.
+                        component.num_tests = max(component.num_tests, idx + 1)
                         component.after_test(idx, result)
 
-                    live.update(self.footer(results))
+                    results.add(result)
 
-                    results.append(result)
+                    live.update(self.footer(results))
 
-                    if result.outcome is TestOutcome.FAIL:
+                    if result.outcome in (TestOutcome.FAIL, TestOutcome.TIMEOUT):
                         num_failures += 1
 
                     if num_failures == fail_limit:
@@ -651,6 +744,12 @@ class TerminalResultsWriter:
             except KeyboardInterrupt:
                 was_cancelled = True
             finally:
+                # Close the generator explicitly so that anything running
+                # the tests (e.g. worker processes) is shut down immediately.
+                close = getattr(test_results, "close", None)
+                if close is not None:
+                    close()
+
                 for component in self.widgets:
                     component.after_suite(results)
 
@@ -689,9 +788,17 @@ class TestResultWriterBase:
         self,
         test_results_gen: Generator[TestResult, None, None],
         fail_limit: Optional[int] = None,
-    ) -> List[TestResult]:
+        store: Optional[ResultStore] = None,
+    ) -> ResultStore:
+        """
+        Run the tests, displaying their results as they arrive and then the details of
+        each failure. Returns the store the results were added to, which is a store
+        in a temporary file if one isn't given.
+        """
+        if store is None:
+            store = ResultStore.open()
         if not self.suite.num_tests:
-            return []
+            return store
 
         widget_types = [self.runtime_output_strategies[self.test_output_style]]
         if TestProgressStyle.BAR in self.progress_styles:
@@ -702,6 +809,7 @@ class TestResultWriterBase:
             num_tests=self.suite.num_tests_with_parameterisation,
             progress_styles=self.progress_styles,
             widget_types=widget_types,
+            store=store,
         ).run(test_results_gen, fail_limit)
 
         if was_cancelled:
@@ -710,7 +818,7 @@ class TestResultWriterBase:
                 style="info",
             )
 
-        failed_test_results = [r for r in all_results if r.outcome == TestOutcome.FAIL]
+        failed_test_results = all_results.failures
         for failure in failed_test_results:
             self.output_why_test_failed_header(failure)
             self.output_test_failed_location(failure)
@@ -735,7 +843,11 @@ class TestResultWriterBase:
         raise NotImplementedError()
 
     def output_test_result_summary(
-        self, test_results: List[TestResult], time_taken: float, duration: int
+        self,
+        test_results: ResultStore,
+        time_taken: float,
+        duration: int,
+        profile_memory: int = 0,
     ):
         raise NotImplementedError()
 
@@ -786,16 +898,27 @@ class TestResultWriter(TestResultWriterBase):
         )
 
     def output_why_test_failed(self, test_result: TestResult):
-        err = test_result.error
-        if isinstance(err, TestAssertionFailure):
-            if err.operator in Comparison:
-                self.console.print(self.get_source(err, test_result))
-                self.console.print(self.get_pretty_comparison_failure(err))
+        failure = test_result.failure
+        if failure is None:
+            return
+        if failure.operator is not None:
+            self.console.print(self.get_source(failure, test_result))
+            self.console.print(self.get_pretty_comparison_failure(failure))
         else:
-            self.print_traceback(err)
+            self.print_traceback(failure)
+        if test_result.outcome is TestOutcome.TIMEOUT and test_result.message:
+            self.output_stacks_at_timeout(test_result.message)
+
+    def output_stacks_at_timeout(self, stacks: str):
+        self.console.print(
+            Padding(Text("Stacks when the test timed out"), pad=(0, 0, 1, 2))
+        )
+        for line in stacks.rstrip("\n").split("\n"):
+            self.console.print(Padding(line, pad=(0, 0, 0, 4)), markup=False)
+        self.console.print()
 
     def get_source(
-        self, err: TestAssertionFailure, test_result: TestResult
+        self, failure: FailureRecord, test_result: TestResult
     ) -> RenderableType:
         src_lines, line_num = inspect.getsourcelines(test_result.test.fn)
         src = Syntax(
@@ -803,19 +926,17 @@ class TestResultWriter(TestResultWriterBase):
             "python",
             start_line=line_num,
             line_numbers=True,
-            highlight_lines={err.error_line},
+            highlight_lines={failure.error_line} if failure.error_line else set(),
             background_color="default",
             theme="ansi_dark",
         )
 
         return Padding(src, (1, 0, 1, 4))
 
-    def get_pretty_comparison_failure(
-        self, err: TestAssertionFailure
-    ) -> RenderableType:
-        diff = self.get_diff(err)
+    def get_pretty_comparison_failure(self, failure: FailureRecord) -> RenderableType:
+        diff = self.get_diff(failure)
         parts = [
-            self.get_operands(err) if not diff else None,
+            self.get_operands(failure) if not diff else None,
             diff,
         ]
         return Padding(
@@ -823,8 +944,10 @@ class TestResultWriter(TestResultWriterBase):
             pad=(0, 0, 1, 2),
         )
 
-    def get_operands(self, err: TestAssertionFailure) -> Optional[RenderableType]:
-        if err.operator in EQUALITY_COMPARISONS | INEQUALITY_COMPARISONS:
+    def get_operands(self, failure: FailureRecord) -> Optional[RenderableType]:
+        lhs, rhs = failure.lhs, failure.rhs
+        assert lhs is not None and rhs is not None
+        if failure.operator in EQUALITY_COMPARISONS | INEQUALITY_COMPARISONS:
             description = {
                 Comparison.Equals: "not equal to",
                 Comparison.NotEquals: "equal to",
@@ -832,68 +955,68 @@ class TestResultWriter(TestResultWriterBase):
                 Comparison.LessThanEqualTo: "not less than or equal to",
                 Comparison.GreaterThan: "not greater than",
                 Comparison.GreaterThanEqualTo: "not greater than or equal to",
-            }[err.operator]
+            }[failure.operator]
 
             lhs_msg = Text.assemble(
                 ("The ", "default"),
                 ("LHS ", "pass.textonly"),
-                *self.of_type(err.lhs),
+                *self.of_type(lhs.type_name),
             )
             rhs_msg = Text.assemble(
                 (f"was {description} ", "bold default"),
                 ("the ", "default"),
                 ("RHS ", "fail.textonly"),
-                *self.of_type(err.rhs),
+                *self.of_type(rhs.type_name),
             )
-        elif err.operator in IN_COMPARISONS:
+        elif failure.operator in IN_COMPARISONS:
             lhs_msg = Text.assemble(
                 ("The ", "default"),
                 ("item ", "pass.textonly"),
-                *self.of_type(err.lhs),
+                *self.of_type(lhs.type_name),
             )
             rhs_msg = Text.assemble(
                 (
-                    "was not " if err.operator is Comparison.In else "was ",
+                    "was not " if failure.operator is Comparison.In else "was ",
                     "bold default",
                 ),
                 ("found in the ", "default"),
                 ("container ", "fail.textonly"),
-                *self.of_type(err.rhs),
+                *self.of_type(rhs.type_name),
             )
-        elif err.operator in IS_COMPARISONS:
+        elif failure.operator in IS_COMPARISONS:
             lhs_msg = Text.assemble(
                 ("The ", "default"),
                 ("LHS ", "pass.textonly"),
-                *self.of_type(err.lhs),
+                *self.of_type(lhs.type_name),
                 (" with ", "default"),
                 ("id ", "default"),
-                (f"{id(err.lhs)}", "bold default"),
+                (f"{lhs.id}", "bold default"),
             )
             rhs_msg = Text.assemble(
                 (
-                    "was not " if err.operator is Comparison.Is else "was ",
+                    "was not " if failure.operator is Comparison.Is else "was ",
                     "bold default",
                 ),
                 ("the ", "default"),
                 ("RHS ", "fail.textonly"),
-                *self.of_type(err.rhs),
+                *self.of_type(rhs.type_name),
                 (" with ", "default"),
                 ("id ", "default"),
-                (f"{id(err.rhs)}", "bold default"),
+                (f"{rhs.id}", "bold default"),
             )
         else:  # pragma: unreachable
-            raise Exception(f"Unknown operator: {err.operator!r}")
+            raise Exception(f"Unknown operator: {failure.operator!r}")
 
-        lhs = Panel(
-            Pretty(err.lhs),
+        lhs_panel = Panel(
+            repr_highlighter(lhs.pretty),
             title=lhs_msg,
             title_align="left",
             border_style="pass.textonly",
             padding=1,
             expand=True,
         )
-        rhs = Panel(
-            Pretty(err.rhs),
+        rhs_panel = Panel(
+            repr_highlighter(rhs.pretty),
             title=rhs_msg,
             title_align="left",
             border_style="fail.textonly",
@@ -902,21 +1025,22 @@ class TestResultWriter(TestResultWriterBase):
         )
 
         return Columns(
-            [lhs, rhs],
+            [lhs_panel, rhs_panel],
             expand=True,
             padding=0,
         )
 
-    def of_type(self, obj: object) -> Iterator[Tuple[str, str]]:
+    def of_type(self, type_name: str) -> Iterator[Tuple[str, str]]:
         yield "(of type ", "default"
-        yield type(obj).__name__, "bold default"
+        yield type_name, "bold default"
         yield ")", "default"
 
-    def _get_diff(self, err: TestAssertionFailure) -> Optional[Diff]:
-        if err.operator in EQUALITY_COMPARISONS:
+    def _get_diff(self, failure: FailureRecord) -> Optional[Diff]:
+        if failure.operator in EQUALITY_COMPARISONS:
+            assert failure.lhs is not None and failure.rhs is not None
             diff = Diff(
-                err.lhs,
-                err.rhs,
+                failure.lhs.diff_text,
+                failure.rhs.diff_text,
                 width=self.terminal_size.width - 24,
                 show_symbols=self.show_diff_symbols,
             )
@@ -924,8 +1048,8 @@ class TestResultWriter(TestResultWriterBase):
                 return diff
         return None
 
-    def get_diff(self, err: TestAssertionFailure) -> Optional[RenderableType]:
-        diff = self._get_diff(err)
+    def get_diff(self, failure: FailureRecord) -> Optional[RenderableType]:
+        diff = self._get_diff(failure)
 
         if diff is not None:
             return Panel(
@@ -945,22 +1069,30 @@ class TestResultWriter(TestResultWriterBase):
         else:
             return None
 
-    def print_traceback(self, err):
-        trace = getattr(err, "__traceback__", "")
-        if trace:
-            # The first frame contains library internal code which is not
-            # relevant to end users, so skip over it.
-            trace = trace.tb_next
-            tb = Traceback.from_exception(err.__class__, err, trace, show_locals=True)
+    def print_traceback(self, failure: FailureRecord):
+        if failure.trace:
+            tb = Traceback(failure.trace, show_locals=True)
             self.console.print(Padding(tb, pad=(0, 2, 1, 2)))
         else:
-            self.console.print(str(err))
+            self.console.print(failure.message)
 
     def output_test_result_summary(
-        self, test_results: List[TestResult], time_taken: float, show_slowest: int
+        self,
+        test_results: ResultStore,
+        time_taken: float,
+        show_slowest: int,
+        profile_memory: int = 0,
     ):
-        if show_slowest:
-            self.console.print(TestTimingStatsPanel(test_results, show_slowest))
+        if show_slowest and test_results.durations:
+            self.console.print(
+                TestTimingStatsPanel(
+                    test_results.slowest, test_results.durations, show_slowest
+                )
+            )
+        if profile_memory and test_results.memory_hungriest:
+            self.console.print(
+                MemoryUsagePanel(test_results.memory_hungriest, profile_memory)
+            )
 
         result_table = Table.grid()
         result_table.add_column(justify="right")
@@ -1014,6 +1146,7 @@ class TestResultWriter(TestResultWriterBase):
             self.console.print(Padding(Text("Captured stderr"), pad=(0, 0, 1, 2)))
             for line in captured_stderr_lines:
                 self.console.print(Padding(line, pad=(0, 0, 0, 4)))
+            self.output_full_capture_path(test_result.captured_stderr_path)
             self.console.print()
 
     def output_captured_stdout(self, test_result: TestResult):
@@ -1022,18 +1155,29 @@ class TestResultWriter(TestResultWriterBase):
             self.console.print(Padding(Text("Captured stdout"), pad=(0, 0, 1, 2)))
             for line in captured_stdout_lines:
                 self.console.print(Padding(line, pad=(0, 0, 0, 4)))
+            self.output_full_capture_path(test_result.captured_stdout_path)
             self.console.print()
 
+    def output_full_capture_path(self, path: Optional[str]):
+        if path:
+            self.console.print(
+                Padding(
+                    Text.assemble(("Full output written to ", "dim"), path),
+                    pad=(1, 0, 0, 4),
+                )
+            )
+
     def output_test_failed_location(self, test_result: TestResult):
         assert_msg = Text("")
-        if isinstance(test_result.error, TestAssertionFailure):
-            if test_result.error.assert_msg:
-                assert_msg = Text.assemble((" - ", "dim"), test_result.error.assert_msg)
+        failure = test_result.failure
+        if failure is not None and failure.operator is not None:
+            if failure.assert_msg:
+                assert_msg = Text.assemble((" - ", "dim"), failure.assert_msg)
             else:
                 assert_msg = Text("")
             output_str = (
                 f"Failed at {os.path.relpath(test_result.test.path, Path.cwd())}:"
-                f"{test_result.error.error_line}"
+                f"{failure.error_line}"
             )
         else:
             # This is what we'd expect to see if the test failed for something like
@@ -1051,28 +1195,19 @@ class TestResultWriter(TestResultWriterBase):
             )
         )
 
-    def _get_outcome_counts(
-        self, test_results: List[TestResult]
-    ) -> Dict[TestOutcome, int]:
+    def _get_outcome_counts(self, test_results: ResultStore) -> Dict[TestOutcome, int]:
+        counts = test_results.outcome_counts
         return {
-            TestOutcome.PASS: len(
-                [r for r in test_results if r.outcome == TestOutcome.PASS]
-            ),
-            TestOutcome.FAIL: len(
-                [r for r in test_results if r.outcome == TestOutcome.FAIL]
-            ),
-            TestOutcome.SKIP: len(
-                [r for r in test_results if r.outcome == TestOutcome.SKIP]
-            ),
-            TestOutcome.XFAIL: len(
-                [r for r in test_results if r.outcome == TestOutcome.XFAIL]
-            ),
-            TestOutcome.XPASS: len(
-                [r for r in test_results if r.outcome == TestOutcome.XPASS]
-            ),
-            TestOutcome.DRYRUN: len(
-                [r for r in test_results if r.outcome == TestOutcome.DRYRUN]
-            ),
+            outcome: counts.get(outcome, 0)
+            for outcome in (
+                TestOutcome.PASS,
+                TestOutcome.FAIL,
+                TestOutcome.TIMEOUT,
+                TestOutcome.SKIP,
+                TestOutcome.XFAIL,
+                TestOutcome.XPASS,
+                TestOutcome.DRYRUN,
+            )
         }
 
 
@@ -1084,6 +1219,7 @@ def outcome_to_style(outcome: TestOutcome) -> str:
         TestOutcome.XFAIL: "xfail",
         TestOutcome.XPASS: "xpass",
         TestOutcome.DRYRUN: "dryrun",
+        TestOutcome.TIMEOUT: "timeout",
     }[outcome]
 
 
@@ -1130,7 +1266,7 @@ def output_fixtures(
 
 def make_fixture_information_tree(
     fixture: Fixture,
-    used_by_tests: Collection[Test],
+    used_by_tests: Collection[Union[Test, ParameterisedInstance]],
     fixtures_to_children: FixtureHierarchyMapping,
     fixtures_to_parents: FixtureHierarchyMapping,
     show_scopes: bool,
@@ -1209,7 +1345,9 @@ def add_fixture_dependencies_to_tree(
         )
 
 
-def add_fixture_usages_by_tests_to_tree(node: Tree, used_by: Iterable[Test]) -> None:
+def add_fixture_usages_by_tests_to_tree(
+    node: Tree, used_by: Iterable[Union[Test, ParameterisedInstance]]
+) -> None:
     grouped_used_by = group_by(used_by, key=lambda t: t.description)
     for description, tests in grouped_used_by.items():
         test = tests[0]
@@ -1231,12 +1369,19 @@ def make_text_for_fixture(fixture: Fixture, show_scope: bool) -> Text:
     return text
 
 
-def get_exit_code(results: Iterable[TestResult]) -> ExitCode:
-    if not results:
+def get_exit_code(results: Union[ResultStore, Iterable[TestResult]]) -> ExitCode:
+    if isinstance(results, ResultStore):
+        outcome_counts = results.outcome_counts
+    else:
+        outcome_counts = collections.Counter(r.outcome for r in results)
+
+    if not sum(outcome_counts.values()):
         return ExitCode.NO_TESTS_FOUND
 
     if any(
-        r.outcome == TestOutcome.FAIL or r.outcome == TestOutcome.XPASS for r in results
+        outcome_counts.get(outcome)
+        for outcome in TestOutcome
+        if outcome.will_fail_session
     ):
         exit_code = ExitCode.FAILED
     else:
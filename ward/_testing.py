@@ -1,9 +1,12 @@
+import itertools
 import uuid
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from timeit import default_timer
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sized, Tuple, Union
+
+from ward._errors import ParameterisationError
 
 # Tests declared with the name _, and with the @test decorator
 # have to be stored in here, so that they can later be retrieved.
@@ -16,7 +19,18 @@ COLLECTED_TESTS: Dict[Path, List[Callable]] = defaultdict(list)
 
 @dataclass
 class Each:
-    args: Tuple[Any]
+    """
+    The values a test is parameterised with. Either a tuple of values, or an iterable
+    of unknown length (e.g. a generator), whose values are taken from it lazily.
+    """
+
+    args: Union[Tuple[Any, ...], Iterable[Any]]
+    _consumed: bool = field(default=False, repr=False, compare=False)
+
+    @property
+    def is_sized(self) -> bool:
+        """True if the number of values is known without iterating over them."""
+        return isinstance(self.args, Sized)
 
     def __getitem__(self, args):
         return self.args[args]
@@ -24,11 +38,31 @@ class Each:
     def __len__(self):
         return len(self.args)
 
+    def __iter__(self) -> Iterator[Any]:
+        iterator = iter(self.args)
+        if iterator is self.args:
+            # The values of an iterator (such as a generator) can only be read once.
+            if self._consumed:
+                raise ParameterisationError(
+                    "The values passed to 'each' have already been used up. "
+                    "Pass an iterable that can be iterated over again, "
+                    "such as a list, to parameterise a test more than once."
+                )
+            self._consumed = True
+        return iterator
+
 
 def _generate_id():
     return uuid.uuid4().hex
 
 
+_instance_ids = itertools.count()
+
+
+def _generate_instance_id() -> int:
+    return next(_instance_ids)
+
+
 class _FormatDict(dict):
     def __missing__(self, key):
         return "{" + key + "}"
@@ -39,6 +73,8 @@ def is_test_module_name(module_name: str) -> bool:
 
 
 class _Timer:
+    __slots__ = ("_start_time", "duration")
+
     def __init__(self, duration: float = 0.0):
         self._start_time = None
         self.duration = duration
@@ -0,0 +1,155 @@
+import asyncio
+import faulthandler
+import io
+import signal
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Awaitable, Iterator, List, Optional, TypeVar
+
+from ward._errors import TestTimeout
+
+try:
+    import ctypes
+
+    _HAS_CTYPES = True
+except ImportError:  # pragma: no cover
+    _HAS_CTYPES = False
+
+_T = TypeVar("_T")
+
+
+def format_stacks() -> str:
+    """
+    Return the stack of every thread in the process, as `faulthandler` would print it.
+    """
+    # faulthandler writes straight to a file descriptor, so it needs a real file.
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as file:
+        faulthandler.dump_traceback(file, all_threads=True)
+        file.seek(0)
+        return file.read()
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Raise `TestTimeout` in the current thread if the block is still running after
+    `seconds` (unless `seconds` is None).
+
+    In the main thread, the block is interrupted by SIGALRM, which also interrupts
+    blocking calls such as `time.sleep`. Any other thread (or a platform without
+    SIGALRM) is interrupted by a watchdog thread instead, which can only raise the
+    exception once the blocked thread runs Python code again.
+    """
+    if seconds is None:
+        yield
+        return
+
+    if hasattr(signal, "setitimer") and threading.current_thread() is (
+        threading.main_thread()
+    ):
+        limit = _alarm_limit
+    else:
+        limit = _watchdog_limit
+    with limit(seconds):
+        yield
+
+
+@contextmanager
+def _alarm_limit(seconds: float) -> Iterator[None]:
+    def on_alarm(signum: int, frame: Any) -> None:
+        raise TestTimeout(seconds, format_stacks())
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@contextmanager
+def _watchdog_limit(seconds: float) -> Iterator[None]:
+    if not _HAS_CTYPES:  # pragma: no cover
+        yield
+        return
+
+    thread_id = threading.get_ident()
+    lock = threading.Lock()
+    stacks: List[str] = []
+    running = True
+
+    def expire() -> None:
+        with lock:
+            if running:
+                stacks.append(format_stacks())
+                if not _raise_in_thread(thread_id, TestTimeout):
+                    stacks.clear()
+
+    watchdog = threading.Timer(seconds, expire)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        yield
+        with lock:
+            running = False
+        if stacks:
+            # The watchdog fired, but the block finished anyway: either just after,
+            # or because it caught the exception. Cancel the exception if it's still
+            # waiting to be raised, so it isn't raised outside of the block, and
+            # report the timeout from here instead.
+            _raise_in_thread(thread_id, None)
+            raise TestTimeout(seconds, "".join(stacks))
+    except TestTimeout as e:
+        # The exception was raised from its class, so fill in the details.
+        with lock:
+            e.seconds, e.stacks = seconds, "".join(stacks)
+        raise
+    finally:
+        with lock:
+            running = False
+        watchdog.cancel()
+
+
+def _raise_in_thread(thread_id: int, exc_type: Optional[type]) -> bool:
+    """
+    Raise `exc_type` in the thread with the given id as soon as it next runs Python
+    code, or if `exc_type` is None, cancel any exception waiting to be raised in it.
+    Returns False if there's no such thread.
+    """
+    # None is passed as NULL, which is what cancels a waiting exception.
+    exc = None if exc_type is None else ctypes.py_object(exc_type)
+    modified = ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), exc
+    )
+    return modified == 1
+
+
+async def cancel_after(awaitable: Awaitable[_T], seconds: Optional[float]) -> _T:
+    """
+    Await `awaitable` as a task, cancelling it and raising `TestTimeout` if it's
+    still running after `seconds` (unless `seconds` is None). The stacks carried by
+    the exception include the stack of the task, as well as those of the threads.
+    """
+    if seconds is None:
+        return await awaitable
+
+    task = asyncio.ensure_future(awaitable)
+    try:
+        await asyncio.wait({task}, timeout=seconds)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if task.done():
+        return task.result()
+
+    task_stack = io.StringIO()
+    task.print_stack(file=task_stack)
+    stacks = f"{format_stacks()}\n{task_stack.getvalue()}"
+    task.cancel()
+    await asyncio.wait({task})
+    if not task.cancelled():
+        # Retrieve the exception (if any) so that it isn't logged as unhandled.
+        task.exception()
+    raise TestTimeout(seconds, stacks)
@@ -4,6 +4,9 @@ from typing import Any, Dict, Optional, Tuple
 
 from cucumber_tag_expressions.model import Expression
 
+from ward._capture import DEFAULT_MEMORY_LIMIT
+from ward._suite import DEFAULT_ASYNC_CONCURRENCY
+
 __all__ = ["Config"]
 
 
@@ -27,3 +30,19 @@ class Config:
     hook_module: Tuple[str]
     progress_style: Tuple[str]
     plugin_config: Dict[str, Dict[str, Any]]
+
+    # These default to the same values as their command line options.
+    static_discovery: bool = False
+    last_failed: bool = False
+    failed_first: bool = False
+    workers: int = 1
+    executor: str = "processes"
+    shard: Optional[Tuple[int, int]] = None
+    durations_file: Optional[Path] = None
+    record_impact: bool = False
+    affected_by: Optional[str] = None
+    impact_analysis: str = "footprints"
+    capture_memory_limit: int = DEFAULT_MEMORY_LIMIT // 1024
+    async_concurrency: int = DEFAULT_ASYNC_CONCURRENCY
+    timeout: Optional[float] = None
+    profile_memory: int = 0
@@ -1,7 +1,7 @@
 import inspect
+import reprlib
 import sys
 import types
-from dataclasses import dataclass
 from enum import Enum
 from types import FrameType
 from typing import Any, ContextManager, Generic, Optional, Type, TypeVar, cast
@@ -83,14 +83,118 @@ INEQUALITY_COMPARISONS = {
 }
 
 
-@dataclass
-class TestAssertionFailure(Exception):
-    message: str
-    lhs: Any
-    rhs: Any
-    error_line: int
-    operator: Comparison
-    assert_msg: str
+# Describes each kind of failed comparison, given bounded reprs of its operands.
+_FAILURE_DESCRIPTIONS = {
+    Comparison.Equals: "{lhs} does not equal {rhs}",
+    Comparison.NotEquals: "{lhs} does equal {rhs}",
+    Comparison.In: "{lhs} is not in {rhs}",
+    Comparison.NotIn: "{lhs} is in {rhs}",
+    Comparison.Is: "{lhs} is not {rhs}",
+    Comparison.IsNot: "{lhs} is {rhs}",
+    Comparison.LessThan: "{lhs} >= {rhs}",
+    Comparison.LessThanEqualTo: "{lhs} > {rhs}",
+    Comparison.GreaterThan: "{lhs} <= {rhs}",
+    Comparison.GreaterThanEqualTo: "{lhs} < {rhs}",
+}
+
+
+class _BoundedRepr(reprlib.Repr):
+    """
+    A `reprlib.Repr` that also avoids converting the whole of a large bytes
+    object to a string before truncating it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.maxstring = 80
+        self.maxother = 80
+
+    def repr_bytes(self, x: bytes, level: int) -> str:
+        if len(x) <= self.maxstring:
+            return repr(x)
+        return repr(x[: self.maxstring]) + "..."
+
+    repr_bytearray = repr_bytes
+
+
+_bounded_repr = _BoundedRepr()
+
+
+def _bounded_str(value: Any) -> str:
+    """
+    Convert an operand of a failed comparison to a string, as `str` would, without
+    formatting all of a large container or string.
+    """
+    uses_repr = getattr(type(value), "__str__") is object.__str__
+    if uses_repr or isinstance(value, (bytes, bytearray)):
+        # str is the same as repr for these (and for lists, dicts and so on).
+        return _bounded_repr.repr(value)
+    text = str(value)
+    if len(text) > _bounded_repr.maxother:
+        return text[: _bounded_repr.maxother - 3] + "..."
+    return text
+
+
+class TestAssertionFailure(AssertionError):
+    """
+    Raised when an assertion that was rewritten by ward fails.
+
+    Converting the operands of a comparison to strings can be slow for large
+    values, so unless a `message` is given, one is only built (from `lhs` and
+    `rhs`, converted to strings and truncated if they're long) when it's first needed.
+    """
+
+    def __init__(
+        self,
+        message: Optional[str],
+        lhs: Any,
+        rhs: Any,
+        error_line: int,
+        operator: Comparison,
+        assert_msg: str,
+    ):
+        super().__init__()
+        self._message = message
+        self.lhs = lhs
+        self.rhs = rhs
+        self.error_line = error_line
+        self.operator = operator
+        self.assert_msg = assert_msg
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = _FAILURE_DESCRIPTIONS[self.operator].format(
+                lhs=_bounded_str(self.lhs), rhs=_bounded_str(self.rhs)
+            )
+        return self._message
+
+    @message.setter
+    def message(self, message: str) -> None:
+        self._message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(operator={self.operator}, "
+            f"error_line={self.error_line}, assert_msg={self.assert_msg!r})"
+        )
+
+    def __reduce__(self):
+        # Exceptions are pickled using their positional ``args``, which aren't
+        # populated here, so pickle the constructor arguments instead. The message
+        # is still only built if it's needed.
+        args = (
+            self._message,
+            self.lhs,
+            self.rhs,
+            self.error_line,
+            self.operator,
+            self.assert_msg,
+        )
+        return type(self), args, self.__dict__
 
 
 def assert_equal(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
@@ -107,7 +211,7 @@ def assert_equal(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
     if lhs_val != rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} does not equal {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -131,7 +235,7 @@ def assert_not_equal(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
     if lhs_val == rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} does equal {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -155,7 +259,7 @@ def assert_in(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
     if lhs_val not in rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} is not in {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -180,7 +284,7 @@ def assert_not_in(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
     if lhs_val in rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} is in {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -204,7 +308,7 @@ def assert_is(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
     if lhs_val is not rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} is not {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -228,7 +332,7 @@ def assert_is_not(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
     if lhs_val is rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} is {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -252,7 +356,7 @@ def assert_less_than(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
     if lhs_val >= rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} >= {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -276,7 +380,7 @@ def assert_less_than_equal_to(lhs_val: Any, rhs_val: Any, assert_msg: str) -> No
     if lhs_val > rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} > {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -300,7 +404,7 @@ def assert_greater_than(lhs_val: Any, rhs_val: Any, assert_msg: str) -> None:
     if lhs_val <= rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} <= {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
@@ -324,7 +428,7 @@ def assert_greater_than_equal_to(lhs_val: Any, rhs_val: Any, assert_msg: str) ->
     if lhs_val < rhs_val:
         error_line_no = _prev_frame().f_lineno
         raise TestAssertionFailure(
-            f"{lhs_val} < {rhs_val}",
+            None,
             lhs=lhs_val,
             rhs=rhs_val,
             error_line=error_line_no,
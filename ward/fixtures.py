@@ -1,17 +1,100 @@
 import asyncio
 import inspect
-from contextlib import ExitStack, redirect_stderr, redirect_stdout, suppress
-from dataclasses import dataclass
+from contextlib import ExitStack, suppress
+from dataclasses import dataclass, field
 from functools import partial, wraps
-from io import StringIO
 from pathlib import Path
-from typing import Any, AsyncGenerator, Callable, Generator, List, Optional, Union, cast
-
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+from ward._capture import CaptureBuffer, capture_into, redirect_output
+from ward._event_loop import SessionEventLoop
 from ward.models import CollectionMetadata, Scope
 
 __all__ = ["fixture", "using", "Fixture", "TeardownResult"]
 
 
+@dataclass(frozen=True)
+class FixtureDefinition:
+    """
+    The information about a fixture function that never changes, worked out once
+    when the function is decorated with `@fixture` rather than every time a `Fixture`
+    is hashed, compared or looked up in the fixture cache.
+
+    Attributes:
+        name: The name of the fixture function.
+        module_name: The name of the module the fixture is defined in.
+        path: The pathlib.Path of the module the fixture is defined in.
+        line_number: The line number that the fixture is defined on.
+        scope: The scope of the fixture.
+        is_generator: True if the fixture is a generator function.
+        is_async_generator: True if the fixture is an async generator function.
+        is_coroutine: True if the fixture is defined with 'async def'.
+    """
+
+    name: str
+    module_name: str
+    path: Optional[Path]
+    line_number: int
+    scope: Scope
+    is_generator: bool
+    is_async_generator: bool
+    is_coroutine: bool
+    identity: Tuple[str, Optional[Path], int] = field(
+        init=False, repr=False, compare=False
+    )
+    identity_hash: int = field(init=False, repr=False, compare=False)
+    key: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # The definition is frozen, so these are set with object.__setattr__.
+        identity = (self.name, self.path, self.line_number)
+        object.__setattr__(self, "identity", identity)
+        object.__setattr__(self, "identity_hash", hash(identity))
+        object.__setattr__(self, "key", f"{self.path}::{self.name}")
+
+    @classmethod
+    def for_function(cls, fn: Callable) -> "FixtureDefinition":
+        meta = getattr(fn, "ward_meta", None)
+        unwrapped = inspect.unwrap(fn)
+        code = getattr(unwrapped, "__code__", None)
+        # co_firstlineno is the line of the first decorator, which is what
+        # inspect.getsourcelines reports, without having to read the source.
+        line_number = code.co_firstlineno if code else inspect.getsourcelines(fn)[1]
+        return cls(
+            name=fn.__name__,
+            module_name=fn.__module__,
+            path=getattr(meta, "path", None),
+            line_number=line_number,
+            scope=getattr(meta, "scope", Scope.Test),
+            is_generator=inspect.isgeneratorfunction(unwrapped),
+            is_async_generator=inspect.isasyncgenfunction(unwrapped),
+            is_coroutine=inspect.iscoroutinefunction(unwrapped),
+        )
+
+
+def get_fixture_definition(fn: Callable) -> FixtureDefinition:
+    """
+    Returns the definition of the fixture function `fn`, which is recorded by `@fixture`
+    when the fixture is defined, or worked out now for functions that weren't decorated.
+    """
+    meta = getattr(fn, "ward_meta", None)
+    definition = getattr(meta, "fixture_definition", None)
+    if definition is None:
+        definition = FixtureDefinition.for_function(fn)
+    return definition
+
+
 @dataclass
 class Fixture:
     """
@@ -21,55 +104,73 @@ class Fixture:
         fn: The Python function object corresponding to this fixture.
         gen: The generator, if applicable to this fixture.
         resolved_val: The value returned by calling the fixture function (fn).
+        footprint: The source lines executed while resolving the fixture, by file,
+            if they were recorded (see `ward._impact.FootprintRecorder`).
     """
 
     fn: Callable
     gen: Union[Generator, AsyncGenerator, None] = None
     resolved_val: Any = None
+    footprint: Optional[Dict[str, List[int]]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    _definition: Optional[FixtureDefinition] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __hash__(self):
-        return hash(self._id)
+        return self.definition.identity_hash
 
     def __eq__(self, other):
+        if not isinstance(other, Fixture):
+            return NotImplemented
         return self._id == other._id
 
     @property
-    def _id(self):
-        return self.__class__, self.name, self.path, self.line_number
+    def _id(self) -> Tuple:
+        return self.__class__, self.definition.identity
+
+    @property
+    def definition(self) -> FixtureDefinition:
+        """
+        The unchanging information about the fixture function, such as its name and scope.
+        """
+        if self._definition is None:
+            self._definition = get_fixture_definition(self.fn)
+        return self._definition
 
     @property
     def key(self) -> str:
         """
         A unique key used to identify fixture in the fixture cache. A string of the form '{path}::{name}'
         """
-        path = self.path
-        name = self.name
-        return f"{path}::{name}"
+        return self.definition.key
 
     @property
     def scope(self) -> Scope:
-        return getattr(self.fn, "ward_meta").scope
+        return self.definition.scope
 
     @property
     def name(self):
         """
         The name of the fixture function.
         """
-        return self.fn.__name__
+        return self.definition.name
 
     @property
     def path(self):
         """
         The pathlib.Path of the module the fixture is defined in.
         """
-        return self.fn.ward_meta.path
+        return self.definition.path
 
     @property
     def module_name(self):
         """
         The name of the module the fixture is defined in.
         """
-        return self.fn.__module__
+        return self.definition.module_name
 
     @property
     def qualified_name(self) -> str:
@@ -81,28 +182,28 @@ class Fixture:
         """
         The line number that the fixture is defined on.
         """
-        return inspect.getsourcelines(self.fn)[1]
+        return self.definition.line_number
 
     @property
     def is_generator_fixture(self):
         """
         True if the fixture is a generator function (and thus may contain teardown code).
         """
-        return inspect.isgeneratorfunction(inspect.unwrap(self.fn))
+        return self.definition.is_generator
 
     @property
     def is_async_generator_fixture(self):
         """
         True if this fixture is an async generator.
         """
-        return inspect.isasyncgenfunction(inspect.unwrap(self.fn))
+        return self.definition.is_async_generator
 
     @property
     def is_coroutine_fixture(self):
         """
         True if the fixture is defined with 'async def'.
         """
-        return inspect.iscoroutinefunction(inspect.unwrap(self.fn))
+        return self.definition.is_coroutine
 
     def deps(self):
         """
@@ -116,38 +217,71 @@ class Fixture:
         """
         return [Fixture(par.default) for par in self.deps().values()]
 
-    def teardown(self, capture_output: bool) -> "TeardownResult":
+    def teardown(
+        self, capture_output: bool, loop: Optional[SessionEventLoop] = None
+    ) -> "TeardownResult":
         """
-        Tears down the fixture by calling `next` or `__anext__()`.
+        Tears down the fixture by calling `next` or `__anext__()`. Async generator
+        fixtures are torn down on `loop`, which should be the loop they were set up on.
         """
         # Suppress because we can't know whether there's more code
         # to execute below the yield.
         teardown_result = TeardownResult(fixture=self)
-        captured_stdout = StringIO()
-        captured_stderr = StringIO()
+        captured_stdout = CaptureBuffer()
+        captured_stderr = CaptureBuffer()
 
         try:
             with ExitStack() as stack:
                 stack.enter_context(suppress(StopIteration, StopAsyncIteration))
                 if capture_output:
-                    stack.enter_context(redirect_stdout(captured_stdout))
-                    stack.enter_context(redirect_stderr(captured_stderr))
+                    stack.enter_context(
+                        redirect_output(captured_stdout, captured_stderr)
+                    )
 
                 if self.is_generator_fixture and self.gen:
                     next(cast(Generator, self.gen))
                 elif self.is_async_generator_fixture and self.gen:
                     awaitable = cast(AsyncGenerator, self.gen).__anext__()
-                    asyncio.run(awaitable)
+                    if loop is not None:
+                        loop.run(awaitable)
+                    else:
+                        asyncio.run(awaitable)
         except Exception as e:
             # Note that with StopIterations being suppressed, we have an issue
             # that if a StopIteration occurs in fixture teardown code, it will
             # not be recorded as an error in the fixture.
             teardown_result.captured_exception = e
 
-        captured_stdout.seek(0)
-        captured_stderr.seek(0)
-        teardown_result.sout = captured_stdout.read()
-        teardown_result.serr = captured_stderr.read()
+        teardown_result.sout = captured_stdout.getvalue()
+        teardown_result.serr = captured_stderr.getvalue()
+        captured_stdout.close()
+        captured_stderr.close()
+
+        return teardown_result
+
+    async def teardown_async(self, capture_output: bool) -> "TeardownResult":
+        """
+        Tears down an async generator fixture by awaiting `__anext__()`, for use by
+        a task running on the event loop the fixture was set up on. Output is
+        captured using `capture_into`, which only takes effect inside
+        `capture_per_context`.
+        """
+        teardown_result = TeardownResult(fixture=self)
+        captured_stdout = CaptureBuffer()
+        captured_stderr = CaptureBuffer()
+
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(suppress(StopAsyncIteration))
+                if capture_output:
+                    stack.enter_context(capture_into(captured_stdout, captured_stderr))
+                if self.gen:
+                    await cast(AsyncGenerator, self.gen).__anext__()
+        except Exception as e:
+            teardown_result.captured_exception = e
+
+        teardown_result.sout = captured_stdout.getvalue()
+        teardown_result.serr = captured_stderr.getvalue()
         captured_stdout.close()
         captured_stderr.close()
 
@@ -192,6 +326,7 @@ def fixture(func=None, *, scope: Union[Scope, str] = Scope.Test):
         func.ward_meta.path = path
     else:
         func.ward_meta = CollectionMetadata(is_fixture=True, scope=scope, path=path)
+    func.ward_meta.fixture_definition = FixtureDefinition.for_function(func)
 
     _DEFINED_FIXTURES.append(Fixture(func))
 
@@ -4,6 +4,7 @@ from typing import Iterable, List, Optional
 import pluggy
 from rich.console import ConsoleRenderable
 
+from ward._results import ResultStore
 from ward.config import Config
 from ward.models import ExitCode
 from ward.testing import Test, TestResult
@@ -57,6 +58,9 @@ class SessionHooks:
         """
         Hook that runs right before a test session ends (just before the result summary is printed to the terminal).
 
+        The results of every test are kept in memory for this hook, but only if it's implemented. If you don't need
+        the full ``TestResult`` of each test, implement ``after_session_records`` instead.
+
         This hook has no default implementation. If you implement it, you will not be
         overriding any existing functionality.
 
@@ -71,6 +75,30 @@ class SessionHooks:
         from this function, it will be rendered to the terminal.
         """
 
+    @spec
+    def after_session_records(
+        self,
+        config: Config,
+        test_results: ResultStore,
+        status_code: ExitCode,
+    ) -> Optional[ConsoleRenderable]:
+        """
+        Hook that runs right before a test session ends, immediately after ``after_session``.
+
+        ``test_results`` is the store the results of the session were written to as they arrived. Iterating over
+        it reads back a compact ``ResultRecord`` for each test (its outcome, description, location, duration and
+        a summary of any failure), and ``test_results.failures`` holds the ``TestResult`` of each failing test,
+        with the error it failed with recorded in its ``failure`` attribute rather than kept in ``error``.
+        Unlike ``after_session``, implementing this hook doesn't keep the result of every test in memory.
+
+        This hook has no default implementation. If you implement it, you will not be
+        overriding any existing functionality.
+
+        If you return a
+        `rich.console.ConsoleRenderable <https://rich.readthedocs.io/en/latest/protocol.html#console-render>`_
+        from this function, it will be rendered to the terminal.
+        """
+
     @spec
     def preprocess_tests(self, config: Config, collected_tests: List[Test]):
         """
@@ -2,10 +2,13 @@ from dataclasses import dataclass
 from enum import Enum
 from inspect import BoundArguments
 from pathlib import Path
-from typing import Callable, List, Optional, Union
+from typing import TYPE_CHECKING, Callable, List, Optional, Union
 
 from ward._errors import FixtureError
 
+if TYPE_CHECKING:
+    from ward.fixtures import FixtureDefinition
+
 __all__ = ["Scope", "SkipMarker", "XfailMarker", "ExitCode", "CollectionMetadata"]
 
 
@@ -76,6 +79,9 @@ class CollectionMetadata:
     scope: Scope = Scope.Test
     bound_args: Optional[BoundArguments] = None
     path: Optional[Path] = None
+    fixture_definition: Optional["FixtureDefinition"] = None
+    concurrent: bool = False
+    timeout: Optional[float] = None
 
 
 class ExitCode(Enum):
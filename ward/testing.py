@@ -1,13 +1,13 @@
-import asyncio
 import collections
+import collections.abc
 import functools
 import inspect
+import itertools
 import traceback
 from bdb import BdbQuit
-from contextlib import ExitStack, closing, redirect_stderr, redirect_stdout
+from contextlib import ExitStack, closing
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from io import StringIO
 from pathlib import Path
 from typing import (
     Any,
@@ -15,23 +15,38 @@ from typing import (
     Collection,
     Dict,
     Iterable,
+    Iterator,
     List,
     Mapping,
     Optional,
+    Tuple,
     Union,
+    cast,
 )
 
-from ward._errors import FixtureError, ParameterisationError
-from ward._fixtures import FixtureCache, ScopeKey, is_fixture
+from ward._capture import CaptureBuffer, capture_into, redirect_output
+from ward._errors import FixtureError, ParameterisationError, TestTimeout
+from ward._failures import FailureRecord, release_frames
+from ward._fixtures import (
+    FixtureCache,
+    ResolutionPlan,
+    ScopeKey,
+    get_default_args,
+    is_fixture,
+)
+from ward._memory import MemoryUsage
 from ward._testing import (
     COLLECTED_TESTS,
     Each,
     _FormatDict,
     _generate_id,
+    _generate_instance_id,
     _Timer,
     is_test_module_name,
 )
+from ward._timeout import cancel_after, time_limit
 from ward._utilities import get_absolute_path
+from ward.expect import TestAssertionFailure
 from ward.fixtures import Fixture
 from ward.models import CollectionMetadata, Marker, Scope, SkipMarker, XfailMarker
 
@@ -39,28 +54,43 @@ __all__ = [
     "test",
     "skip",
     "xfail",
+    "run_concurrently",
     "each",
     "Test",
+    "ParameterisedInstance",
     "TestOutcome",
     "TestResult",
     "ParamMeta",
 ]
 
+# Marks the end of the values of an iterable passed to `each`.
+_END_OF_VALUES = object()
+
 
 @dataclass
 class ParamMeta:
     instance_index: int = 0
-    group_size: int = 1
+    group_size: Optional[int] = 1
 
 
 def each(*args):
     """
     Used to parameterise tests.
 
+    If the only argument is an iterable without a length (such as a generator),
+    the test is parameterised with the values it produces, which are read lazily
+    as the instances of the test run.
+
     This will likely be deprecated before Ward 1.0.
 
     See documentation for examples.
     """
+    if (
+        len(args) == 1
+        and isinstance(args[0], collections.abc.Iterable)
+        and not isinstance(args[0], collections.abc.Sized)
+    ):
+        return Each(args[0])
     return Each(args)
 
 
@@ -135,116 +165,210 @@ def xfail(
     return wrapper
 
 
-@dataclass
-class Test:
+def run_concurrently(func: Callable) -> Callable:
     """
-    Representation of a test case.
+    Decorator used to mark an async test as safe to run concurrently with the other
+    async tests in its module that are also marked with it.
 
-    Attributes:
-        fn: The Python function object that contains the test code.
-        module_name: The name of the module the test is defined in.
-        id: A unique UUID4 used to identify the test.
-        marker: Attached by the skip and xfail decorators.
-        description: The description of the test. A format string that can contain basic Markdown syntax.
-        param_meta: If this is a parameterised test, contains info about the parameterisation.
-        capture_output: If True, output will be captured for this test.
-        sout: Buffer that fills with captured stdout as the test executes.
-        serr: Buffer that fills with captured stderr as the test executes.
-        ward_meta: Metadata that was attached to the raw functions collected by Ward's decorators.
-        timer: Timing information about the test.
-        tags: List of tags associated with the test.
+    Consecutive tests marked with this decorator run together on the session's
+    event loop, with at most ``--async-concurrency`` of them in progress at a time.
+    Each test's output is captured and timed separately.
+    Has no effect on tests that aren't defined with ``async def``.
+    """
+    if hasattr(func, "ward_meta"):
+        func.ward_meta.concurrent = True
+    else:
+        func.ward_meta = CollectionMetadata(concurrent=True)  # type: ignore[attr-defined]
+
+    return func
+
+
+class _BaseTest:
+    """
+    The behaviour shared by `Test` and `ParameterisedInstance`.
     """
 
+    # The state that's changed while a test runs. `Test` keeps its own copy of it
+    # in its `__dict__`; these slots are only used by `ParameterisedInstance`.
+    __slots__ = ("description", "timer", "_sout", "_serr")
+
     fn: Callable
     module_name: str
-    id: str = field(default_factory=_generate_id)
-    marker: Optional[Marker] = None
-    description: str = ""
-    param_meta: ParamMeta = field(default_factory=ParamMeta)
-    capture_output: bool = True
-    sout: StringIO = field(default_factory=StringIO)
-    serr: StringIO = field(default_factory=StringIO)
-    ward_meta: CollectionMetadata = field(default_factory=CollectionMetadata)
-    timer: Optional["_Timer"] = None
-    tags: List[str] = field(default_factory=list)
+    id: Union[str, int]
+    marker: Optional[Marker]
+    description: str
+    param_meta: ParamMeta
+    capture_output: bool
+    timer: Optional["_Timer"]
+    _sout: Optional[CaptureBuffer]
+    _serr: Optional[CaptureBuffer]
+    row: Optional[Tuple[Any, ...]] = None
 
-    def __hash__(self):
-        return hash((self.__class__, self.id))
+    @property
+    def resolution_plan(self) -> ResolutionPlan:
+        raise NotImplementedError()
 
-    def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.id == other.id
+    @property
+    def sout(self) -> CaptureBuffer:
+        """Buffer for captured stdout, created the first time it's needed."""
+        if self._sout is None:
+            self._sout = CaptureBuffer()
+        return self._sout
 
-    # FIXME:fix linter C901
-    def run(self, cache: FixtureCache, dry_run=False) -> "TestResult":  # noqa: C901
+    @sout.setter
+    def sout(self, buffer: CaptureBuffer) -> None:
+        self._sout = buffer
+
+    @property
+    def serr(self) -> CaptureBuffer:
+        """Buffer for captured stderr, created the first time it's needed."""
+        if self._serr is None:
+            self._serr = CaptureBuffer()
+        return self._serr
+
+    @serr.setter
+    def serr(self, buffer: CaptureBuffer) -> None:
+        self._serr = buffer
+
+    @property
+    def _as_test(self) -> "Union[Test, ParameterisedInstance]":
+        # Only `Test` and `ParameterisedInstance` derive from this class.
+        return cast("Union[Test, ParameterisedInstance]", self)
+
+    def run(
+        self,
+        cache: FixtureCache,
+        dry_run=False,
+        default_timeout: Optional[float] = None,
+    ) -> "TestResult":
+        """
+        Run the test, stopping it if it runs for longer than its timeout, which is
+        `default_timeout` unless one was passed to the `@test` decorator.
+        """
+        timeout = self.timeout if self.timeout is not None else default_timeout
         with ExitStack() as stack:
             self.timer = stack.enter_context(_Timer())
             if self.capture_output:
-                stack.enter_context(redirect_stdout(self.sout))
-                stack.enter_context(redirect_stderr(self.serr))
+                stack.enter_context(redirect_output(self.sout, self.serr))
 
-            if dry_run:
-                with closing(self.sout), closing(self.serr):
-                    result = TestResult(self, TestOutcome.DRYRUN)
-                return result
-
-            if isinstance(self.marker, SkipMarker) and self.marker.active:
-                with closing(self.sout), closing(self.serr):
-                    result = TestResult(self, TestOutcome.SKIP)
-                return result
+            skipped = self._result_without_running(dry_run)
+            if skipped is not None:
+                return skipped
 
             try:
                 resolved_args = self.resolver.resolve_args(cache)
                 self.format_description(resolved_args)
                 if self.is_async_test:
                     coro = self.fn(**resolved_args)
-                    asyncio.run(coro)
+                    cache.loop.run(cancel_after(coro, timeout))
                 else:
-                    self.fn(**resolved_args)
-            except FixtureError as e:
-                outcome = TestOutcome.FAIL
-                error: Optional[BaseException] = e
+                    with time_limit(timeout):
+                        self.fn(**resolved_args)
             except BdbQuit:
                 # We don't want to treat the user quitting the debugger
                 # as an exception, so we'll ignore BdbQuit. This will
                 # also prevent a large pdb-internal stack trace flooding
                 # the terminal.
                 pass
-            except (Exception, SystemExit) as e:
-                error = e
-                if isinstance(self.marker, XfailMarker) and self.marker.active:
-                    outcome = TestOutcome.XFAIL
-                else:
-                    outcome = TestOutcome.FAIL
+            except (Exception, SystemExit, TestTimeout) as e:
+                error: Optional[BaseException] = e
             else:
                 error = None
-                if isinstance(self.marker, XfailMarker) and self.marker.active:
-                    outcome = TestOutcome.XPASS
-                else:
-                    outcome = TestOutcome.PASS
 
-        with closing(self.sout), closing(self.serr):
-            if outcome in (TestOutcome.PASS, TestOutcome.SKIP):
-                result = TestResult(self, outcome)
+        return self._finish(error)
+
+    async def run_async(
+        self,
+        cache: FixtureCache,
+        dry_run=False,
+        default_timeout: Optional[float] = None,
+    ) -> "TestResult":
+        """
+        Run an async test as a task on the session's event loop, so that it can run
+        concurrently with other tests. Its output is captured (inside
+        `capture_per_context`) and it's timed separately from any other task.
+        """
+        timeout = self.timeout if self.timeout is not None else default_timeout
+        with ExitStack() as stack:
+            self.timer = stack.enter_context(_Timer())
+            if self.capture_output:
+                stack.enter_context(capture_into(self.sout, self.serr))
+
+            skipped = self._result_without_running(dry_run)
+            if skipped is not None:
+                return skipped
+
+            try:
+                resolved_args = await self.resolver.resolve_args_async(cache)
+                self.format_description(resolved_args)
+                await cancel_after(self.fn(**resolved_args), timeout)
+            except (Exception, SystemExit, TestTimeout) as e:
+                error: Optional[BaseException] = e
             else:
-                if isinstance(error, AssertionError):
-                    error.error_line = traceback.extract_tb(  # type: ignore[attr-defined]
-                        error.__traceback__, limit=-1
-                    )[
-                        0
-                    ].lineno
-                result = TestResult(
-                    self,
-                    outcome,
-                    error,
-                    captured_stdout=self.sout.getvalue(),
-                    captured_stderr=self.serr.getvalue(),
-                )
+                error = None
+
+        return self._finish(error)
+
+    def _result_without_running(self, dry_run: bool) -> Optional["TestResult"]:
+        """
+        Returns the result of the test if it shouldn't be run, because this is
+        a dry-run or the test is skipped. Otherwise, returns None.
+        """
+        if dry_run:
+            outcome = TestOutcome.DRYRUN
+        elif isinstance(self.marker, SkipMarker) and self.marker.active:
+            outcome = TestOutcome.SKIP
+        else:
+            return None
+        with closing(self.sout), closing(self.serr):
+            return TestResult(self._as_test, outcome)
+
+    def _finish(self, error: Optional[BaseException]) -> "TestResult":
+        """
+        Build the result of a test that ran, given the exception it raised (if any),
+        and close its capture buffers.
+        """
+        is_xfail = isinstance(self.marker, XfailMarker) and self.marker.active
+        if isinstance(error, FixtureError):
+            outcome = TestOutcome.FAIL
+        elif isinstance(error, TestTimeout):
+            outcome = TestOutcome.TIMEOUT
+        elif error is not None:
+            outcome = TestOutcome.XFAIL if is_xfail else TestOutcome.FAIL
+        else:
+            outcome = TestOutcome.XPASS if is_xfail else TestOutcome.PASS
 
-        return result
+        with closing(self.sout), closing(self.serr):
+            if outcome in (TestOutcome.PASS, TestOutcome.SKIP):
+                return TestResult(self._as_test, outcome)
+
+            if isinstance(error, AssertionError) and not isinstance(
+                error, TestAssertionFailure
+            ):
+                error.error_line = traceback.extract_tb(  # type: ignore[attr-defined]
+                    error.__traceback__, limit=-1
+                )[0].lineno
+            # The full output of a failing test is kept if it spilled to disk,
+            # so that it can be inspected after the session.
+            keep_full_output = outcome in (TestOutcome.FAIL, TestOutcome.TIMEOUT)
+            return TestResult(
+                self._as_test,
+                outcome,
+                error,
+                message=error.stacks if isinstance(error, TestTimeout) else "",
+                captured_stdout=self.sout.getvalue(),
+                captured_stderr=self.serr.getvalue(),
+                captured_stdout_path=(
+                    self.sout.persist() if keep_full_output else None
+                ),
+                captured_stderr_path=(
+                    self.serr.persist() if keep_full_output else None
+                ),
+            )
 
     def fail_with_error(self, error: Exception) -> "TestResult":
         return TestResult(
-            self, outcome=TestOutcome.FAIL, error=error, message=str(error)
+            self._as_test, outcome=TestOutcome.FAIL, error=error, message=str(error)
         )
 
     @property
@@ -268,13 +392,36 @@ class Test:
         """True if the test is defined with 'async def'."""
         return inspect.iscoroutinefunction(inspect.unwrap(self.fn))
 
+    @property
+    def timeout(self) -> Optional[float]:
+        """The timeout passed to the `@test` decorator, if any."""
+        meta = getattr(self.fn, "ward_meta", None)
+        return meta.timeout if meta else None
+
+    @property
+    def is_concurrent(self) -> bool:
+        """
+        True if the test is async and marked with `run_concurrently`, so it
+        can run concurrently with other such tests in its module.
+        """
+        meta = getattr(self.fn, "ward_meta", None)
+        return bool(meta and meta.concurrent) and self.is_async_test
+
     @property
     def line_number(self) -> int:
         """
         The line number the test is defined on. Corresponds to the line the first decorator wrapping the
             test appears on.
         """
-        return inspect.getsourcelines(self.fn)[1]
+        code = getattr(inspect.unwrap(self.fn), "__code__", None)
+        # co_firstlineno is the line of the first decorator, which is what
+        # inspect.getsourcelines reports, without having to read the source.
+        return code.co_firstlineno if code else inspect.getsourcelines(self.fn)[1]
+
+    @property
+    def source(self) -> str:
+        """The source code of the test, including its decorators."""
+        return inspect.getsource(self.fn)
 
     @property
     def has_deps(self) -> bool:
@@ -302,84 +449,286 @@ class Test:
         else:
             return Scope.Global
 
-    def get_parameterised_instances(self) -> List["Test"]:
+    def deps(self) -> Mapping[str, inspect.Parameter]:
+        return inspect.signature(self.fn).parameters
+
+    def format_description(self, args: Dict[str, Any]) -> str:
         """
-        If the test is parameterised, return a list of `Test` objects representing
-        each test generated as a result of the parameterisation.
+        Applies any necessary string formatting to the description,
+        given a dictionary `args` of values that will be injected
+        into the test.
+
+        This method will mutate the Test by updating the description.
+        Returns the newly updated description.
+        """
+
+        format_dict = _FormatDict(**args)
+        if not self.description:
+            self.description = ""
+
+        try:
+            self.description = self.description.format_map(format_dict)
+        except ValueError:
+            pass
+
+        return self.description
+
+
+@dataclass
+class Test(_BaseTest):
+    """
+    Representation of a test case.
+
+    Attributes:
+        fn: The Python function object that contains the test code.
+        module_name: The name of the module the test is defined in.
+        id: A unique UUID4 used to identify the test.
+        marker: Attached by the skip and xfail decorators.
+        description: The description of the test. A format string that can contain basic Markdown syntax.
+        param_meta: If this is a parameterised test, contains info about the parameterisation.
+        capture_output: If True, output will be captured for this test.
+        sout: Buffer that fills with captured stdout as the test executes, created the
+            first time it's needed. Output beyond the capture memory limit spills to a
+            temporary file.
+        serr: Buffer that fills with captured stderr as the test executes.
+        ward_meta: Metadata that was attached to the raw functions collected by Ward's decorators.
+        timer: Timing information about the test.
+        tags: List of tags associated with the test.
+    """
+
+    fn: Callable
+    module_name: str
+    id: str = field(default_factory=_generate_id)
+    marker: Optional[Marker] = None
+    description: str = ""
+    param_meta: ParamMeta = field(default_factory=ParamMeta)
+    capture_output: bool = True
+    ward_meta: CollectionMetadata = field(default_factory=CollectionMetadata)
+    timer: Optional["_Timer"] = None
+    tags: List[str] = field(default_factory=list)
+    _resolution_plan: Optional[ResolutionPlan] = field(default=None, repr=False)
+    _sout: Optional[CaptureBuffer] = field(default=None, init=False, repr=False)
+    _serr: Optional[CaptureBuffer] = field(default=None, init=False, repr=False)
+
+    def __hash__(self):
+        return hash((self.__class__, self.id))
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.id == other.id
+
+    @property
+    def resolution_plan(self) -> ResolutionPlan:
+        """
+        The plan for resolving the arguments of the test. It's built the first time
+        it's needed, and shared with each parameterised instance of the test.
+        """
+        if self._resolution_plan is None:
+            self._resolution_plan = ResolutionPlan.for_function(self.fn)
+        return self._resolution_plan
+
+    def get_parameterised_instances(
+        self,
+    ) -> List[Union["Test", "ParameterisedInstance"]]:
+        """
+        If the test is parameterised, return a list of `ParameterisedInstance` objects
+        representing each test generated as a result of the parameterisation.
         If the test is not parameterised, return a list containing only the test itself.
         If the test is parameterised incorrectly, for example the number of
         items don't match across occurrences of `each` in the test signature,
         then a `ParameterisationError` is raised.
         """
+        return list(self.iter_parameterised_instances())
+
+    def iter_parameterised_instances(
+        self,
+    ) -> Iterator[Union["Test", "ParameterisedInstance"]]:
+        """
+        Like `get_parameterised_instances`, but each instance is generated as it's
+        needed, and values are only read from iterables passed to `each` as each
+        instance is generated. A `ParameterisationError` may be raised part way through.
+        """
         if not self.is_parameterised:
-            return [self]
+            yield self
+            return
 
         number_of_instances = self.find_number_of_instances()
-
-        generated_tests = []
-        for instance_index in range(number_of_instances):
-            generated_test = Test(
-                fn=self.fn,
-                module_name=self.module_name,
-                marker=self.marker,
-                description=self.description,
-                param_meta=ParamMeta(
-                    instance_index=instance_index, group_size=number_of_instances
-                ),
-                capture_output=self.capture_output,
-            )
-            generated_tests.append(generated_test)
-        return generated_tests
-
-    def find_number_of_instances(self) -> int:
+        plan = self.resolution_plan
+        columns = [iter(plan.args[name]) for name in plan.each_names]
+        for instance_index in itertools.count():
+            row = tuple(next(column, _END_OF_VALUES) for column in columns)
+            if all(value is _END_OF_VALUES for value in row):
+                return
+            if any(value is _END_OF_VALUES for value in row):
+                raise self._parameterisation_error()
+            yield ParameterisedInstance(self, instance_index, number_of_instances, row)
+
+    def find_number_of_instances(self) -> Optional[int]:
         """
         Returns the number of instances that would be generated for the current
-        parameterised test.
+        parameterised test, or None if the test is only parameterised with
+        iterables of unknown length.
 
         A parameterised test is only valid if every instance of `each` contains
         an equal number of items. If the current test is an invalid parameterisation,
         then a `ParameterisationError` is raised.
         """
         default_args = self.resolver.get_default_args()
-        lengths = [len(arg) for _, arg in default_args.items() if isinstance(arg, Each)]
+        eaches = [arg for arg in default_args.values() if isinstance(arg, Each)]
+        lengths = [len(arg) for arg in eaches if arg.is_sized]
         is_valid = len(set(lengths)) in (0, 1)
         if not is_valid:
-            raise ParameterisationError(
-                f"The test {self.name}/{self.description} is parameterised incorrectly. "
-                f"Please ensure all instances of 'each' in the test signature "
-                f"are of equal length."
-            )
-        if len(lengths) == 0:
-            return 1
-        else:
+            raise self._parameterisation_error()
+        if lengths:
             return lengths[0]
+        return None if eaches else 1
 
-    def deps(self) -> Mapping[str, inspect.Parameter]:
-        return inspect.signature(self.fn).parameters
+    def _parameterisation_error(self) -> ParameterisationError:
+        return ParameterisationError(
+            f"The test {self.name}/{self.description} is parameterised incorrectly. "
+            f"Please ensure all instances of 'each' in the test signature "
+            f"are of equal length."
+        )
 
-    def format_description(self, args: Dict[str, Any]) -> str:
-        """
-        Applies any necessary string formatting to the description,
-        given a dictionary `args` of values that will be injected
-        into the test.
 
-        This method will mutate the Test by updating the description.
-        Returns the newly updated description.
-        """
+class ParameterisedInstance(_BaseTest):
+    """
+    A single instance of a parameterised test, as generated by
+    `Test.get_parameterised_instances`.
 
-        format_dict = _FormatDict(**args)
-        if not self.description:
-            self.description = ""
+    An instance shares the data of the test it was generated from, and only stores
+    what differs between instances, so that a test parameterised with a large number
+    of values doesn't use a large amount of memory.
+
+    Attributes:
+        parent: The parameterised test that this is an instance of.
+        id: A small integer used to identify the instance.
+        instance_index: The index of the values this instance of the test is run with.
+        group_size: The number of instances the parent test is parameterised into,
+            or None if it's parameterised with iterables of unknown length.
+        row: The values of the arguments that are parameterised with `each`, in
+            the order they appear in the test signature. None if the instance was
+            created only to report the result of a test that ran elsewhere.
+        description: The description of the instance. Formatted with the values
+            injected into the instance once it runs.
+        timer: Timing information about the instance.
+    """
+
+    __slots__ = (
+        "parent",
+        "id",
+        "instance_index",
+        "group_size",
+        "row",
+    )
+
+    def __init__(
+        self,
+        parent: Test,
+        instance_index: int,
+        group_size: Optional[int],
+        row: Optional[Tuple[Any, ...]] = None,
+    ):
+        self.parent = parent
+        self.id = _generate_instance_id()
+        self.instance_index = instance_index
+        self.group_size = group_size
+        self.row = row
+        self.description = parent.description
+        self.timer: Optional[_Timer] = None
+        self._sout: Optional[CaptureBuffer] = None
+        self._serr: Optional[CaptureBuffer] = None
 
+    def __hash__(self):
+        return hash((self.__class__, self.id))
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.id == other.id
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(parent={self.parent!r}, "
+            f"instance_index={self.instance_index}, id={self.id})"
+        )
+
+    def run(
+        self,
+        cache: FixtureCache,
+        dry_run=False,
+        default_timeout: Optional[float] = None,
+    ) -> "TestResult":
         try:
-            self.description = self.description.format_map(format_dict)
-        except ValueError:
-            pass
+            return super().run(cache, dry_run, default_timeout)
+        finally:
+            # Anything that was captured has been copied into the result.
+            self._sout = self._serr = None
+
+    async def run_async(
+        self,
+        cache: FixtureCache,
+        dry_run=False,
+        default_timeout: Optional[float] = None,
+    ) -> "TestResult":
+        try:
+            return await super().run_async(cache, dry_run, default_timeout)
+        finally:
+            self._sout = self._serr = None
 
-        return self.description
+    @property
+    def fn(self) -> Callable:  # type: ignore[override]
+        return self.parent.fn
+
+    @property
+    def module_name(self) -> str:  # type: ignore[override]
+        return self.parent.module_name
+
+    @property
+    def name(self) -> str:
+        return self.parent.name
+
+    @property
+    def path(self) -> Path:
+        return self.parent.path
+
+    @property
+    def line_number(self) -> int:
+        return self.parent.line_number
+
+    @property
+    def source(self) -> str:
+        return self.parent.source
+
+    @property
+    def marker(self) -> Optional[Marker]:  # type: ignore[override]
+        return self.parent.marker
+
+    @property
+    def capture_output(self) -> bool:  # type: ignore[override]
+        return self.parent.capture_output
+
+    @property
+    def tags(self) -> List[str]:
+        return self.parent.tags
+
+    @property
+    def ward_meta(self) -> CollectionMetadata:
+        return self.parent.ward_meta
+
+    @property
+    def param_meta(self) -> ParamMeta:  # type: ignore[override]
+        return ParamMeta(instance_index=self.instance_index, group_size=self.group_size)
 
+    @property
+    def resolution_plan(self) -> ResolutionPlan:
+        return self.parent.resolution_plan
 
-def test(description: str, *args, tags: Optional[List[str]] = None, **kwargs):
+
+def test(
+    description: str,
+    *args,
+    tags: Optional[List[str]] = None,
+    timeout: Optional[float] = None,
+    **kwargs,
+):
     """
     Decorator used to indicate that the function it wraps should be collected by Ward.
 
@@ -390,6 +739,8 @@ def test(description: str, *args, tags: Optional[List[str]] = None, **kwargs):
         tags: An optional list of strings that will 'tag' the test. Many tests can share the same tag, and these
             tags can be used to group tests in some logical manner (for example: by business domain or test type).
             Tagged tests can be queried using the --tags option.
+        timeout: The number of seconds the test can run for before it's stopped and reported as having timed out.
+            Overrides the --timeout option.
     """
 
     def decorator_test(func):
@@ -407,11 +758,13 @@ def test(description: str, *args, tags: Optional[List[str]] = None, **kwargs):
                 unwrapped.ward_meta.description = description
                 unwrapped.ward_meta.tags = tags
                 unwrapped.ward_meta.path = path
+                unwrapped.ward_meta.timeout = timeout
             else:
                 unwrapped.ward_meta = CollectionMetadata(
                     description=description,
                     tags=tags,
                     path=path,
+                    timeout=timeout,
                 )
 
             collect_into = kwargs.get("_collect_into", COLLECTED_TESTS)
@@ -439,6 +792,7 @@ class TestOutcome(Enum):
         XFAIL: The test was expected to fail, and it did fail.
         XPASS: The test was expected to fail, however it unexpectedly passed.
         DRYRUN: The test was not executed because the test session was a dry-run.
+        TIMEOUT: The test was stopped because it ran for longer than its timeout.
     """
 
     PASS = auto()
@@ -447,6 +801,7 @@ class TestOutcome(Enum):
     XFAIL = auto()  # expected fail
     XPASS = auto()  # unexpected pass
     DRYRUN = auto()  # tests arent executed during dryruns
+    TIMEOUT = auto()
 
     @property
     def display_char(self):
@@ -457,6 +812,7 @@ class TestOutcome(Enum):
             TestOutcome.XPASS: "U",
             TestOutcome.XFAIL: "x",
             TestOutcome.DRYRUN: ".",
+            TestOutcome.TIMEOUT: "T",
         }
         assert len(display_chars) == len(TestOutcome)
         return display_chars[self]
@@ -470,13 +826,14 @@ class TestOutcome(Enum):
             TestOutcome.XPASS: "Unexpected Passes",
             TestOutcome.XFAIL: "Expected Failures",
             TestOutcome.DRYRUN: "Dry-runs",
+            TestOutcome.TIMEOUT: "Timeouts",
         }
         assert len(display_names) == len(TestOutcome)
         return display_names[self]
 
     @property
     def will_fail_session(self) -> bool:
-        return self in {TestOutcome.FAIL, TestOutcome.XPASS}
+        return self in {TestOutcome.FAIL, TestOutcome.XPASS, TestOutcome.TIMEOUT}
 
     @property
     def wont_fail_session(self) -> bool:
@@ -494,21 +851,53 @@ class TestResult:
         outcome: The outcome of the test: did it pass, fail, get skipped, etc.
         error: If an exception was raised during test execution, it is stored here.
         message: An arbitrary message that can be associated with the result. Generally empty.
+            If the test timed out, it holds the stack of every thread at the moment it did.
         captured_stdout: A string containing anything that was written to stdout during the execution of the test.
         captured_stderr: A string containing anything that was written to stderr during the execution of the test.
+            If the output exceeded the capture memory limit, only its head and tail are included.
+        failure: A picklable record of `error`, which is used to report it. It's built from `error`
+            when the result is created, after which the traceback of `error` is dropped.
+        captured_stdout_path: If the test failed and its stdout exceeded the capture memory limit,
+            the path of a temporary file containing all of it.
+        captured_stderr_path: As above, for stderr.
+        footprint: The source lines executed by the test (and the fixtures it depends on),
+            by file, if they were recorded (see `ward._impact.FootprintRecorder`).
+        memory: The memory used by the test, if it was profiled (see `ward._memory.memory_profile`).
     """
 
-    test: Test
+    test: Union[Test, ParameterisedInstance]
     outcome: TestOutcome
     error: Optional[BaseException] = None
     message: str = ""
     captured_stdout: str = ""
     captured_stderr: str = ""
+    failure: Optional[FailureRecord] = field(default=None, compare=False)
+    captured_stdout_path: Optional[str] = None
+    captured_stderr_path: Optional[str] = None
+    footprint: Optional[Dict[str, List[int]]] = field(
+        default=None, repr=False, compare=False
+    )
+    memory: Optional[MemoryUsage] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not isinstance(self.error, BaseException):
+            return
+        if self.failure is None:
+            # Only failures are reported in full, so there's no need to format
+            # the details of errors raised by tests that were expected to fail.
+            self.failure = FailureRecord.from_exception(
+                self.error,
+                summary_only=self.outcome
+                not in (TestOutcome.FAIL, TestOutcome.TIMEOUT),
+            )
+        # The error is reported from the record, so the frames in its traceback
+        # (and every local variable in them) needn't be kept alive.
+        release_frames(self.error)
 
 
 def fixtures_used_directly_by_tests(
-    tests: Iterable["Test"],
-) -> Mapping[Fixture, Collection["Test"]]:
+    tests: Iterable[Union["Test", "ParameterisedInstance"]],
+) -> Mapping[Fixture, Collection[Union["Test", "ParameterisedInstance"]]]:
     test_to_fixtures = {t: t.resolver.fixtures for t in tests}
 
     fixture_to_tests = collections.defaultdict(list)
@@ -532,34 +921,35 @@ class TestArgumentResolver:
         using the fixture cache key (See `Fixture.key`).
         """
         if self.test.capture_output:
-            with redirect_stdout(self.test.sout), redirect_stderr(self.test.serr):
+            with redirect_output(self.test.sout, self.test.serr):
                 return self._resolve_args(cache)
         else:
             return self._resolve_args(cache)
 
+    async def resolve_args_async(self, cache: FixtureCache) -> Dict[str, Any]:
+        """
+        Like `resolve_args`, but async fixtures are awaited on the running event loop,
+        and a module or global scoped fixture that's already being resolved by another
+        task is waited for rather than resolved again. Output is captured using
+        `capture_into`, which only takes effect inside `capture_per_context`.
+        """
+        args = self._get_args_for_iteration()
+        if self.test.capture_output:
+            with capture_into(self.test.sout, self.test.serr):
+                return await self.test.resolution_plan.resolve_async(
+                    self.test, cache, args
+                )
+        return await self.test.resolution_plan.resolve_async(self.test, cache, args)
+
     def _resolve_args(self, cache: FixtureCache) -> Dict[str, Any]:
-        args_for_iteration = self._get_args_for_iteration()
-        resolved_args: Dict[str, Any] = {}
-        for name, arg in args_for_iteration.items():
-            if is_fixture(arg):
-                resolved = self._resolve_single_arg(arg, cache)
-            else:
-                resolved = arg
-            resolved_args[name] = resolved
-        return self._unpack_resolved(resolved_args)
+        return self.test.resolution_plan.resolve(
+            self.test, cache, self._get_args_for_iteration()
+        )
 
     def _get_args_for_iteration(self):
-        if not self.test.has_deps:
-            return {}
-        default_args = self.get_default_args()
-        args_for_iteration: Dict[str, Any] = {}
-        for name, arg in default_args.items():
-            # In the case of parameterised testing, grab the arg corresponding
-            # to the current iteration of the parameterised group of tests.
-            if isinstance(arg, Each):
-                arg = arg[self.iteration]
-            args_for_iteration[name] = arg
-        return args_for_iteration
+        return self.test.resolution_plan.args_for_instance(
+            self.iteration, self.test.row
+        )
 
     @property
     def fixtures(self) -> Dict[str, Fixture]:
@@ -578,73 +968,6 @@ class TestArgumentResolver:
         If a value is a fixture function, then the raw fixture
         function is returned as a value in the dict, *not* the `Fixture` object.
         """
-        fn = func or self.test.fn
-        meta = getattr(fn, "ward_meta", None)
-        signature = inspect.signature(fn)
-
-        # Override the signature if @using is present
-        if meta:
-            bound_args = getattr(meta, "bound_args", None)
-            if bound_args:
-                bound_args.apply_defaults()
-                return bound_args.arguments
-
-        default_binding = signature.bind_partial()
-        default_binding.apply_defaults()
-        return default_binding.arguments
-
-    def _resolve_single_arg(
-        self, arg: Callable, cache: FixtureCache
-    ) -> Union[Any, Fixture]:
-        """
-        Get the fixture return value
-
-        If the fixture has been cached, return the value from the cache.
-        Otherwise, call the fixture function and return the value.
-        """
-
-        if not hasattr(arg, "ward_meta"):
-            return arg
-
-        fixture = Fixture(arg)
-        if cache.contains(
-            fixture, fixture.scope, self.test.scope_key_from(fixture.scope)
-        ):
-            return cache.get(
-                fixture.key, fixture.scope, self.test.scope_key_from(fixture.scope)
-            )
-
-        children_defaults = self.get_default_args(func=arg)
-        children_resolved = {}
-        for name, child_fixture in children_defaults.items():
-            child_resolved = self._resolve_single_arg(child_fixture, cache)
-            children_resolved[name] = child_resolved
-
-        try:
-            args_to_inject = self._unpack_resolved(children_resolved)
-            if fixture.is_generator_fixture:
-                fixture.gen = arg(**args_to_inject)
-                fixture.resolved_val = next(fixture.gen)  # type: ignore[arg-type]
-            elif fixture.is_async_generator_fixture:
-                fixture.gen = arg(**args_to_inject)
-                awaitable = fixture.gen.__anext__()  # type: ignore[union-attr]
-                fixture.resolved_val = asyncio.run(awaitable)
-            elif fixture.is_coroutine_fixture:
-                fixture.resolved_val = asyncio.run(arg(**args_to_inject))
-            else:
-                fixture.resolved_val = arg(**args_to_inject)
-        except (Exception, SystemExit) as e:
-            raise FixtureError(f"Unable to resolve fixture '{fixture.name}'") from e
-        scope_key = self.test.scope_key_from(fixture.scope)
-        cache.cache_fixture(fixture, scope_key)
-        return fixture
-
-    @staticmethod
-    def _unpack_resolved(fixture_dict: Dict[str, Any]) -> Dict[str, Any]:
-        resolved_vals = {}
-        for (k, arg) in fixture_dict.items():
-            if isinstance(arg, Fixture):
-                resolved_vals[k] = arg.resolved_val
-            else:
-                resolved_vals[k] = arg
-        return resolved_vals
+        if func is None:
+            return dict(self.test.resolution_plan.args)
+        return get_default_args(func)